@@ -0,0 +1,114 @@
+"""
+Sharded archive layout for downloaded documents
+Downloads land in a staging folder and are moved with an atomic rename into a year/month
+(or sender) tree once finished, so the download folder itself stays small
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from names import normalize_date, clean_name_part, free_name
+
+
+STAGING_DIR_NAME = ".staging"
+LAYOUTS = ("flat", "year/month", "sender")
+UNDATED_DIR_NAME = "undated"
+UNKNOWN_SENDER_DIR_NAME = "Unknown sender"
+
+
+class Archive:
+    """Download folder with a staging area, a sharded tree and an index of the names in it"""
+
+    def __init__(self, download_folder, layout="flat"):
+        """Initialize the archive; the flat layout keeps every file in the download folder"""
+        self.root = Path(download_folder)
+        self.layout = layout if layout in LAYOUTS else "flat"
+        self.lock = threading.Lock()  # Guards the directory index while files are placed in parallel
+        self.directories = {}  # shard folder -> names in it, read once per folder per run
+        self.staging_folder.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def sharded(self):
+        return self.layout != "flat"
+
+    @property
+    def staging_folder(self):
+        """Where finished downloads wait for their final place"""
+        return self.root / STAGING_DIR_NAME if self.sharded else self.root
+
+    def relative_name(self, path):
+        """Name of a file relative to the download folder, as stored in the manifest and index"""
+        return Path(path).relative_to(self.root).as_posix()
+
+    def staged_name(self, name):
+        """Relative name of a file that was saved in the staging folder"""
+        return self.relative_name(self.staging_folder / name)
+
+    def shard(self, doc):
+        """Folder (relative to the download folder) a document's files belong in"""
+        doc = doc or {}
+        if self.layout == "year/month":
+            date = normalize_date(doc.get('date'))
+            if len(date) == 10 and date[4] == '-' and date[:4].isdigit() and date[5:7].isdigit():
+                return Path(date[:4]) / date[5:7]
+            return Path(UNDATED_DIR_NAME)
+        if self.layout == "sender":
+            return Path(clean_name_part(doc.get('sender')) or UNKNOWN_SENDER_DIR_NAME)
+        return Path()
+
+    def names_in(self, folder):
+        """Names in a shard folder, listed once and then kept up to date in memory (call with lock held)"""
+        names = self.directories.get(folder)
+        if names is None:
+            path = self.root / folder
+            try:
+                with os.scandir(path) as entries:
+                    names = {entry.name.lower() for entry in entries}
+            except FileNotFoundError:
+                names = set()
+            self.directories[folder] = names
+        return names
+
+    def reserve(self, folder, name):
+        """Pick a free name in a shard folder, adding ' (n)' like Chrome does on clashes (call with lock held)"""
+        names = self.names_in(folder)
+        candidate = free_name(name, lambda candidate: candidate.lower() in names)
+        names.add(candidate.lower())
+        return self.root / folder / candidate
+
+    def finalize(self, path, doc=None, base_name=None):
+        """Move a verified file into its shard with an atomic rename and return its new path
+
+        base_name renames the file (keeping its extension); files already in place stay put.
+        """
+        path = Path(path)
+        folder = self.shard(doc)
+        in_place = path.parent == self.root / folder
+        if in_place and (not base_name or path.stem.startswith(base_name)):
+            return path
+
+        name = base_name + path.suffix.lower() if base_name else path.name
+        with self.lock:
+            target = self.reserve(folder, name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+            if in_place:
+                self.names_in(folder).discard(path.name.lower())
+        return target
+
+    def forget(self, path):
+        """Drop a file that was moved away or deleted from the directory index"""
+        path = Path(path)
+        with self.lock:
+            names = self.directories.get(path.parent.relative_to(self.root))
+            if names is not None:
+                names.discard(path.name.lower())
+
+    def close(self):
+        """Remove the staging folder when nothing was left behind in it"""
+        if self.sharded:
+            try:
+                (self.root / STAGING_DIR_NAME).rmdir()
+            except OSError:
+                pass
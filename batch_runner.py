@@ -0,0 +1,203 @@
+"""
+Batch runner for several Doccle accounts
+Runs every account config in its own process with its own browser, keeps the number of
+browsers open at the same time under a global cap and prints a combined summary
+
+Usage:
+    python batch_runner.py accounts/ --max-browsers 3
+    python batch_runner.py alice.json bob.json --json summary.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+
+
+DEFAULT_MAX_BROWSERS = 2
+STATE_DIR_NAME = ".state"  # Per-account session and failure files, next to the account configs
+
+
+def find_configs(paths):
+    """Expand directories to the *.json files inside them"""
+    configs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            configs.extend(sorted(p for p in path.glob("*.json") if p.is_file()))
+        elif path.is_file():
+            configs.append(path)
+    return list(dict.fromkeys(configs))
+
+
+def load_account_config(config_path, max_browsers):
+    """Load an account config and give it its own session, failure list and report names"""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    name = config_path.stem
+    # Kept out of the config folder itself so later batches don't mistake them for accounts
+    state_folder = config_path.parent / STATE_DIR_NAME
+    state_folder.mkdir(exist_ok=True)
+    config.setdefault('session_file', str(state_folder / f"{name}.session.json"))
+    config.setdefault('failed_file', str(state_folder / f"{name}.failed.jsonl"))
+    config['log_prefix'] = f"doccle_{name}"
+
+    # One browser for the login plus one per browser worker, within the global cap
+    workers = int(config.get('workers') or 1)
+    if workers > 1 and workers + 1 > max_browsers:
+        config['workers'] = max(1, max_browsers - 1)
+    return config
+
+
+def browsers_needed(config):
+    workers = int(config.get('workers') or 1)
+    return 1 + workers if workers > 1 and config.get('download_engine', 'browser') != 'http' else 1
+
+
+def setup_account_logging(name):
+    """Log each account to its own file in logs/"""
+    log_folder = Path("logs")
+    log_folder.mkdir(exist_ok=True)
+    log_file = log_folder / f"doccle_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    logger = logging.getLogger(f"doccle.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(log_file, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    return logger, log_file
+
+
+def run_account(name, config):
+    """Worker process: run one account and return its summary"""
+    from doccle_downloader import DoccleDownloader
+
+    logger, log_file = setup_account_logging(name)
+    start = time.monotonic()
+    result = {
+        "account": name,
+        "username": config.get('username', ''),
+        "download_folder": config.get('download_folder', ''),
+        "log_file": str(log_file),
+        "ok": False,
+        "error": None,
+    }
+    downloader = DoccleDownloader(config=config, logger=logger)
+    try:
+        downloader.run()
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    summary = downloader.summary or {}
+    result.update({
+        "documents_downloaded": summary.get('documents_downloaded', 0),
+        "documents_failed": summary.get('documents_failed', 0),
+        "files": len(downloader.downloaded_files),
+        "wall_time": round(time.monotonic() - start, 1),
+    })
+    return result
+
+
+def run_batch(config_paths, max_browsers=DEFAULT_MAX_BROWSERS, logger=None):
+    """Run all accounts with at most max_browsers browsers open; returns the combined summary"""
+    logger = logger or logging.getLogger(__name__)
+    max_browsers = max(1, int(max_browsers))
+
+    accounts = []
+    for path in config_paths:
+        try:
+            accounts.append((path.stem, load_account_config(path, max_browsers)))
+        except (OSError, ValueError) as e:
+            logger.error(f"Skipping {path}: {e}")
+
+    # Resolve chromedriver once so the account processes all hit the cache
+    from driver_cache import resolve_chromedriver
+    try:
+        resolve_chromedriver(logger)
+    except Exception as e:
+        logger.warning(f"Could not resolve chromedriver up front: {e}")
+
+    start = time.monotonic()
+    results = []
+    pending = list(accounts)
+    running = {}  # future -> (name, browsers)
+    in_use = 0
+    with ProcessPoolExecutor(max_workers=min(max_browsers, len(accounts)) or 1) as executor:
+        while pending or running:
+            # Start accounts while their browsers fit under the cap
+            while pending and in_use + browsers_needed(pending[0][1]) <= max_browsers:
+                name, config = pending.pop(0)
+                browsers = browsers_needed(config)
+                logger.info(f"Starting account {name} ({browsers} browser(s))")
+                running[executor.submit(run_account, name, config)] = (name, browsers)
+                in_use += browsers
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, browsers = running.pop(future)
+                in_use -= browsers
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"account": name, "ok": False, "error": str(e), "documents_downloaded": 0,
+                              "documents_failed": 0, "files": 0, "wall_time": 0.0}
+                status = "finished" if result["ok"] else f"failed: {result['error']}"
+                logger.info(f"Account {name} {status} in {result['wall_time']:.1f}s")
+                results.append(result)
+
+    results.sort(key=lambda r: r["account"])
+    return {
+        "accounts": results,
+        "wall_time": round(time.monotonic() - start, 1),
+        "account_time": round(sum(r["wall_time"] for r in results), 1),
+        "documents_downloaded": sum(r["documents_downloaded"] for r in results),
+        "documents_failed": sum(r["documents_failed"] for r in results),
+        "files": sum(r["files"] for r in results),
+        "accounts_failed": sum(1 for r in results if not r["ok"]),
+    }
+
+
+def print_summary(summary):
+    print()
+    print("=" * 72)
+    print(f"{'Account':20} {'Status':8} {'Docs':>6} {'Failed':>6} {'Files':>6} {'Time':>9}")
+    print("-" * 72)
+    for r in summary["accounts"]:
+        status = "OK" if r["ok"] else "ERROR"
+        print(f"{r['account'][:20]:20} {status:8} {r['documents_downloaded']:6} {r['documents_failed']:6} "
+              f"{r['files']:6} {r['wall_time']:8.1f}s")
+        if r.get("error"):
+            print(f"    {r['error']}")
+    print("-" * 72)
+    print(f"{'Total':29} {summary['documents_downloaded']:6} {summary['documents_failed']:6} "
+          f"{summary['files']:6} {summary['wall_time']:8.1f}s")
+    print(f"Sequential time would have been about {summary['account_time']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download documents for several Doccle accounts in parallel")
+    parser.add_argument("configs", nargs="+", help="account config files or directories of them")
+    parser.add_argument("--max-browsers", type=int, default=DEFAULT_MAX_BROWSERS,
+                        help="maximum number of Chrome instances open at the same time")
+    parser.add_argument("--json", metavar="PATH", help="also write the combined summary as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    config_paths = find_configs(args.configs)
+    if not config_paths:
+        print("No account configs found", file=sys.stderr)
+        return 1
+
+    summary = run_batch(config_paths, args.max_browsers)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=4)
+    return 1 if summary["accounts_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
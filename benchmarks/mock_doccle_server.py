@@ -0,0 +1,327 @@
+"""
+Local stand-in for the Doccle website
+Serves a login form, a dashboard with N documents (with a "Load more" button), detail pages
+with open/print and XML buttons, and PDF/XML payloads of configurable size and latency
+"""
+
+import argparse
+import json
+import secrets
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+DASHBOARD_PATH = "/doccle-euui/dashboard"
+DOCUMENTS_PATH = "/doccle-euui/documents"
+DETAIL_PREFIX = "/doccle-euui/document/"
+FILES_PREFIX = "/files/"
+STATIC_PREFIX = "/static/"
+SESSION_COOKIE = "MOCKSESSION"
+
+SENDERS = ["Proximus", "Engie", "Telenet", "Luminus", "Stad Gent", "FOD Financien"]
+
+# Page weight a real site carries but the downloader doesn't need (what the lean profile skips)
+ASSETS = """<link rel="stylesheet" href="/static/site.css">
+<img src="/static/banner.png" alt="">
+<img src="/static/logo.svg" alt="">
+"""
+STATIC_TYPES = {
+    "site.css": "text/css",
+    "banner.png": "image/png",
+    "logo.svg": "image/svg+xml",
+    "font.woff2": "font/woff2",
+}
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Doccle - Log in</title></head>
+<body>
+<form method="post" action="/login">
+  <input type="email" id="username" name="username">
+  <input type="password" id="password" name="password">
+  <button type="submit">Log in</button>
+</form>
+</body></html>
+"""
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html><head><title>Doccle - Dashboard</title></head>
+<body>
+{assets}<div id="documents">{documents}</div>
+{load_more}
+<script>
+let offset = {offset};
+function loadMore(button) {{
+    fetch('{documents_path}?offset=' + offset).then(r => r.json()).then(data => {{
+        document.getElementById('documents').insertAdjacentHTML('beforeend', data.html);
+        offset = data.next;
+        if (data.done) {{ button.remove(); }}
+    }});
+}}
+</script>
+</body></html>
+"""
+
+DETAIL_PAGE = """<!DOCTYPE html>
+<html><head><title>Doccle - {title}</title></head>
+<body>
+{assets}<h1>{title}</h1>
+<a href="{files_prefix}{doc_id}.pdf" target="_blank">Open/print document in new window</a>
+<a href="{files_prefix}{doc_id}.xml">Download XML</a>
+</body></html>
+"""
+
+
+class MockDoccle:
+    """Generated account data and timing settings shared by all request handlers"""
+
+    def __init__(self, documents=50, page_size=20, pdf_size=200_000, xml_size=4_000, latency=0.0,
+                 username="bench@example.com", password="bench", asset_size=100_000):
+        self.documents = documents
+        self.page_size = page_size
+        self.pdf_size = pdf_size
+        self.xml_size = xml_size
+        self.asset_size = asset_size
+        self.latency = latency
+        self.username = username
+        self.password = password
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def document(self, index):
+        """Metadata of document index; index 0 is the newest"""
+        doc_date = date(2025, 12, 31) - timedelta(days=index * 3)
+        sender = SENDERS[index % len(SENDERS)]
+        return {
+            "id": f"doc{index:05d}",
+            "sender": sender,
+            "date": doc_date.isoformat(),
+            "title": f"Invoice {doc_date:%B %Y}",
+            "amount": f"{20 + (index * 7) % 180}.{index % 100:02d}",
+            "due_date": (doc_date + timedelta(days=30)).isoformat(),
+            "reference": f"+++{index:03d}/{index * 13 % 10000:04d}/{index * 7 % 100000:05d}+++",
+            "unread": index % 4 == 0,
+        }
+
+    def document_html(self, start, end):
+        items = []
+        for index in range(start, min(end, self.documents)):
+            doc = self.document(index)
+            state = "unopened" if doc["unread"] else "opened"
+            items.append(
+                f'<div class="document {state}" data-url-detail="{DETAIL_PREFIX}{doc["id"]}">'
+                f'<span class="sender">{doc["sender"]}</span>'
+                f'<time datetime="{doc["date"]}">{doc["date"]}</time>'
+                f'<span class="title">{doc["title"]}</span></div>'
+            )
+        return "\n".join(items)
+
+    def static_payload(self, name):
+        if name == "site.css":
+            css = "@font-face { font-family: Mock; src: url('/static/font.woff2'); }\nbody { font-family: Mock; }\n"
+            return css.encode()
+        return b"0" * self.asset_size
+
+    def pdf_payload(self, index):
+        header = f"%PDF-1.4\n% Mock document {index}\n".encode()
+        trailer = b"\ntrailer\n<<>>\n%%EOF\n"
+        filler = max(0, self.pdf_size - len(header) - len(trailer))
+        return header + (b"0" * filler) + trailer
+
+    def xml_payload(self, index):
+        doc = self.document(index)
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            "<Document>\n"
+            f"  <Sender><Name>{doc['sender']}</Name></Sender>\n"
+            f"  <DocumentDate>{doc['date']}</DocumentDate>\n"
+            f"  <DocumentType>Invoice</DocumentType>\n"
+            f"  <Title>{doc['title']}</Title>\n"
+            "  <Payment>\n"
+            f"    <Amount currency=\"EUR\">{doc['amount']}</Amount>\n"
+            f"    <DueDate>{doc['due_date']}</DueDate>\n"
+            f"    <StructuredReference>{doc['reference']}</StructuredReference>\n"
+            "  </Payment>\n"
+        )
+        footer = "</Document>\n"
+        padding = max(0, self.xml_size - len(body) - len(footer) - 9)
+        return (body + f"<!--{'x' * padding}-->" + footer).encode()
+
+
+class MockDoccleHandler(BaseHTTPRequestHandler):
+    """Request handler for the stand-in site"""
+
+    server_version = "MockDoccle/1.0"
+
+    @property
+    def site(self):
+        return self.server.site
+
+    def log_message(self, format, *args):
+        pass
+
+    def logged_in(self):
+        cookies = self.headers.get("Cookie", "")
+        for part in cookies.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE and value in self.site.sessions:
+                return True
+        return False
+
+    def send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        with self.site.lock:
+            self.site.requests += 1
+            self.site.bytes_sent += len(body)
+
+    def redirect(self, location, headers=None):
+        headers = dict(headers or {})
+        headers["Location"] = location
+        self.send(302, b"", headers=headers)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self.site.latency:
+            time.sleep(self.site.latency)
+        url = urlparse(self.path)
+        path = url.path
+
+        if path in ("/", "/login"):
+            return self.send(200, LOGIN_PAGE)
+
+        if path.startswith(STATIC_PREFIX):
+            name = path[len(STATIC_PREFIX):]
+            if name not in STATIC_TYPES:
+                return self.send(404, "Not found")
+            return self.send(200, self.site.static_payload(name), content_type=STATIC_TYPES[name])
+
+        if not self.logged_in():
+            return self.redirect("/login")
+
+        if path == DASHBOARD_PATH:
+            page_size = self.site.page_size or self.site.documents
+            load_more = ""
+            if page_size < self.site.documents:
+                load_more = '<button type="button" onclick="loadMore(this)">Load more</button>'
+            return self.send(200, DASHBOARD_PAGE.format(
+                assets=ASSETS,
+                documents=self.site.document_html(0, page_size),
+                load_more=load_more,
+                offset=page_size,
+                documents_path=DOCUMENTS_PATH,
+            ))
+
+        if path == DOCUMENTS_PATH:
+            offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+            end = offset + (self.site.page_size or self.site.documents)
+            body = json.dumps({
+                "html": self.site.document_html(offset, end),
+                "next": end,
+                "done": end >= self.site.documents,
+            })
+            return self.send(200, body, content_type="application/json")
+
+        if path.startswith(DETAIL_PREFIX):
+            doc_id = path[len(DETAIL_PREFIX):]
+            index = self.document_index(doc_id)
+            if index is None:
+                return self.send(404, "Not found")
+            doc = self.site.document(index)
+            return self.send(200, DETAIL_PAGE.format(
+                assets=ASSETS, title=doc["title"], doc_id=doc_id, files_prefix=FILES_PREFIX
+            ))
+
+        if path.startswith(FILES_PREFIX):
+            name = path[len(FILES_PREFIX):]
+            doc_id, _, extension = name.rpartition(".")
+            index = self.document_index(doc_id)
+            if index is None or extension not in ("pdf", "xml"):
+                return self.send(404, "Not found")
+            if extension == "pdf":
+                payload, content_type = self.site.pdf_payload(index), "application/pdf"
+            else:
+                payload, content_type = self.site.xml_payload(index), "application/xml"
+            return self.send(200, payload, content_type=content_type, headers={
+                "Content-Disposition": f'attachment; filename="{name}"'
+            })
+
+        return self.send(404, "Not found")
+
+    def do_POST(self):
+        if self.site.latency:
+            time.sleep(self.site.latency)
+        if urlparse(self.path).path != "/login":
+            return self.send(404, "Not found")
+
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        username = form.get("username", [""])[0]
+        password = form.get("password", [""])[0]
+        if username != self.site.username or password != self.site.password:
+            return self.send(200, LOGIN_PAGE)
+
+        token = secrets.token_hex(16)
+        with self.site.lock:
+            self.site.sessions.add(token)
+        self.redirect(DASHBOARD_PATH, headers={"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/"})
+
+    def document_index(self, doc_id):
+        if not doc_id.startswith("doc"):
+            return None
+        try:
+            index = int(doc_id[3:])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.site.documents else None
+
+
+def start_server(site, host="127.0.0.1", port=0):
+    """Start the stand-in server on a background thread and return it"""
+    server = ThreadingHTTPServer((host, port), MockDoccleHandler)
+    server.daemon_threads = True
+    server.site = site
+    thread = threading.Thread(target=server.serve_forever, name="mock-doccle", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Doccle website")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20, help="documents per dashboard batch (0 = all)")
+    parser.add_argument("--pdf-size", type=int, default=200_000, help="PDF payload size in bytes")
+    parser.add_argument("--xml-size", type=int, default=4_000, help="XML payload size in bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="added latency per request in seconds")
+    parser.add_argument("--asset-size", type=int, default=100_000, help="size of each image/font in bytes")
+    args = parser.parse_args()
+
+    site = MockDoccle(args.documents, args.page_size, args.pdf_size, args.xml_size, args.latency,
+                      asset_size=args.asset_size)
+    server = start_server(site, port=args.port)
+    print(f"Mock Doccle running at http://127.0.0.1:{server.server_address[1]}")
+    print(f"Login: {site.username} / {site.password}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
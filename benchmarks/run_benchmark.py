@@ -0,0 +1,181 @@
+"""
+Benchmark DoccleDownloader against the local mock Doccle server
+Reports documents per minute, p50/p95 time per document and time per phase
+
+Usage:
+    python benchmarks/run_benchmark.py --documents 50 --latency 0.05 --workers 1
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from doccle_downloader import DoccleDownloader
+from run_report import percentile
+from mock_doccle_server import MockDoccle, start_server
+
+
+class DocumentTimer:
+    """Times every download_document call, including those made by browser workers"""
+
+    def __init__(self):
+        self.durations = []
+        self.lock = threading.Lock()
+        self.original = DoccleDownloader.download_document
+
+    def install(self):
+        timer = self
+
+        def timed(downloader, doc, doc_number):
+            start = time.perf_counter()
+            try:
+                return timer.original(downloader, doc, doc_number)
+            finally:
+                with timer.lock:
+                    timer.durations.append(time.perf_counter() - start)
+
+        DoccleDownloader.download_document = timed
+
+    def uninstall(self):
+        DoccleDownloader.download_document = self.original
+
+
+def run_benchmark(args):
+    """Run one benchmark and return the report dict"""
+    site = MockDoccle(
+        documents=args.documents,
+        page_size=args.page_size,
+        pdf_size=args.pdf_size,
+        xml_size=args.xml_size,
+        latency=args.latency,
+        asset_size=args.asset_size,
+    )
+    server = start_server(site)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    work_dir = Path(tempfile.mkdtemp(prefix="doccle_bench_"))
+    config_path = work_dir / "config.json"
+    config = {
+        "username": site.username,
+        "password": site.password,
+        "download_folder": str(work_dir / "downloads"),
+        "base_url": base_url,
+        "wait_timeout": 10,
+        "headless": not args.show_browser,
+        "only_unread": False,
+        "max_documents": args.max_documents,
+        "download_engine": args.engine,
+        "workers": args.workers,
+        "use_manifest": True,
+        "reuse_session": False,
+        "lean_mode": args.lean,
+        "requests_per_second": args.requests_per_second,
+    }
+    config_path.write_text(json.dumps(config, indent=4))
+
+    timer = DocumentTimer()
+    timer.install()
+    try:
+        downloader = DoccleDownloader(config_path=str(config_path))
+        start = time.perf_counter()
+        downloader.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        timer.uninstall()
+        server.shutdown()
+
+    files = [p for p in (work_dir / "downloads").iterdir() if p.is_file() and not p.name.startswith('.')]
+    phases = {}
+    if downloader.waiter:
+        for name, stats in downloader.waiter.phases.items():
+            phases[name] = {
+                "total": round(stats.total, 3),
+                "waiting": round(stats.waiting, 3),
+                "working": round(stats.working, 3),
+            }
+
+    documents = len(timer.durations)
+    report = {
+        "documents": documents,
+        "files": len(files),
+        "wall_time": round(elapsed, 3),
+        "documents_per_minute": round(documents / elapsed * 60, 1) if elapsed else 0.0,
+        "p50_per_document": round(percentile(timer.durations, 0.50), 3),
+        "p95_per_document": round(percentile(timer.durations, 0.95), 3),
+        "phases": phases,
+        "server_requests": site.requests,
+        "server_bytes": site.bytes_sent,
+        "settings": {
+            "mock_documents": args.documents,
+            "page_size": args.page_size,
+            "pdf_size": args.pdf_size,
+            "xml_size": args.xml_size,
+            "latency": args.latency,
+            "engine": args.engine,
+            "workers": args.workers,
+            "lean_mode": args.lean,
+            "asset_size": args.asset_size,
+            "requests_per_second": args.requests_per_second,
+        },
+    }
+
+    if args.keep_files:
+        report["work_dir"] = str(work_dir)
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return report
+
+
+def print_report(report):
+    print()
+    print("=" * 60)
+    print("Doccle downloader benchmark")
+    print("=" * 60)
+    print(f"Documents downloaded : {report['documents']} ({report['files']} files)")
+    print(f"Wall time            : {report['wall_time']:.1f}s")
+    print(f"Documents per minute : {report['documents_per_minute']:.1f}")
+    print(f"Time per document    : p50 {report['p50_per_document']:.2f}s, p95 {report['p95_per_document']:.2f}s")
+    print(f"Server               : {report['server_requests']} requests, {report['server_bytes'] / 1e6:.1f} MB")
+    print("Time per phase:")
+    for name, stats in report['phases'].items():
+        print(f"  {name:10s} {stats['total']:7.2f}s total, {stats['waiting']:7.2f}s waiting, {stats['working']:7.2f}s working")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Doccle downloader against a local mock server")
+    parser.add_argument("--documents", type=int, default=30, help="documents in the mock account")
+    parser.add_argument("--page-size", type=int, default=20, help="documents per dashboard batch (0 = all)")
+    parser.add_argument("--pdf-size", type=int, default=200_000, help="PDF payload size in bytes")
+    parser.add_argument("--xml-size", type=int, default=4_000, help="XML payload size in bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="added server latency per request in seconds")
+    parser.add_argument("--asset-size", type=int, default=100_000, help="size of each page image/font in bytes")
+    parser.add_argument("--lean", action="store_true", help="enable the lean page-load profile")
+    parser.add_argument("--max-documents", type=int, default=None)
+    parser.add_argument("--engine", choices=["browser", "http"], default="browser")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--requests-per-second", type=float, default=0,
+                        help="pace of page loads, clicks and downloads (default 0 = no pacing)")
+    parser.add_argument("--show-browser", action="store_true", help="run Chrome with a visible window")
+    parser.add_argument("--keep-files", action="store_true", help="keep the temporary download folder")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+WebDriver command accounting for the Doccle downloader
+Counts and times every command sent to chromedriver, per calling method and per document
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+SELENIUM_DIR = os.sep + "selenium" + os.sep
+THIS_FILE = os.path.abspath(__file__)
+TOP_CALLERS = 15
+OWNER_PREFIX = "DoccleDownloader."
+CHAIN_DEPTH = 2  # DoccleDownloader methods shown above the frame that sent a command
+
+
+class CommandStats:
+    """Count, total and slowest latency of a group of commands"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+    def as_dict(self):
+        return {"count": self.count, "total": round(self.total, 4), "max": round(self.max, 4)}
+
+
+def calling_method(frame):
+    """Short call chain for a command, e.g. "download_document > find_xml_button > SelectorResolver.find.<locals>.query"
+
+    The last entry is the first frame outside Selenium and this module; before it come
+    the nearest DoccleDownloader methods that led there, so helpers shared by several
+    steps are still told apart.
+    """
+    sender = None
+    owners = []
+    while frame and len(owners) < CHAIN_DEPTH:
+        path = frame.f_code.co_filename
+        if SELENIUM_DIR not in path and os.path.abspath(path) != THIS_FILE:
+            name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+            if sender is None:
+                sender = name
+            elif name.startswith(OWNER_PREFIX) and '<locals>' not in name:
+                owners.append(name[len(OWNER_PREFIX):])
+        frame = frame.f_back
+    if sender is None:
+        return "unknown"
+    if sender.startswith(OWNER_PREFIX):
+        sender = sender[len(OWNER_PREFIX):]
+    return " > ".join(list(reversed(owners)) + [sender])
+
+
+class CommandProfiler:
+    """Wraps driver.execute, the single funnel for driver and element commands"""
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.lock = threading.Lock()  # Browser workers send commands from their own threads
+        self.local = threading.local()
+        self.commands = {}  # command -> CommandStats
+        self.callers = {}  # calling method -> {command: CommandStats}
+        self.documents = {}  # document number -> CommandStats
+
+    def instrument(self, driver):
+        """Record every command the driver sends from now on"""
+        original = getattr(driver, '_unprofiled_execute', None) or driver.execute
+        driver._unprofiled_execute = original
+
+        def execute(driver_command, params=None):
+            caller = calling_method(sys._getframe(1))
+            start = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                self.record(driver_command, time.perf_counter() - start, caller)
+
+        driver.execute = execute
+
+    @staticmethod
+    def release(driver):
+        """Restore a driver's own execute method"""
+        original = getattr(driver, '_unprofiled_execute', None)
+        if original:
+            driver.execute = original
+            del driver._unprofiled_execute
+
+    @contextmanager
+    def document(self, doc_number):
+        """Attribute commands sent from this thread inside the block to a document"""
+        previous = getattr(self.local, 'doc', None)
+        self.local.doc = doc_number
+        try:
+            yield
+        finally:
+            self.local.doc = previous
+
+    def record(self, command, elapsed, caller):
+        doc = getattr(self.local, 'doc', None)
+        with self.lock:
+            self.commands.setdefault(command, CommandStats()).add(elapsed)
+            self.callers.setdefault(caller, {}).setdefault(command, CommandStats()).add(elapsed)
+            if doc is not None:
+                self.documents.setdefault(doc, CommandStats()).add(elapsed)
+
+    def summary(self):
+        """Return everything recorded as a JSON-ready dict"""
+        with self.lock:
+            per_document = [stats.count for stats in self.documents.values()]
+            return {
+                "commands": {name: stats.as_dict() for name, stats in
+                             sorted(self.commands.items(), key=lambda item: -item[1].total)},
+                "callers": {caller: {name: stats.as_dict() for name, stats in commands.items()}
+                            for caller, commands in self.callers.items()},
+                "documents": {str(doc): stats.as_dict() for doc, stats in self.documents.items()},
+                "total_commands": sum(stats.count for stats in self.commands.values()),
+                "total_time": round(sum(stats.total for stats in self.commands.values()), 3),
+                "commands_per_document": round(sum(per_document) / len(per_document), 1) if per_document else None,
+            }
+
+    def report(self):
+        """Return log lines with the totals and the callers that spend most time in WebDriver"""
+        summary = self.summary()
+        lines = [f"{summary['total_commands']} WebDriver commands, {summary['total_time']:.1f}s round trip time"]
+        if summary['commands_per_document'] is not None:
+            lines.append(f"{summary['commands_per_document']} commands per document on average")
+
+        callers = []
+        for caller, commands in summary['callers'].items():
+            count = sum(c['count'] for c in commands.values())
+            total = sum(c['total'] for c in commands.values())
+            top = max(commands.items(), key=lambda item: item[1]['count'])[0]
+            callers.append((total, count, caller, top))
+        for total, count, caller, top in sorted(callers, reverse=True)[:TOP_CALLERS]:
+            lines.append(f"{caller}: {count} commands, {total:.2f}s (mostly {top})")
+        return lines
+
+    def write(self, path):
+        """Save the summary as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
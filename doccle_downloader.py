@@ -4,31 +4,140 @@ Automates login and document downloads from Doccle.be
 """
 
 import os
-import time
 import json
+import argparse
+import atexit
+import cProfile
+import hashlib
 import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchWindowException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from http_downloader import HttpDownloader, file_url
+from manifest import DownloadManifest
+from waits import Waiter
+from download_tracker import DownloadTracker
+from document_list import collect_document_records, iter_document_records, is_read
+from selector_resolver import SelectorResolver
+from worker_pool import BrowserWorkerPool
+from session_store import SessionStore, SESSION_FILE, COOKIE_FIELDS
+from driver_cache import resolve_chromedriver
+from run_report import RunReport
+from post_processor import PostProcessor
+from document_index import DocumentIndex
+from retry_queue import RetryScheduler, FailedLog, FAILED_FILE
+from document_filters import DocumentFilter, month_window
+from archive import Archive
+from navigation_scheduler import NavigationScheduler
+from command_profiler import CommandProfiler
+from sync_service import SyncService
+from lean_profile import (
+    LEAN_PREFS, EAGER_READY_STATES, blocked_url_patterns, block_urls, allowed_hosts, host_allowed
+)
+
+
+BASE_URL = "https://secure.doccle.be"
+DASHBOARD_PATH = "/doccle-euui/dashboard"
+PREWARM_SESSION_MAX_AGE = 300  # Seconds a session checked by prewarm() is trusted without another check
+
+# Login form fields (adjust selectors based on actual page)
+USERNAME_SELECTORS = [
+    (By.ID, "username"),
+    (By.NAME, "username"),
+    (By.ID, "j_username"),
+    (By.NAME, "j_username"),
+    (By.CSS_SELECTOR, "input[type='text']"),
+    (By.CSS_SELECTOR, "input[type='email']")
+]
+
+PASSWORD_SELECTORS = [
+    (By.ID, "password"),
+    (By.NAME, "password"),
+    (By.ID, "j_password"),
+    (By.NAME, "j_password"),
+    (By.CSS_SELECTOR, "input[type='password']")
+]
+
+LOGIN_BUTTON_SELECTORS = [
+    (By.CSS_SELECTOR, "button[type='submit']"),
+    (By.ID, "login-button"),
+    (By.NAME, "submit"),
+    (By.XPATH, "//button[contains(text(), 'Log in')]"),
+    (By.XPATH, "//button[contains(text(), 'Aanmelden')]"),
+    (By.XPATH, "//input[@type='submit']")
+]
+
+# Buttons on a document detail page
+OPEN_PRINT_SELECTORS = [
+    (By.XPATH, "//a[contains(text(), 'Open/print document in new window')]"),
+    (By.XPATH, "//button[contains(text(), 'Open/print document in new window')]"),
+    (By.XPATH, "//a[contains(text(), 'open') and contains(text(), 'print')]"),
+    (By.XPATH, "//a[contains(text(), 'Open') or contains(text(), 'print')]"),
+    (By.XPATH, "//button[contains(text(), 'Open') or contains(text(), 'print')]"),
+    (By.CSS_SELECTOR, "a[target='_blank']"),
+]
+
+XML_BUTTON_SELECTORS = [
+    (By.XPATH, "//a[contains(text(), 'Download XML')]"),
+    (By.XPATH, "//button[contains(text(), 'Download XML')]"),
+    (By.XPATH, "//a[contains(text(), 'XML')]"),
+    (By.XPATH, "//button[contains(text(), 'XML')]"),
+]
 
 
 class DoccleDownloader:
     """Automates document downloads from Doccle.be"""
 
-    def __init__(self, config_path="config.json"):
-        """Initialize the downloader with configuration"""
-        self.config = self.load_config(config_path)
-        self.setup_logging()
+    def __init__(self, config_path="config.json", config=None, logger=None):
+        """Initialize the downloader with configuration
+
+        Worker instances pass an already loaded config and the parent's logger.
+        """
+        self.config = config if config is not None else self.load_config(config_path)
+        if logger is not None:
+            self.logger = logger
+        else:
+            self.setup_logging()
+        self.driver_path = None
         self.driver = None
-        self.wait = None
+        self.waiter = None
+        self.selectors = None
+        self.session_store = None
+        self.dashboard_window = None
+        self.detail_window = None
+        self.current_window = None  # Tab the driver was last switched to, tracked to avoid asking the browser
+        self.documents_seen = 0
+        self.download_tracker = None
+        self.http_downloader = None
+        self.http_documents = {}  # doc_number -> detail URL of queued HTTP downloads
+        self.browser_only = set()  # detail URLs whose HTTP download failed, fetched with the browser instead
+        self.manifest = None
+        self.archive = None
+        self.post_processor = None
+        self.document_index = None
+        self.retry = None
+        self.navigator = None  # Paces page loads, clicks and HTTP downloads
+        self.profiler = None  # Counts WebDriver commands in --profile mode
+        self.session_checked_at = None  # When prewarm() found the saved session valid
         self.downloaded_files = set()  # Track downloaded files
+        self.document_files = {}  # detail URL -> file names downloaded in this run
+        self.document_records = {}  # detail URL -> dashboard record (sender, date, title)
+        self.integrity_failures = set()  # detail URLs whose files failed post-processing checks
+        self.report = None
+        self.summary = None  # Run report summary of the last run()
+        self.on_progress = None  # Called with a run_report.Progress after every document
+        self.document_filter = None  # Date window and sender lists from config
+        self.stop_after_known = None  # Stop enumerating after this many already downloaded documents in a row
+        self.known_hashes = None  # sha256 -> file name as of the end of the last run, for incremental runs
 
     def load_config(self, config_path):
         """Load configuration from JSON file"""
@@ -41,7 +150,17 @@ class DoccleDownloader:
                 "wait_timeout": 20,
                 "headless": False,
                 "only_unread": False,
-                "max_documents": None
+                "max_documents": None,
+                "download_engine": "browser",
+                "http_workers": 4,
+                "use_manifest": True,
+                "workers": 1,
+                "reuse_session": True,
+                "post_process": True,
+                "rename_files": True,
+                "duplicates": "link",
+                "index_xml": True,
+                "archive_layout": "year/month"
             }
             with open(config_path, 'w') as f:
                 json.dump(default_config, f, indent=4)
@@ -52,22 +171,39 @@ class DoccleDownloader:
         with open(config_path, 'r') as f:
             return json.load(f)
 
+    @property
+    def base_url(self):
+        """Doccle site root, configurable so the downloader can run against a local stand-in"""
+        return (self.config.get('base_url') or BASE_URL).rstrip('/')
+
     def setup_logging(self):
         """Setup logging to file and console"""
         log_folder = Path("logs")
         log_folder.mkdir(exist_ok=True)
 
+        self.logger = logging.getLogger(__name__)
+        if logging.getLogger().handlers:
+            return  # Already configured by an earlier instance in this process
+
         log_file = log_folder / f"doccle_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 
+        # File and console output happen on a background thread; callers only enqueue records
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)  # Drains the queue before the process exits
+
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
+            format='%(message)s',
+            handlers=[QueueHandler(log_queue)]
         )
-        self.logger = logging.getLogger(__name__)
 
     def setup_driver(self):
         """Setup Chrome driver with download preferences"""
@@ -85,82 +221,254 @@ class DoccleDownloader:
             "safebrowsing.enabled": True,
             "plugins.always_open_pdf_externally": True  # Download PDFs instead of opening
         }
+        if self.lean_mode:
+            # Skip images and other non-essential content, and return from driver.get()
+            # as soon as the DOM is ready instead of after every subresource
+            prefs.update(LEAN_PREFS)
+            chrome_options.page_load_strategy = 'eager'
         chrome_options.add_experimental_option("prefs", prefs)
 
         if self.config.get('headless', False):
             chrome_options.add_argument('--headless')
             chrome_options.add_argument('--disable-gpu')
 
+        # Keep cookies and storage in a persistent Chrome profile if configured
+        if self.config.get('chrome_profile_dir'):
+            chrome_options.add_argument(f"--user-data-dir={Path(self.config['chrome_profile_dir']).absolute()}")
+
         # Additional options for stability
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--window-size=1920,1080')
 
         self.logger.info("Setting up Chrome driver...")
-        service = Service(ChromeDriverManager().install())
+        service = Service(self.resolve_driver_path())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, self.config['wait_timeout'])
+        self.current_window = None
+        if self.profiler:
+            self.profiler.instrument(self.driver)
+        self.apply_url_blocking()
+        self.setup_run_helpers()
+
+    def setup_run_helpers(self):
+        """Create the per-run helpers that wrap the current driver"""
+        download_folder = Path(self.config['download_folder'])
+        download_folder.mkdir(parents=True, exist_ok=True)
+
+        if self.download_tracker:
+            self.download_tracker.close()  # Left over from prewarm()
+
+        ready_states = EAGER_READY_STATES if self.lean_mode else ("complete",)
+        self.waiter = Waiter(self.driver, self.logger, self.wait_limits(), ready_states=ready_states)
+        self.selectors = SelectorResolver(self.driver, self.waiter, self.logger)
+        if self.config.get('reuse_session', True) and not self.config.get('chrome_profile_dir'):
+            self.session_store = SessionStore(self.logger, self.config.get('session_file', SESSION_FILE))
+        self.download_tracker = DownloadTracker(
+            self.driver, download_folder, self.waiter, self.logger,
+            collect_folder=self.archive.staging_folder if self.archive else None
+        )
 
         self.logger.info(f"Download folder: {download_folder}")
 
-    def login(self):
-        """Login to Doccle"""
+    @property
+    def lean_mode(self):
+        """Whether the lean page-load profile is enabled"""
+        return bool(self.config.get('lean_mode', False))
+
+    def apply_url_blocking(self):
+        """Block images, fonts and trackers in the current tab when the lean profile is enabled"""
+        if not self.lean_mode:
+            return
+        try:
+            block_urls(self.driver, blocked_url_patterns(self.config))
+        except Exception as e:
+            self.logger.debug(f"Could not block URLs: {e}")
+
+    def resolve_driver_path(self):
+        """Locate the chromedriver binary, re-resolving only when the Chrome version changed"""
+        if not self.driver_path:
+            self.driver_path = resolve_chromedriver(self.logger)
+        return self.driver_path
+
+    def browser_alive(self):
+        """Check whether a browser from an earlier run is still usable"""
+        if not self.driver:
+            return False
         try:
+            self.driver.current_window_handle
+            return True
+        except Exception:
+            self.driver = None
+            return False
+
+    def reset_windows(self):
+        """Close leftover tabs of an earlier run and return to a single tab"""
+        handles = self.driver.window_handles
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+        self.current_window = handles[0]
+        self.dashboard_window = None
+        self.detail_window = None
+
+    def close_browser(self):
+        """Quit the browser"""
+        self.session_checked_at = None
+        if self.driver:
+            self.logger.info("Closing browser...")
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self.logger.debug(f"Error closing browser: {e}")
+            self.driver = None
+
+    def prewarm(self, check_session=True):
+        """Resolve chromedriver, start Chrome and optionally check the saved session before run()
+
+        run() then reuses the browser as a warm one and skips a fresh session check.
+        """
+        self.setup_driver()
+        if check_session and self.config.get('reuse_session', True) and self.session_store:
+            if self.restore_session():
+                self.session_checked_at = time.monotonic()
+
+    def reload_config(self, config_path="config.json"):
+        """Re-read config.json, closing a warm browser if browser settings changed"""
+        config = self.load_config(config_path)
+        browser_keys = ('headless', 'download_folder', 'chrome_profile_dir', 'username')
+        if any(config.get(key) != self.config.get(key) for key in browser_keys):
+            self.close_browser()
+        self.config = config
+
+    def spawn_worker(self, download_folder):
+        """Create a headless worker downloader sharing this instance's config and logger"""
+        config = dict(self.config)
+        config.update({
+            "download_folder": str(download_folder),
+            "headless": True,
+            "download_engine": "browser",
+            "use_manifest": False,
+            "post_process": False,
+            "index_xml": False,
+            "reuse_session": False,
+            "chrome_profile_dir": None,
+        })
+        worker = DoccleDownloader(config=config, logger=self.logger)
+        worker.driver_path = self.resolve_driver_path()
+        worker.report = self.report
+        worker.navigator = self.navigator
+        worker.profiler = self.profiler
+        return worker
+
+    def load_session_cookies(self, cookies):
+        """Copy session cookies from another browser so this one is logged in too"""
+        self.navigate(self.base_url + "/")
+        for cookie in cookies:
+            cookie = {k: v for k, v in cookie.items() if k in COOKIE_FIELDS}
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception as e:
+                self.logger.debug(f"Could not copy cookie {cookie.get('name')}: {e}")
+
+    def wait_limits(self):
+        """Per-step wait limits, derived from wait_timeout unless overridden in config"""
+        timeout = self.config['wait_timeout']
+        limits = {
+            "page_load": timeout,
+            "login": timeout,
+            "document_list": timeout,
+            "detail_page": timeout,
+        }
+        limits.update(self.config.get('wait_limits') or {})
+        return limits
+
+    def pace(self):
+        """Wait for the navigation scheduler before a click that sends a request"""
+        if self.navigator:
+            self.navigator.acquire()
+
+    def navigate(self, url):
+        """Load a page through the navigation scheduler, backing off while the site throttles"""
+        attempts = max(1, int(self.config.get('navigation_attempts', 3)))
+        for attempt in range(1, attempts + 1):
+            self.pace()
+            self.driver.get(url)
+            problem = self.navigator.check_page(self.driver) if self.navigator else None
+            if not problem:
+                if self.navigator:
+                    self.navigator.succeeded()
+                return
+            self.navigator.throttled(problem)
+        raise Exception(f"Site answered {problem} for {url[:80]} after {attempts} attempts")
+
+    def profile_document(self, doc_number):
+        """Attribute WebDriver commands to a document in --profile mode"""
+        if self.profiler:
+            return self.profiler.document(doc_number)
+        return nullcontext()
+
+    def span(self, name, doc=None, **fields):
+        """Time a block in the run report (a no-op outside run())"""
+        if self.report:
+            return self.report.span(name, doc=doc, **fields)
+        return nullcontext({})
+
+    def login(self, warm=False):
+        """Login to Doccle, reusing a saved session when it is still valid
+
+        With warm the browser is still logged in from the previous run, so the dashboard is
+        checked first and the saved session is only restored when that shows a login form.
+        """
+        try:
+            if warm:
+                self.navigate(self.base_url + DASHBOARD_PATH)
+                self.waiter.page_ready()
+                if self.waiter.until(self.detect_page_state, "login", "login form or document list") == "dashboard":
+                    self.logger.info("Still logged in from the previous run")
+                    return True
+                self.logger.info("Warm browser is no longer logged in")
+
+            checked_at, self.session_checked_at = self.session_checked_at, None
+            if checked_at and time.monotonic() - checked_at < PREWARM_SESSION_MAX_AGE:
+                self.logger.info("Using the session checked at startup")
+                # Reload so the document list is current
+                self.navigate(self.base_url + DASHBOARD_PATH)
+                return True
+
+            if self.restore_session():
+                return True
+
             self.logger.info("Navigating to Doccle login page...")
-            self.driver.get("https://secure.doccle.be/doccle-euui/dashboard")
+            self.navigate(self.base_url + DASHBOARD_PATH)
 
             # Wait for login page to load
-            time.sleep(2)
+            self.waiter.page_ready()
 
             # Check if we need to login or already logged in
             current_url = self.driver.current_url
             self.logger.info(f"Current URL: {current_url}")
 
-            # Look for username field (adjust selectors based on actual page)
-            # These are common selectors - may need adjustment
-            username_selectors = [
-                (By.ID, "username"),
-                (By.NAME, "username"),
-                (By.ID, "j_username"),
-                (By.NAME, "j_username"),
-                (By.CSS_SELECTOR, "input[type='text']"),
-                (By.CSS_SELECTOR, "input[type='email']")
-            ]
-
-            username_field = None
-            for selector_type, selector_value in username_selectors:
-                try:
-                    username_field = self.wait.until(
-                        EC.presence_of_element_located((selector_type, selector_value))
-                    )
-                    self.logger.info(f"Found username field with: {selector_type}={selector_value}")
-                    break
-                except TimeoutException:
-                    continue
+            # The dashboard may render its list after readyState, so race both states
+            state = self.waiter.until(self.detect_page_state, "login", "login form or document list")
+            if state == "dashboard":
+                self.logger.info("Already logged in")
+                self.save_session()
+                return True
 
-            if not username_field:
+            # Look for username field; all selectors are raced in one polling loop
+            match = self.selectors.find("login.username", USERNAME_SELECTORS, step="page_load", description="username field")
+            if not match:
                 raise Exception("Could not find username field")
+            username_field, (selector_type, selector_value), _, _ = match
+            self.logger.info(f"Found username field with: {selector_type}={selector_value}")
 
             # Find password field
-            password_selectors = [
-                (By.ID, "password"),
-                (By.NAME, "password"),
-                (By.ID, "j_password"),
-                (By.NAME, "j_password"),
-                (By.CSS_SELECTOR, "input[type='password']")
-            ]
-
-            password_field = None
-            for selector_type, selector_value in password_selectors:
-                try:
-                    password_field = self.driver.find_element(selector_type, selector_value)
-                    self.logger.info(f"Found password field with: {selector_type}={selector_value}")
-                    break
-                except NoSuchElementException:
-                    continue
-
-            if not password_field:
+            match = self.selectors.find("login.password", PASSWORD_SELECTORS)
+            if not match:
                 raise Exception("Could not find password field")
+            password_field, (selector_type, selector_value), _, _ = match
+            self.logger.info(f"Found password field with: {selector_type}={selector_value}")
 
             # Enter credentials
             self.logger.info("Entering credentials...")
@@ -171,36 +479,24 @@ class DoccleDownloader:
             password_field.send_keys(self.config['password'])
 
             # Find and click login button
-            login_button_selectors = [
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.ID, "login-button"),
-                (By.NAME, "submit"),
-                (By.XPATH, "//button[contains(text(), 'Log in')]"),
-                (By.XPATH, "//button[contains(text(), 'Aanmelden')]"),
-                (By.XPATH, "//input[@type='submit']")
-            ]
-
-            login_button = None
-            for selector_type, selector_value in login_button_selectors:
-                try:
-                    login_button = self.driver.find_element(selector_type, selector_value)
-                    self.logger.info(f"Found login button with: {selector_type}={selector_value}")
-                    break
-                except NoSuchElementException:
-                    continue
-
-            if not login_button:
+            match = self.selectors.find("login.button", LOGIN_BUTTON_SELECTORS)
+            if not match:
                 raise Exception("Could not find login button")
+            login_button, (selector_type, selector_value), _, _ = match
+            self.logger.info(f"Found login button with: {selector_type}={selector_value}")
 
+            self.pace()
             login_button.click()
             self.logger.info("Clicked login button")
 
             # Wait for dashboard to load
-            time.sleep(2)
+            self.waiter.until(lambda d: "dashboard" in d.current_url.lower(), "login", "dashboard URL")
+            self.waiter.page_ready()
 
             # Check if login was successful
             if "dashboard" in self.driver.current_url.lower():
                 self.logger.info("Login successful!")
+                self.save_session()
                 return True
             else:
                 self.logger.error(f"Login may have failed. Current URL: {self.driver.current_url}")
@@ -210,290 +506,545 @@ class DoccleDownloader:
             self.logger.error(f"Login failed: {str(e)}")
             raise
 
-    def get_documents(self):
-        """Find and download all available documents"""
-        try:
-            self.logger.info("Looking for documents...")
+    def restore_session(self):
+        """Load the saved session and check it with a single dashboard visit"""
+        if not self.session_store:
+            return False
+        if not self.session_store.restore(self.driver, self.base_url, navigate=self.navigate):
+            return False
 
-            # Store the dashboard URL
-            dashboard_url = self.driver.current_url
+        self.navigate(self.base_url + DASHBOARD_PATH)
+        self.waiter.page_ready()
+        state = self.waiter.until(self.detect_page_state, "login", "login form or document list")
+        if state == "dashboard" or (state is None and "dashboard" in self.driver.current_url.lower()):
+            self.logger.info("Saved session is still valid, skipping login form")
+            return True
 
-            # Wait for page to fully load
-            time.sleep(1)
+        self.logger.info("Saved session expired, logging in again")
+        self.session_store.clear(self.driver)
+        return False
 
-            # Apply filters if needed
+    def detect_page_state(self, driver):
+        """Return "login" when a login form is shown, "dashboard" when documents are listed"""
+        if self.selectors.find("login.password", PASSWORD_SELECTORS):
+            return "login"
+        if "dashboard" in driver.current_url.lower() and self.enumerate_documents():
+            return "dashboard"
+        return None
+
+    def save_session(self):
+        """Persist the logged-in session for the next run"""
+        if not self.session_store:
+            return
+        try:
+            self.session_store.save(self.driver)
+        except Exception as e:
+            self.logger.warning(f"Could not save login session: {e}")
+
+    def get_documents(self, records=None):
+        """Find and download all available documents
+
+        With records (dashboard records from failed.jsonl) only those are processed and the
+        dashboard is not enumerated.
+        """
+        try:
             max_docs = self.config.get('max_documents')
-            only_unread = self.config.get('only_unread', False)
+            only_unread = self.config.get('only_unread', False) and records is None
+
+            if records is not None:
+                self.logger.info(f"Retrying {len(records)} document(s) from {self.failed_log_path()}...")
+            else:
+                self.logger.info("Looking for documents...")
+
+                # Wait for the document list to render
+                self.wait_for_document_list()
 
             if only_unread:
                 self.logger.info("Filtering for unread documents only...")
                 # Try to click unread filter if available
                 try:
                     unread_filter = self.driver.find_element(By.XPATH, "//button[contains(text(), 'Unread') or contains(text(), 'Ongelezen')]")
+                    self.pace()
                     unread_filter.click()
-                    time.sleep(2)
+                    self.waiter.page_ready()
+                    self.wait_for_document_list()
                 except:
                     self.logger.warning("Could not find unread filter button")
 
-            download_count = 0
-            processed_count = 0
-
-            # Keep processing until we reach max_documents or run out of documents
-            while True:
-                # Make sure we're on the dashboard
-                if not self.driver.current_url.startswith(dashboard_url.split('?')[0]):
-                    self.logger.debug("Returning to dashboard...")
-                    self.driver.get(dashboard_url)
-                    time.sleep(3)
-
-                # Re-query documents each iteration to avoid stale elements
-                documents = self.find_document_elements()
-
-                if not documents:
-                    self.logger.warning("No documents found")
-                    break
+            # Stream document records batch by batch; detail pages open in a separate tab
+            # so the dashboard keeps its scroll position while more documents load
+            self.dashboard_window = self.current_window = self.driver.current_window_handle
+            self.documents_seen = 0
+            source = iter(records) if records is not None else self.iter_documents()
+            candidates = self.select_documents(source, only_unread, newest_first=records is None)
+
+            workers = int(self.config.get('workers') or 1)
+            if workers > 1:
+                if self.http_downloader:
+                    self.logger.warning("Browser workers are not used with the HTTP download engine")
+                else:
+                    download_count = BrowserWorkerPool(self, workers).run(candidates, max_docs)
+                    candidates.close()
+                    self.log_documents_seen()
+                    return download_count + self.run_retries()
 
-                self.logger.info(f"Found {len(documents)} total documents on page")
+            download_count = 0
 
-                # Process documents one by one
-                for i in range(len(documents)):
-                    # Make sure we're on the dashboard before re-querying
-                    if not self.driver.current_url.startswith(dashboard_url.split('?')[0]):
-                        self.logger.debug("Returning to dashboard before re-query...")
-                        self.driver.get(dashboard_url)
-                        time.sleep(2)
+            for processed_count, doc in candidates:
+                try:
+                    self.logger.info(f"Processing document {processed_count}...")
 
-                    # Re-query to avoid stale elements
-                    documents = self.find_document_elements()
-                    if i >= len(documents):
-                        break
+                    # Try to download
+                    if self.process_document(doc, processed_count):
+                        download_count += 1
+                        self.logger.info(f"[OK] Downloaded document {processed_count} (total: {download_count})")
 
-                    doc = documents[i]
+                        # Check if we've hit the limit
+                        if max_docs and download_count >= max_docs:
+                            self.logger.info(f"Reached maximum document limit: {max_docs}")
+                            break
+                    else:
+                        self.logger.warning(f"[FAIL] Could not download document {processed_count}")
+                        self.schedule_retry(processed_count, doc)
 
-                    try:
-                        processed_count += 1
-                        self.logger.info(f"Processing document {processed_count}...")
-
-                        # Log element details for debugging
-                        try:
-                            self.logger.debug(f"Document class: {doc.get_attribute('class')}")
-                            self.logger.debug(f"Document HTML: {doc.get_attribute('outerHTML')[:200]}")
-                        except:
-                            pass
-
-                        # Check if document is already read/opened (if filtering)
-                        if only_unread and self.is_document_read(doc):
-                            self.logger.info(f"Skipping document {processed_count} - already read")
-                            continue
-
-                        # Try to download
-                        if self.download_document(doc, processed_count):
-                            download_count += 1
-                            self.logger.info(f"[OK] Downloaded document {processed_count} (total: {download_count})")
-
-                            # Check if we've hit the limit
-                            if max_docs and download_count >= max_docs:
-                                self.logger.info(f"Reached maximum document limit: {max_docs}")
-                                return download_count
-                        else:
-                            self.logger.warning(f"[FAIL] Could not download document {processed_count}")
+                except Exception as e:
+                    self.logger.warning(f"Error processing document {processed_count}: {str(e)}")
+                    self.schedule_retry(processed_count, doc, str(e))
+                    continue
 
-                    except Exception as e:
-                        self.logger.warning(f"Error processing document {processed_count}: {str(e)}")
-                        continue
+            # Stop enumerating (closes the generator) before collecting HTTP results
+            candidates.close()
+            self.log_documents_seen()
 
-                # If we've processed all documents on this page, we're done
-                break
+            if self.http_downloader:
+                download_count -= self.collect_http_downloads()
 
-            return download_count
+            return download_count + self.run_retries()
 
         except Exception as e:
             self.logger.error(f"Error getting documents: {str(e)}")
             raise
 
-    def find_document_elements(self):
-        """Find all document elements on the current page"""
-        # Try different selectors to find documents
-        document_selectors = [
-            (By.CSS_SELECTOR, "div.document"),
-            (By.CSS_SELECTOR, "[class*='document-item']"),
-            (By.CSS_SELECTOR, "[class*='documentItem']"),
-            (By.CSS_SELECTOR, ".document-list-item"),
-            (By.XPATH, "//div[contains(@class, 'document')]"),
-        ]
-
-        for selector_type, selector_value in document_selectors:
-            try:
-                documents = self.driver.find_elements(selector_type, selector_value)
-                if documents:
-                    self.logger.debug(f"Found {len(documents)} documents with: {selector_type}={selector_value}")
-                    return documents
-            except Exception as e:
-                continue
-
-        return []
-
-    def is_document_read(self, doc_element):
-        """Check if a document has already been read/opened"""
+    def log_documents_seen(self):
+        if self.documents_seen:
+            self.logger.info(f"Enumerated {self.documents_seen} documents")
+        else:
+            self.logger.warning("No documents found")
+
+    def iter_documents(self):
+        """Yield dashboard records as they load, switching back to the dashboard tab only to load a batch"""
+        records = iter_document_records(
+            self.driver, self.waiter, self.logger, pace=self.pace,
+            activate=lambda: self.switch_to_window(self.dashboard_window)
+        )
+        enumerating = 0.0
+        count = 0
+        first_start = time.monotonic()
         try:
-            # Look for indicators that document is unread
-            # Common patterns: 'unread' class, 'new' badge, bold text, etc.
-            classes = doc_element.get_attribute('class') or ''
-
-            # If it has 'unread' or 'new' class, it's unread
-            if 'unopened' in classes.lower() or 'new' in classes.lower():
-                return False
+            while True:
+                start = time.monotonic()
+                try:
+                    record = next(records)
+                except StopIteration:
+                    return
+                finally:
+                    enumerating += time.monotonic() - start
+                count += 1
+                yield record
+        finally:
+            # One span for all enumeration work, which is interleaved with the downloads
+            if self.report:
+                self.report.record("enumerate", enumerating, start=first_start, kind="phase", documents=count)
+
+    def select_documents(self, documents, only_unread, newest_first=True):
+        """Drop already downloaded, filtered out (and, if filtering, read) documents; yields (number, record) pairs
+
+        newest_first means documents come in dashboard order, so enumeration can stop early.
+        """
+        known_in_a_row = 0
+        for doc_number, doc in enumerate(documents, start=1):
+            self.documents_seen = doc_number
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Document {doc_number} record: {doc}")
+
+            # Date and sender filters only need the dashboard record
+            if self.document_filter:
+                if newest_first and self.document_filter.before_window(doc):
+                    self.logger.info(
+                        f"Document {doc_number} is dated before {self.document_filter.since}, not looking further"
+                    )
+                    return
+                reason = self.document_filter.rejects(doc)
+                if reason:
+                    self.logger.info(f"Skipping document {doc_number} - {reason}")
+                    continue
 
-            # If it has 'read' or 'opened' class, it's read
-            if 'read' in classes.lower() or 'opened' in classes.lower():
-                return True
+            # Skip documents recorded in the manifest by an earlier run
+            if self.manifest and doc['detail_url'] and self.manifest.contains(doc['detail_url']):
+                self.logger.info(f"Skipping document {doc_number} - already downloaded")
+                # The dashboard lists newest documents first, so a long run of known ones
+                # means everything further down was downloaded before
+                known_in_a_row += 1
+                if newest_first and self.stop_after_known and known_in_a_row >= self.stop_after_known:
+                    self.logger.info(f"{known_in_a_row} known documents in a row, not looking further")
+                    return
+                continue
+            known_in_a_row = 0
 
-            # Default: assume unread if we can't determine
-            return False
+            # Check if document is already read/opened (if filtering)
+            if only_unread and self.is_document_read(doc):
+                self.logger.info(f"Skipping document {doc_number} - already read")
+                continue
 
+            if self.report:
+                self.report.document_found()
+            if doc['detail_url']:
+                self.document_records[doc['detail_url']] = doc
+            yield doc_number, doc
+
+    def collect_http_downloads(self, main_pass=True):
+        """Wait for queued HTTP downloads and return how many documents failed
+
+        A document counts as failed when any of its files failed. Files that did arrive are
+        removed rather than recorded, and the retry fetches the document with the browser.
+        Failures of the main pass are scheduled for a retry and moved to failed in the run
+        report, which counted the documents as downloaded when they were queued.
+        """
+        self.logger.info("Waiting for HTTP downloads to finish...")
+        failed = 0
+        for doc_number, (files, failed_urls) in self.http_downloader.join().items():
+            detail_url = self.http_documents.pop(doc_number, None)
+            if self.archive:
+                files = [self.archive.staged_name(name) for name in files]
+            if files and not failed_urls:
+                self.downloaded_files.update(files)
+                self.record_download(detail_url, files)
+            else:
+                failed += 1
+                self.discard_files(files)
+                self.browser_only.add(detail_url)
+                self.logger.warning(
+                    f"[FAIL] Could not download {len(failed_urls)} file(s) of document {doc_number} over HTTP, "
+                    f"the browser will fetch it instead"
+                )
+                if main_pass:
+                    if self.report:
+                        self.report.document_failed_later()
+                    doc = self.document_records.get(detail_url) or {'detail_url': detail_url}
+                    self.schedule_retry(doc_number, doc, "HTTP download failed")
+        return failed
+
+    def discard_files(self, file_names):
+        """Delete files of a document that is not recorded, so its retry starts clean"""
+        for name in file_names:
+            try:
+                (Path(self.config['download_folder']) / name).unlink()
+            except OSError as e:
+                self.logger.debug(f"Could not remove {name}: {e}")
+
+    def schedule_retry(self, doc_number, doc, error=None):
+        """Queue a failed document for another attempt after the main pass"""
+        if self.retry is not None:
+            self.retry.add(doc_number, doc, error=error)
+
+    def run_retries(self):
+        """Retry queued failures with backoff; returns how many were downloaded after all"""
+        if self.retry is None or not len(self.retry):
+            return 0
+        self.logger.info(f"Retrying {len(self.retry)} failed document(s)...")
+        with self.span("retries", kind="phase"):
+            return self.retry.run(self.retry_document)
+
+    def retry_document(self, doc, doc_number, attempt):
+        """One retry attempt, waiting for the HTTP engine so the outcome is known right away"""
+        with self.span("document", doc=doc_number, kind="retry", attempt=attempt) as span, \
+                self.profile_document(doc_number):
+            ok = self.download_document(doc, doc_number)
+            if ok and doc_number in self.http_documents:
+                ok = self.collect_http_downloads(main_pass=False) == 0
+            span['ok'] = bool(ok)
+        if ok and self.report:
+            self.report.document_recovered()
+        return ok
+
+    def failed_log_path(self):
+        return self.config.get('failed_file', FAILED_FILE)
+
+    def update_failed_log(self):
+        """Write documents that ran out of attempts to failed.jsonl and drop downloaded ones"""
+        failed_log = FailedLog(self.failed_log_path())
+        succeeded = set(self.document_files) - self.integrity_failures
+        if self.manifest:
+            succeeded.update(
+                e['detail_url'] for e in failed_log.load()
+                if e.get('detail_url') and self.manifest.contains(e['detail_url'])
+            )
+        try:
+            remaining = failed_log.update(self.retry.exhausted, succeeded)
+        except OSError as e:
+            self.logger.warning(f"Could not update {failed_log.path}: {e}")
+            return
+        if self.retry.exhausted:
+            self.logger.warning(
+                f"{len(self.retry.exhausted)} document(s) could not be downloaded; "
+                f"run with --retry-failed to try them again"
+            )
+        if remaining:
+            self.logger.info(f"{remaining} document(s) listed in {failed_log.path}")
+
+    def record_download(self, detail_url, file_names):
+        """Remember a downloaded document, passing its files through post-processing first if enabled"""
+        if not detail_url:
+            return
+        if self.post_processor:
+            self.post_processor.submit(detail_url, file_names, self.document_records.get(detail_url))
+            return
+        if self.archive and self.archive.sharded:
+            file_names = self.file_away(detail_url, file_names)
+        self.store_download(detail_url, file_names)
+
+    def file_away(self, detail_url, file_names):
+        """Move a document's files from staging into the archive without post-processing"""
+        doc = self.document_records.get(detail_url)
+        final_names = []
+        for name in file_names:
+            path = Path(self.config['download_folder']) / name
+            if path.is_file():
+                name = self.archive.relative_name(self.archive.finalize(path, doc))
+            final_names.append(name)
+        self.downloaded_files.difference_update(file_names)
+        self.downloaded_files.update(final_names)
+        return final_names
+
+    def store_download(self, detail_url, file_names, hashes=None):
+        """Remember a downloaded document for this run, in the manifest and in the XML index"""
+        self.document_files[detail_url] = list(file_names)
+        if self.document_index:
+            for name in file_names:
+                if name.lower().endswith('.xml'):
+                    self.document_index.add(Path(self.config['download_folder']) / name, detail_url)
+        if not self.manifest:
+            return
+        try:
+            self.manifest.record(detail_url, file_names, hashes)
         except Exception as e:
-            self.logger.debug(f"Could not determine read status: {str(e)}")
-            return False
+            self.logger.warning(f"Could not update download manifest: {e}")
+
+    def setup_post_processor(self, incremental=False):
+        """Create the thread pool that checks, deduplicates and renames finished downloads
+
+        Incremental runs reuse the hashes known at the end of the last run instead of
+        checking every file recorded in the manifest.
+        """
+        if incremental and self.known_hashes is not None:
+            known_hashes = self.known_hashes
+        else:
+            known_hashes = self.manifest.file_hashes() if self.manifest else {}
+        self.post_processor = PostProcessor(
+            self.config['download_folder'],
+            self.logger,
+            workers=self.config.get('post_process_workers', 2),
+            rename=self.config.get('rename_files', True),
+            name_template=self.config.get('file_name_template'),
+            duplicates=self.config.get('duplicates', 'link'),
+            known_hashes=known_hashes,
+            archive=self.archive
+        )
 
-    def download_document(self, doc_element, doc_number):
-        """Attempt to download a single document"""
+    def collect_post_processing(self):
+        """Wait for post-processing and record the final file names"""
+        results = self.post_processor.join()
+        for detail_url, original_names, final_names, hashes, ok in results:
+            self.downloaded_files.difference_update(original_names)
+            self.downloaded_files.update(final_names)
+            if ok:
+                self.store_download(detail_url, final_names, hashes)
+            else:
+                # Keep the document out of the manifest and list it in failed.jsonl so it is fetched again
+                self.integrity_failures.add(detail_url)
+                if self.report:
+                    self.report.document_failed_later()
+                if self.retry is not None:
+                    doc = self.document_records.get(detail_url) or {'detail_url': detail_url}
+                    self.retry.give_up(None, doc, error="a file failed its integrity check")
+                self.logger.warning(f"Not marking {detail_url} as downloaded: a file failed its integrity check")
+        if results:
+            self.logger.info(f"Post-processed {len(results)} document(s)")
+
+    def setup_http_downloader(self):
+        """Create the HTTP download engine from the logged-in browser session"""
+        self.http_downloader = HttpDownloader(
+            self.archive.staging_folder if self.archive else self.config['download_folder'],
+            self.logger,
+            workers=self.config.get('http_workers', 4),
+            timeout=max(self.config['wait_timeout'], 30),
+            navigator=self.navigator
+        )
+        self.http_downloader.load_browser_session(self.driver)
+
+    def document_list_fingerprint(self):
+        """Hash of the ordered detail URLs on the freshly loaded dashboard
+
+        Only the first rendered batch is read, so this costs one page load. Returns None
+        when the dashboard does not show a document list, e.g. because the session expired.
+        """
+        self.navigate(self.base_url + DASHBOARD_PATH)
+        self.waiter.page_ready()
+        if self.waiter.until(self.detect_page_state, "document_list", "login form or document list") != "dashboard":
+            return None
+        urls = [record['detail_url'] or '' for record in self.enumerate_documents()]
+        return hashlib.sha256("\n".join(urls).encode('utf-8')).hexdigest()
+
+    def wait_for_document_list(self):
+        """Wait until the dashboard shows its document list"""
+        self.waiter.page_ready()
+        return self.waiter.until(lambda d: self.enumerate_documents(), "document_list", "document list")
+
+    def enumerate_documents(self):
+        """Return a record (detail URL, classes, sender, date, title) per rendered dashboard document"""
+        result = collect_document_records(self.driver)
+        if result['records'] and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Found {len(result['records'])} documents with: {result['selector']}")
+        return result['records']
+
+    def switch_to_window(self, handle):
+        """Make a browser tab current unless it already is"""
+        if handle and self.current_window != handle:
+            self.driver.switch_to.window(handle)
+            self.current_window = handle
+
+    def switch_to_detail_window(self):
+        """Open document detail pages in their own tab, leaving the dashboard tab alone"""
+        if not self.dashboard_window:
+            return
+        if self.detail_window:
+            try:
+                self.switch_to_window(self.detail_window)
+                return
+            except NoSuchWindowException:
+                self.logger.debug("Detail tab was closed, opening a new one")
+        self.driver.switch_to.new_window('tab')
+        self.detail_window = self.current_window = self.driver.current_window_handle
+        self.apply_url_blocking()
+
+    def close_extra_windows(self):
+        """Close tabs opened by "Open/print in new window" buttons"""
+        keep = {self.dashboard_window, self.detail_window}
+        current = self.current_window or self.driver.current_window_handle
+        for handle in self.driver.window_handles:
+            if handle not in keep and handle != current:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+        self.driver.switch_to.window(current)
+
+    def is_document_read(self, doc):
+        """Check if a document record has already been read/opened"""
+        return is_read(doc.get('classes'))
+
+    def process_document(self, doc, doc_number):
+        """Download one document inside a timing span and update the run's progress"""
+        with self.span("document", doc=doc_number, kind="document") as span, self.profile_document(doc_number):
+            ok = self.download_document(doc, doc_number)
+            span['ok'] = bool(ok)
+        if self.report:
+            self.report.document_finished(ok)
+        return ok
+
+    def download_document(self, doc, doc_number):
+        """Attempt to download a single document from its dashboard record"""
         try:
-            # Scroll element into view
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", doc_element)
-            time.sleep(0.5)
-
-            # Get initial file count
-            initial_files = self.get_download_files()
-
-            # Try to get the detail URL from the document element
-            detail_url = doc_element.get_attribute('data-url-detail')
+            detail_url = doc.get('detail_url')
 
             if detail_url:
                 # Navigate to the document detail page
-                base_url = "https://secure.doccle.be"
-                full_url = base_url + detail_url if not detail_url.startswith('http') else detail_url
+                full_url = self.base_url + detail_url if not detail_url.startswith('http') else detail_url
 
                 self.logger.info(f"Doc {doc_number}: Opening document at {full_url[:80]}...")
-                self.driver.get(full_url)
+                with self.span("detail_page", doc=doc_number, kind="step"):
+                    self.switch_to_detail_window()
+                    self.navigate(full_url)
+
+                    # Wait for the page and its download buttons to render
+                    self.waiter.page_ready()
+                    self.selectors.find(
+                        "detail.ready",
+                        OPEN_PRINT_SELECTORS + XML_BUTTON_SELECTORS,
+                        keywords=["open", "print", "download", "xml"],
+                        step="detail_page",
+                        description="download buttons"
+                    )
 
-                # Wait for page to load
-                time.sleep(3)
+                # Fetch the files directly over HTTP when the engine is enabled
+                if self.http_downloader and detail_url not in self.browser_only:
+                    with self.span("http_queue", doc=doc_number, kind="step"):
+                        queued = self.download_via_http(doc_number, full_url)
+                    if queued:
+                        self.http_documents[doc_number] = detail_url
+                        return True
 
-                # Track files downloaded
-                files_downloaded = 0
+                # Give this document its own download directory
+                self.download_tracker.begin(doc_number, key=detail_url)
 
                 # Look for the "Open/print document in new window" button
                 self.logger.debug(f"Doc {doc_number}: Looking for open/print button...")
-                try:
-                    # Look for the "Open/print document in new window" button
-                    button_selectors = [
-                        (By.XPATH, "//a[contains(text(), 'Open/print document in new window')]"),
-                        (By.XPATH, "//button[contains(text(), 'Open/print document in new window')]"),
-                        (By.XPATH, "//a[contains(text(), 'open') and contains(text(), 'print')]"),
-                        (By.XPATH, "//a[contains(text(), 'Open') or contains(text(), 'print')]"),
-                        (By.XPATH, "//button[contains(text(), 'Open') or contains(text(), 'print')]"),
-                        (By.CSS_SELECTOR, "a[target='_blank']"),
-                    ]
-
-                    open_print_btn = None
-                    for selector_type, selector_value in button_selectors:
-                        try:
-                            buttons = self.driver.find_elements(selector_type, selector_value)
-                            for btn in buttons:
-                                btn_text = btn.text.strip()
-                                if btn_text and ('open' in btn_text.lower() or 'print' in btn_text.lower() or 'download' in btn_text.lower()):
-                                    open_print_btn = btn
-                                    self.logger.info(f"Doc {doc_number}: Found button: '{btn_text}'")
-                                    break
-                            if open_print_btn:
-                                break
-                        except:
-                            continue
-
-                    if open_print_btn:
-                        # Click the button
-                        self.logger.debug(f"Doc {doc_number}: Files before open/print click: {initial_files}")
-                        open_print_btn.click()
-                        self.logger.info(f"Doc {doc_number}: Clicked open/print button, waiting for download...")
-
-                        # Wait for download to complete (PDFs download instantly)
-                        for attempt in range(10):  # Wait up to 10 seconds
-                            time.sleep(1)
-                            current_files = self.get_download_files()
-
-                            self.logger.debug(f"Doc {doc_number}: Attempt {attempt+1} - initial: {len(initial_files)}, current: {len(current_files)}")
-
-                            # Check if new file appeared
-                            if len(current_files) > len(initial_files):
-                                new_files = current_files - initial_files
-                                self.logger.info(f"Doc {doc_number}: Downloaded PDF: {list(new_files)}")
-                                self.downloaded_files.update(new_files)
-                                files_downloaded += len(new_files)
-                                # Update initial_files for the XML check
-                                initial_files = current_files
-                                break
+                with self.span("pdf", doc=doc_number, kind="step") as span:
+                    try:
+                        open_print_btn, href = self.find_open_print_button(doc_number)
+                        if open_print_btn and not self.payload_allowed(href, full_url, doc_number):
+                            open_print_btn = None
+
+                        if open_print_btn:
+                            # Click the button
+                            self.pace()
+                            open_print_btn.click()
+                            self.logger.info(f"Doc {doc_number}: Clicked open/print button, waiting for download...")
+
+                            # Wait for download to complete (PDFs download instantly)
+                            new_files = self.download_tracker.wait_for_new_files("PDF download")
+                            span['ok'] = bool(new_files)
+                            if new_files:
+                                self.logger.info(f"Doc {doc_number}: Downloaded PDF: {sorted(new_files)}")
 
-                except Exception as e:
-                    self.logger.debug(f"Doc {doc_number}: Error clicking open/print button: {e}")
+                    except Exception as e:
+                        span['ok'] = False
+                        self.logger.debug(f"Doc {doc_number}: Error clicking open/print button: {e}")
 
                 # Now look for "Download XML" button
                 self.logger.debug(f"Doc {doc_number}: Looking for Download XML button...")
-                try:
-                    xml_button_selectors = [
-                        (By.XPATH, "//a[contains(text(), 'Download XML')]"),
-                        (By.XPATH, "//button[contains(text(), 'Download XML')]"),
-                        (By.XPATH, "//a[contains(text(), 'XML')]"),
-                        (By.XPATH, "//button[contains(text(), 'XML')]"),
-                    ]
-
-                    xml_btn = None
-                    for selector_type, selector_value in xml_button_selectors:
-                        try:
-                            buttons = self.driver.find_elements(selector_type, selector_value)
-                            for btn in buttons:
-                                btn_text = btn.text.strip()
-                                if btn_text and 'xml' in btn_text.lower():
-                                    xml_btn = btn
-                                    self.logger.info(f"Doc {doc_number}: Found XML button: '{btn_text}'")
-                                    break
-                            if xml_btn:
-                                break
-                        except:
-                            continue
-
-                    if xml_btn:
-                        # Click the XML button
-                        self.logger.debug(f"Doc {doc_number}: Files before XML click: {initial_files}")
-                        xml_btn.click()
-                        self.logger.info(f"Doc {doc_number}: Clicked Download XML button, waiting for download...")
-
-                        # Wait for XML download
-                        for attempt in range(10):  # Wait up to 10 seconds
-                            time.sleep(1)
-                            current_files = self.get_download_files()
-
-                            self.logger.debug(f"Doc {doc_number}: XML attempt {attempt+1} - initial: {len(initial_files)}, current: {len(current_files)}")
-
-                            # Check if new file appeared
-                            if len(current_files) > len(initial_files):
-                                new_files = current_files - initial_files
-                                self.logger.info(f"Doc {doc_number}: Downloaded XML: {list(new_files)}")
-                                self.downloaded_files.update(new_files)
-                                files_downloaded += len(new_files)
-                                break
-                    else:
-                        self.logger.debug(f"Doc {doc_number}: No Download XML button found")
+                with self.span("xml", doc=doc_number, kind="step") as span:
+                    try:
+                        xml_btn, href = self.find_xml_button(doc_number)
+                        if xml_btn and not self.payload_allowed(href, full_url, doc_number):
+                            xml_btn = None
+
+                        if xml_btn:
+                            # Click the XML button
+                            self.pace()
+                            xml_btn.click()
+                            self.logger.info(f"Doc {doc_number}: Clicked Download XML button, waiting for download...")
+
+                            # Wait for XML download
+                            new_files = self.download_tracker.wait_for_new_files("XML download")
+                            span['ok'] = bool(new_files)
+                            if new_files:
+                                self.logger.info(f"Doc {doc_number}: Downloaded XML: {sorted(new_files)}")
+                        else:
+                            self.logger.debug(f"Doc {doc_number}: No Download XML button found")
 
-                except Exception as e:
-                    self.logger.debug(f"Doc {doc_number}: Error clicking Download XML button: {e}")
+                    except Exception as e:
+                        span['ok'] = False
+                        self.logger.debug(f"Doc {doc_number}: Error clicking Download XML button: {e}")
 
-                # Go back to dashboard
-                self.driver.back()
-                time.sleep(1)
+                # Move this document's files into the download folder
+                with self.span("collect_files", doc=doc_number, kind="step"):
+                    new_file_names = self.download_tracker.finish()
+                    self.downloaded_files.update(new_file_names)
+                    self.close_extra_windows()
 
                 # Success if at least one file was downloaded
-                if files_downloaded > 0:
-                    self.logger.info(f"Doc {doc_number}: Successfully downloaded {files_downloaded} file(s)")
+                if new_file_names:
+                    self.logger.info(f"Doc {doc_number}: Successfully downloaded {len(new_file_names)} file(s)")
+                    self.record_download(detail_url, new_file_names)
                     return True
                 else:
                     self.logger.warning(f"Doc {doc_number}: No files were downloaded")
@@ -504,51 +1055,98 @@ class DoccleDownloader:
 
         except Exception as e:
             self.logger.warning(f"Doc {doc_number}: Download attempt failed: {str(e)}")
+            self.current_window = None  # Ask the browser again in case the tab went away
             try:
-                # Try to get back to dashboard
-                if "dashboard" not in self.driver.current_url.lower():
-                    self.driver.back()
-                    time.sleep(2)
-            except:
+                self.downloaded_files.update(self.download_tracker.finish())
+            except Exception:
                 pass
             return False
 
-    def get_download_files(self):
-        """Get set of current files in download folder"""
-        try:
-            download_folder = Path(self.config['download_folder'])
-            if not download_folder.exists():
-                return set()
-
-            files = set()
-            for f in download_folder.iterdir():
-                if f.is_file() and not f.name.endswith('.crdownload') and not f.name.startswith('.'):
-                    files.add(f.name)
-            self.logger.debug(f"Current files in download folder: {files}")
-            return files
-        except Exception as e:
-            self.logger.debug(f"Error getting download files: {e}")
-            return set()
+    def find_open_print_button(self, doc_number):
+        """Find the "Open/print document in new window" button on a detail page; returns (button, href)"""
+        match = self.selectors.find("detail.open_print", OPEN_PRINT_SELECTORS, keywords=["open", "print", "download"])
+        if not match:
+            return None, None
+        btn, _, btn_text, href = match
+        self.logger.info(f"Doc {doc_number}: Found button: '{btn_text}'")
+        return btn, href
+
+    def find_xml_button(self, doc_number):
+        """Find the "Download XML" button on a detail page; returns (button, href)"""
+        match = self.selectors.find("detail.xml", XML_BUTTON_SELECTORS, keywords=["xml"])
+        if not match:
+            return None, None
+        btn, _, btn_text, href = match
+        self.logger.info(f"Doc {doc_number}: Found XML button: '{btn_text}'")
+        return btn, href
+
+    def payload_allowed(self, href, page_url, doc_number):
+        """Check that a download link does not point to a host outside allowed_download_hosts
+
+        The check only applies in lean mode or when allowed_download_hosts is configured.
+        """
+        if not (self.lean_mode or self.config.get('allowed_download_hosts')):
+            return True
+        url = file_url(page_url, href)
+        if url and not host_allowed(url, allowed_hosts(self.config, self.base_url)):
+            self.logger.warning(f"Doc {doc_number}: Not downloading from {url[:80]}: host is not allowed")
+            return False
+        return True
+
+    def download_via_http(self, doc_number, detail_url):
+        """Resolve the PDF/XML hrefs on the detail page and queue them on the HTTP engine"""
+        urls = []
+        for button, href in (self.find_open_print_button(doc_number), self.find_xml_button(doc_number)):
+            if not button or not self.payload_allowed(href, detail_url, doc_number):
+                continue
+            url = file_url(detail_url, href)
+            if not url:
+                # A button that only runs script has to be clicked, so let the browser fetch both files
+                self.logger.debug(f"Doc {doc_number}: A button has no direct file link, falling back to browser download")
+                return False
+            urls.append(url)
+
+        if not urls:
+            self.logger.debug(f"Doc {doc_number}: No direct file links found, falling back to browser download")
+            return False
 
-    def wait_for_downloads(self, timeout=60):
+        self.logger.info(f"Doc {doc_number}: Queued {len(urls)} file(s) for HTTP download")
+        self.http_downloader.submit(doc_number, urls, referer=detail_url)
+        return True
+
+    def wait_for_downloads(self, timeout=None):
         """Wait for all downloads to complete"""
         self.logger.info("Waiting for downloads to complete...")
         download_folder = Path(self.config['download_folder'])
 
-        end_time = time.time() + timeout
-        while time.time() < end_time:
-            # Check for .crdownload files (Chrome's temporary download files)
-            downloading = list(download_folder.glob("*.crdownload"))
-            if not downloading:
-                self.logger.info("All downloads completed")
-                return True
-            time.sleep(1)
+        # Check for .crdownload files (Chrome's temporary download files)
+        def downloads_finished(driver):
+            if self.download_tracker.redirect_supported:
+                return not self.download_tracker.pending_partials()
+            return not any(download_folder.glob("*.crdownload"))
+
+        finished = self.waiter.until(
+            downloads_finished,
+            "downloads_finish",
+            "downloads to complete",
+            poll_interval=0.5,
+            timeout=timeout
+        )
+        if finished:
+            self.logger.info("All downloads completed")
+            return True
 
         self.logger.warning("Timeout waiting for downloads to complete")
         return False
 
-    def run(self):
-        """Main execution method"""
+    def run(self, keep_browser=False, retry_failed=False, incremental=False):
+        """Main execution method
+
+        With keep_browser the logged-in browser stays open and the next run() reuses it.
+        With retry_failed only the documents listed in failed.jsonl are processed.
+        With incremental (for the sync service) a run that reuses the warm browser skips the
+        archive-wide scans and the session restore, so its cost does not grow with the archive.
+        """
         try:
             self.logger.info("=" * 60)
             self.logger.info("Starting Doccle Downloader")
@@ -558,13 +1156,78 @@ class DoccleDownloader:
             if not self.config.get('username') or not self.config.get('password'):
                 raise Exception("Username or password not set in config.json")
 
-            self.setup_driver()
+            self.downloaded_files = set()
+            self.document_files = {}
+            self.document_records = {}
+            self.browser_only = set()
+            self.integrity_failures = set()
+            self.document_filter = DocumentFilter.from_config(self.config)
+            if self.document_filter:
+                self.logger.info(f"Only downloading documents with {self.document_filter.describe()}")
+            self.retry = RetryScheduler(
+                self.logger,
+                max_attempts=self.config.get('retry_attempts', 3),
+                base_delay=self.config.get('retry_base_delay', 2.0),
+                max_delay=self.config.get('retry_max_delay', 60.0)
+            )
+            self.report = RunReport(
+                Path("logs") / f"{self.config.get('log_prefix', 'doccle')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+                self.logger,
+                on_progress=self.on_progress,
+                target=self.config.get('max_documents')
+            )
+
+            self.archive = Archive(self.config['download_folder'], self.config.get('archive_layout', 'flat'))
+            if self.config.get('requests_per_second', 5.0):
+                self.navigator = NavigationScheduler.from_config(self.config, self.logger)
+            if self.config.get('profile'):
+                self.profiler = CommandProfiler(self.logger)
+
+            warm = self.browser_alive()
+            incremental = incremental and warm
+            if warm:
+                self.logger.info("Reusing warm browser from previous run")
+                if self.profiler:
+                    self.profiler.instrument(self.driver)
+                self.reset_windows()
+                self.setup_run_helpers()
+            else:
+                self.setup_driver()
+
+            if self.config.get('use_manifest', True):
+                self.manifest = DownloadManifest(self.config['download_folder'])
+                self.logger.info(f"Download manifest has {self.manifest.count()} known document(s)")
+
+            if self.config.get('post_process', True):
+                self.setup_post_processor(incremental)
+
+            if self.config.get('index_xml', True):
+                self.document_index = DocumentIndex(self.config['download_folder'], self.logger)
+                if not incremental:
+                    # New XML files of incremental runs are indexed as they are stored
+                    self.document_index.update()
 
-            if self.login():
-                download_count = self.get_documents()
+            with self.waiter.phase("login"), self.span("login", kind="phase"):
+                logged_in = self.login(warm=incremental)
+
+            if logged_in:
+                if self.config.get('download_engine', 'browser') == 'http':
+                    self.setup_http_downloader()
+
+                with self.waiter.phase("documents"), self.span("documents", kind="phase"):
+                    if retry_failed:
+                        records = [e['record'] for e in FailedLog(self.failed_log_path()).load() if e.get('record')]
+                        if records:
+                            download_count = self.get_documents(records)
+                        else:
+                            self.logger.info("No failed documents to retry")
+                            download_count = 0
+                    else:
+                        download_count = self.get_documents()
 
                 if download_count > 0:
-                    self.wait_for_downloads()
+                    with self.waiter.phase("finish"), self.span("wait_for_downloads", kind="phase"):
+                        self.wait_for_downloads()
                     self.logger.info(f"Successfully processed {download_count} documents")
                 else:
                     self.logger.warning("No documents were downloaded")
@@ -578,10 +1241,68 @@ class DoccleDownloader:
             raise
 
         finally:
-            if self.driver:
-                time.sleep(2)  # Brief pause before closing
-                self.logger.info("Closing browser...")
-                self.driver.quit()
+            if self.http_downloader:
+                self.http_downloader.close()
+                self.http_downloader = None
+
+            if self.navigator:
+                self.logger.info(f"Navigation: {self.navigator.summary()}")
+                self.navigator = None
+
+            if self.waiter and self.waiter.phases:
+                self.logger.info("Time per phase:")
+                for line in self.waiter.report():
+                    self.logger.info(f"  {line}")
+
+            if self.download_tracker:
+                for detail_url, file_names in self.download_tracker.close().items():
+                    self.logger.info(f"Collected late downloads: {file_names}")
+                    self.downloaded_files.update(file_names)
+                    self.record_download(detail_url, file_names)
+                self.download_tracker = None
+
+            if self.post_processor:
+                with self.span("post_process", kind="phase"):
+                    self.collect_post_processing()
+                self.post_processor.close()
+                self.known_hashes = self.post_processor.hashes
+                self.post_processor = None
+
+            if self.archive:
+                self.archive.close()
+                self.archive = None
+
+            if self.retry is not None:
+                self.update_failed_log()
+                self.retry = None
+
+            if self.document_index:
+                self.logger.info(f"Document index has {self.document_index.count()} XML file(s)")
+                self.document_index.close()
+                self.document_index = None
+
+            if self.manifest:
+                self.manifest.close()
+                self.manifest = None
+
+            if self.profiler:
+                self.logger.info("WebDriver commands:")
+                for line in self.profiler.report():
+                    self.logger.info(f"  {line}")
+                if self.report:
+                    profile_path = Path(self.report.path).with_suffix(".commands.json")
+                    self.profiler.write(profile_path)
+                    self.logger.info(f"WebDriver command profile saved to {profile_path}")
+                if self.driver:
+                    CommandProfiler.release(self.driver)
+                self.profiler = None
+
+            if self.report:
+                self.summary = self.report.close()
+                self.report = None
+
+            if not keep_browser:
+                self.close_browser()
 
             self.logger.info("=" * 60)
             self.logger.info("Doccle Downloader finished")
@@ -590,9 +1311,69 @@ class DoccleDownloader:
 
 def main():
     """Entry point"""
+    parser = argparse.ArgumentParser(description="Download documents from Doccle.be")
+    parser.add_argument("--config", default="config.json", help="path to the configuration file")
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help=f"only process the documents listed in {FAILED_FILE} by earlier runs"
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="keep running and download new documents as they appear (stop with Ctrl+C)"
+    )
+    parser.add_argument("--interval", type=float, help="seconds between dashboard checks in --sync mode")
+    parser.add_argument("--since", help="only documents dated on or after YYYY-MM-DD")
+    parser.add_argument("--until", help="only documents dated on or before YYYY-MM-DD")
+    parser.add_argument("--month", help="only documents dated in YYYY-MM (sets --since and --until)")
+    parser.add_argument("--sender", action="append", help="only documents from this sender (repeatable)")
+    parser.add_argument("--exclude-sender", action="append", help="skip documents from this sender (repeatable)")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="count and time every WebDriver command per method and per document"
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="also save a cProfile dump of the main thread (view with python -m pstats PATH)"
+    )
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.month:
+        try:
+            since, until = month_window(args.month)
+        except ValueError:
+            parser.error(f"--month must look like 2025-03, not {args.month}")
+        overrides.update(since=since.isoformat(), until=until.isoformat())
+    if args.profile or args.cprofile:
+        overrides['profile'] = True
+    for key, value in (("since", args.since), ("until", args.until),
+                       ("senders", args.sender), ("exclude_senders", args.exclude_sender)):
+        if value:
+            overrides[key] = value
+
+    if args.sync:
+        downloader = DoccleDownloader(config_path=args.config)
+        downloader.config.update(overrides)
+        interval = args.interval or downloader.config.get('sync_interval', 300)
+        SyncService(downloader, interval=interval).run()
+        return 0
+
     try:
-        downloader = DoccleDownloader()
-        downloader.run()
+        downloader = DoccleDownloader(config_path=args.config)
+        downloader.config.update(overrides)
+        if args.cprofile:
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(downloader.run, retry_failed=args.retry_failed)
+            finally:
+                profile.dump_stats(args.cprofile)
+                print(f"cProfile dump saved to {args.cprofile}")
+        else:
+            downloader.run(retry_failed=args.retry_failed)
         print("\n✓ Process completed successfully!")
         print(f"Check the logs folder for details")
         input("\nPress Enter to exit...")
@@ -0,0 +1,98 @@
+"""
+Filters on dashboard records for the Doccle downloader
+Selects documents by date window and sender before any detail page is opened
+"""
+
+from datetime import date
+
+from names import normalize_date
+
+
+def parse_date(text):
+    """Parse a dashboard or config date into a date, or None when it can't be read"""
+    if isinstance(text, date):
+        return text
+    try:
+        return date.fromisoformat(normalize_date(text))
+    except (TypeError, ValueError):
+        return None
+
+
+def month_window(month):
+    """Return (since, until) covering a "YYYY-MM" month"""
+    first = date.fromisoformat(f"{month}-01")
+    if first.month == 12:
+        next_month = first.replace(year=first.year + 1, month=1)
+    else:
+        next_month = first.replace(month=first.month + 1)
+    return first, date.fromordinal(next_month.toordinal() - 1)
+
+
+def sender_names(value, key):
+    """Lowercase sender names from a list, or from a single name given as a plain string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    elif not isinstance(value, (list, tuple, set)):
+        raise ValueError(f"Invalid {key}: expected a list of sender names, got {value!r}")
+    return [str(s).lower() for s in value if s]
+
+
+class DocumentFilter:
+    """since/until dates and sender include/exclude lists applied to dashboard records"""
+
+    def __init__(self, since=None, until=None, senders=None, exclude_senders=None):
+        """Dates are inclusive; senders match case-insensitively on part of the name"""
+        self.since = parse_date(since) if since else None
+        self.until = parse_date(until) if until else None
+        if since and not self.since:
+            raise ValueError(f"Invalid since date: {since}")
+        if until and not self.until:
+            raise ValueError(f"Invalid until date: {until}")
+        self.senders = sender_names(senders, "senders")
+        self.exclude_senders = sender_names(exclude_senders, "exclude_senders")
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            since=config.get('since'),
+            until=config.get('until'),
+            senders=config.get('senders'),
+            exclude_senders=config.get('exclude_senders')
+        )
+
+    def __bool__(self):
+        return bool(self.since or self.until or self.senders or self.exclude_senders)
+
+    def describe(self):
+        """Short description for the log"""
+        parts = []
+        if self.since or self.until:
+            parts.append(f"dates {self.since or '...'} to {self.until or '...'}")
+        if self.senders:
+            parts.append(f"senders {', '.join(self.senders)}")
+        if self.exclude_senders:
+            parts.append(f"excluding {', '.join(self.exclude_senders)}")
+        return "; ".join(parts)
+
+    def before_window(self, doc):
+        """Whether a record is older than since; on a newest-first list nothing after it matches"""
+        doc_date = parse_date(doc.get('date'))
+        return bool(self.since and doc_date and doc_date < self.since)
+
+    def rejects(self, doc):
+        """Return why a record is filtered out, or None when it should be downloaded"""
+        doc_date = parse_date(doc.get('date'))
+        if doc_date:
+            if self.since and doc_date < self.since:
+                return f"dated {doc_date}, before {self.since}"
+            if self.until and doc_date > self.until:
+                return f"dated {doc_date}, after {self.until}"
+
+        sender = (doc.get('sender') or '').lower()
+        if self.senders and not any(s in sender for s in self.senders):
+            return f"sender {doc.get('sender') or 'unknown'} not selected"
+        if any(s in sender for s in self.exclude_senders):
+            return f"sender {doc.get('sender')} excluded"
+        return None
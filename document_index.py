@@ -0,0 +1,395 @@
+"""
+Searchable index over downloaded Doccle XML files
+Streams each XML once with iterparse, keeps sender, dates, amounts and references in SQLite
+(with full-text search where available) and answers queries from the command line
+
+Usage:
+    python document_index.py --sender Engie --min-amount 100 --year 2025
+    python document_index.py "energie" --due-before 2025-06-30
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+from names import normalize_date
+
+
+INDEX_NAME = ".doccle_index.sqlite"
+MAX_TEXT_LENGTH = 20000  # Characters of free text kept per document for full-text search
+
+# Local tag names (lowercase, namespace stripped) that carry each field, best match first
+FIELD_TAGS = {
+    "document_date": ["documentdate", "issuedate", "invoicedate", "date"],
+    "document_type": ["documenttype", "doctype", "type"],
+    "title": ["title", "subject", "description"],
+    "amount": ["payableamount", "amountdue", "totalamount", "amount"],
+    "due_date": ["duedate", "paymentduedate", "expirydate"],
+    "reference": ["structuredreference", "paymentreference", "ogm", "reference"],
+}
+SENDER_CONTAINERS = ("sender", "issuer", "supplier", "creditor", "seller")
+SENDER_NAME_TAGS = ("name", "sendername", "companyname", "organisationname", "organizationname")
+CURRENCY_ATTRIBUTES = ("currency", "currencyid", "currencycode")
+
+COLUMNS = [
+    "file_name", "detail_url", "sender", "document_date", "document_type", "title",
+    "amount", "currency", "due_date", "reference", "size", "mtime", "indexed_at",
+]
+
+
+def local_name(tag):
+    """Strip the namespace from an ElementTree tag"""
+    return tag.rsplit('}', 1)[-1].lower() if isinstance(tag, str) else ''
+
+
+def parse_amount(text):
+    """Parse "1.234,56", "1,234.56" or "41.03" into a float, or None"""
+    text = re.sub(r'[^\d,.\-]', '', text or '')
+    if not text:
+        return None
+    if ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_document_xml(path):
+    """Extract the indexed fields from one XML file without loading the whole tree"""
+    found = {}
+    ranks = {}
+    texts = []
+    text_length = 0
+    stack = []
+
+    def offer(field, rank, value):
+        if value and (field not in ranks or rank < ranks[field]):
+            found[field] = value
+            ranks[field] = rank
+
+    for event, elem in ET.iterparse(str(path), events=("start", "end")):
+        name = local_name(elem.tag)
+        if event == "start":
+            stack.append(name)
+            continue
+
+        text = (elem.text or '').strip()
+        stack.pop()
+        if text:
+            if text_length < MAX_TEXT_LENGTH:
+                texts.append(text)
+                text_length += len(text)
+
+            for field, tags in FIELD_TAGS.items():
+                if name in tags:
+                    offer(field, tags.index(name), text)
+                    if field == "amount":
+                        attributes = {k.lower(): v for k, v in elem.attrib.items()}
+                        currency = next((attributes[a] for a in CURRENCY_ATTRIBUTES if a in attributes), None)
+                        if currency and ranks.get("amount") == tags.index(name):
+                            found["currency"] = currency
+
+            in_sender = any(container in ancestor for ancestor in stack for container in SENDER_CONTAINERS)
+            if in_sender and name in SENDER_NAME_TAGS:
+                offer("sender", 0, text)
+            elif name in SENDER_CONTAINERS:
+                offer("sender", 1, text)
+
+        # Drop the finished element so memory stays flat for large files
+        elem.clear()
+
+    return {
+        "sender": found.get("sender"),
+        "document_date": normalize_date(found.get("document_date")) or None,
+        "document_type": found.get("document_type"),
+        "title": found.get("title"),
+        "amount": parse_amount(found.get("amount")),
+        "currency": found.get("currency"),
+        "due_date": normalize_date(found.get("due_date")) or None,
+        "reference": found.get("reference"),
+        "text": " ".join(texts)[:MAX_TEXT_LENGTH],
+    }
+
+
+class DocumentIndex:
+    """SQLite index of the XML metadata in a download folder"""
+
+    def __init__(self, download_folder, logger=None):
+        """Open (or create) the index inside the download folder"""
+        self.download_folder = Path(download_folder)
+        self.download_folder.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+        self.path = self.download_folder / INDEX_NAME
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                file_name TEXT NOT NULL UNIQUE,
+                detail_url TEXT,
+                sender TEXT,
+                document_date TEXT,
+                document_type TEXT,
+                title TEXT,
+                amount REAL,
+                currency TEXT,
+                due_date TEXT,
+                reference TEXT,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                indexed_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_sender ON documents(sender COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS documents_date ON documents(document_date);
+            CREATE INDEX IF NOT EXISTS documents_amount ON documents(amount);
+        """)
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+                "sender, title, document_type, reference, text)"
+            )
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: free-text queries fall back to LIKE
+            self.conn.execute("CREATE TABLE IF NOT EXISTS documents_text (rowid INTEGER PRIMARY KEY, text TEXT)")
+            self.fts = False
+        self.conn.commit()
+
+    def log(self, message):
+        if self.logger:
+            self.logger.info(message)
+
+    def relative_name(self, path):
+        """File name relative to the download folder, including its archive subfolder"""
+        try:
+            return Path(path).relative_to(self.download_folder).as_posix()
+        except ValueError:
+            return Path(path).name
+
+    def is_current(self, path):
+        """Check whether a file is indexed with its current size and modification time"""
+        stat = path.stat()
+        row = self.conn.execute(
+            "SELECT size, mtime FROM documents WHERE file_name = ?", (self.relative_name(path),)
+        ).fetchone()
+        return row is not None and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime
+
+    def add(self, path, detail_url=None):
+        """Index one XML file (replacing an older entry); returns False if it can't be parsed"""
+        with self.conn:
+            return self.insert(Path(path), detail_url)
+
+    def insert(self, path, detail_url=None):
+        """Parse and store one file inside the caller's transaction"""
+        try:
+            fields = parse_document_xml(path)
+        except (ET.ParseError, OSError) as e:
+            if self.logger:
+                self.logger.warning(f"Could not index {path.name}: {e}")
+            return False
+
+        stat = path.stat()
+        name = self.relative_name(path)
+        self.remove(name)
+        cursor = self.conn.execute(
+            "INSERT INTO documents (file_name, detail_url, sender, document_date, document_type, title, "
+            "amount, currency, due_date, reference, size, mtime, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                name, detail_url, fields['sender'], fields['document_date'], fields['document_type'],
+                fields['title'], fields['amount'], fields['currency'], fields['due_date'], fields['reference'],
+                stat.st_size, stat.st_mtime, datetime.now().isoformat(timespec='seconds'),
+            )
+        )
+        if self.fts:
+            self.conn.execute(
+                "INSERT INTO documents_fts (rowid, sender, title, document_type, reference, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cursor.lastrowid, fields['sender'], fields['title'], fields['document_type'],
+                 fields['reference'], fields['text'])
+            )
+        else:
+            self.conn.execute(
+                "INSERT INTO documents_text (rowid, text) VALUES (?, ?)", (cursor.lastrowid, fields['text'])
+            )
+        return True
+
+    def remove(self, file_name):
+        """Drop a file from the index"""
+        row = self.conn.execute("SELECT id FROM documents WHERE file_name = ?", (file_name,)).fetchone()
+        if row is None:
+            return
+        text_table = "documents_fts" if self.fts else "documents_text"
+        self.conn.execute(f"DELETE FROM {text_table} WHERE rowid = ?", (row[0],))
+        self.conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+
+    def update(self):
+        """Index new and changed XML files in the download folder and its archive subfolders, forget deleted ones"""
+        added = 0
+        present = set()
+        for folder, dir_names, file_names in os.walk(self.download_folder):
+            # Skip staging, quarantine and worker folders
+            dir_names[:] = [d for d in dir_names if not d.startswith('.')]
+            for name in file_names:
+                if name.lower().endswith('.xml') and not name.startswith('.'):
+                    present.add(self.relative_name(Path(folder) / name))
+
+        removed = 0
+        with self.conn:
+            for name in sorted(present):
+                path = self.download_folder / name
+                if not self.is_current(path) and self.insert(path):
+                    added += 1
+            for row in self.conn.execute("SELECT file_name FROM documents").fetchall():
+                if row['file_name'] not in present:
+                    self.remove(row['file_name'])
+                    removed += 1
+        if added or removed:
+            self.log(f"Document index: {added} file(s) indexed, {removed} removed")
+        return added
+
+    def search(self, text=None, sender=None, document_type=None, min_amount=None, max_amount=None,
+               since=None, until=None, due_before=None, limit=None):
+        """Return matching documents as dicts, newest first"""
+        where = []
+        params = []
+        joins = ""
+        if text:
+            if self.fts:
+                joins = "JOIN documents_fts ON documents_fts.rowid = documents.id"
+                where.append("documents_fts MATCH ?")
+                params.append(text)
+            else:
+                joins = "JOIN documents_text ON documents_text.rowid = documents.id"
+                where.append("documents_text.text LIKE ?")
+                params.append(f"%{text}%")
+        if sender:
+            where.append("documents.sender LIKE ?")
+            params.append(f"%{sender}%")
+        if document_type:
+            where.append("(documents.document_type LIKE ? OR documents.title LIKE ?)")
+            params.extend([f"%{document_type}%"] * 2)
+        if min_amount is not None:
+            where.append("documents.amount >= ?")
+            params.append(min_amount)
+        if max_amount is not None:
+            where.append("documents.amount <= ?")
+            params.append(max_amount)
+        if since:
+            where.append("documents.document_date >= ?")
+            params.append(since)
+        if until:
+            where.append("documents.document_date <= ?")
+            params.append(until)
+        if due_before:
+            where.append("documents.due_date <= ?")
+            params.append(due_before)
+
+        columns = ", ".join(f"documents.{c}" for c in COLUMNS)
+        query = f"SELECT {columns} FROM documents {joins}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY documents.document_date DESC, documents.file_name"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+def default_download_folder():
+    """Download folder from config.json next to this script, if there is one"""
+    config_path = Path(os.path.dirname(os.path.abspath(__file__))) / "config.json"
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f).get('download_folder')
+    except (OSError, ValueError):
+        return None
+
+
+def format_row(row):
+    amount = f"{row['amount']:>10.2f} {row['currency'] or ''}" if row['amount'] is not None else " " * 14
+    return (
+        f"{row['document_date'] or '':10}  {(row['sender'] or '')[:24]:24}  {amount:14}  "
+        f"{row['due_date'] or '':10}  {row['reference'] or '':22}  {row['file_name']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the metadata of downloaded Doccle XML files")
+    parser.add_argument("text", nargs="?", help="full-text query (FTS5 syntax, e.g. 'energie OR gas')")
+    parser.add_argument("--folder", help="download folder (default: download_folder from config.json)")
+    parser.add_argument("--sender", help="sender name contains this text")
+    parser.add_argument("--type", dest="document_type", help="document type or title contains this text")
+    parser.add_argument("--min-amount", type=float)
+    parser.add_argument("--max-amount", type=float)
+    parser.add_argument("--year", type=int, help="document date in this year")
+    parser.add_argument("--since", help="document date on or after YYYY-MM-DD")
+    parser.add_argument("--until", help="document date on or before YYYY-MM-DD")
+    parser.add_argument("--due-before", help="due date on or before YYYY-MM-DD")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--no-update", action="store_true", help="don't index new files before searching")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    folder = args.folder or default_download_folder()
+    if not folder or not Path(folder).is_dir():
+        print("Download folder not found; pass --folder", file=sys.stderr)
+        return 1
+
+    since, until = args.since, args.until
+    if args.year:
+        since = since or f"{args.year}-01-01"
+        until = until or f"{args.year}-12-31"
+
+    index = DocumentIndex(folder)
+    try:
+        if not args.no_update:
+            index.update()
+        rows = index.search(
+            text=args.text,
+            sender=args.sender,
+            document_type=args.document_type,
+            min_amount=args.min_amount,
+            max_amount=args.max_amount,
+            since=since,
+            until=until,
+            due_before=args.due_before,
+            limit=args.limit,
+        )
+    except sqlite3.OperationalError as e:
+        print(f"Invalid query: {e}", file=sys.stderr)
+        return 1
+    finally:
+        index.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=4))
+        return 0
+
+    for row in rows:
+        print(format_row(row))
+    total = sum(row['amount'] or 0 for row in rows)
+    print(f"\n{len(rows)} document(s), total amount {total:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
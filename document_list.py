@@ -0,0 +1,193 @@
+"""
+Dashboard document enumeration
+Collects compact document records from the dashboard in a single browser call per batch
+and follows "load more" buttons or infinite scroll
+"""
+
+
+# Tried in order; the first selector that matches anything wins (same order as the old
+# find_element loop). Each entry is [kind, selector] with kind "css" or "xpath".
+DOCUMENT_SELECTORS = [
+    ["css", "div.document"],
+    ["css", "[class*='document-item']"],
+    ["css", "[class*='documentItem']"],
+    ["css", ".document-list-item"],
+    ["xpath", "//div[contains(@class, 'document')]"],
+]
+
+DOCUMENT_RECORDS_SCRIPT = """
+const selectors = arguments[0];
+const offset = arguments[1] || 0;
+
+function queryAll(kind, selector) {
+    if (kind === 'css') {
+        return Array.from(document.querySelectorAll(selector));
+    }
+    const result = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        nodes.push(result.snapshotItem(i));
+    }
+    return nodes;
+}
+
+function fieldText(el, names) {
+    for (const name of names) {
+        const child = el.querySelector('[class*="' + name + '"]');
+        if (child && child.textContent.trim()) {
+            return child.textContent.trim();
+        }
+    }
+    return '';
+}
+
+for (const [kind, selector] of selectors) {
+    const elements = queryAll(kind, selector);
+    if (!elements.length) {
+        continue;
+    }
+    return {
+        selector: [kind, selector],
+        total: elements.length,
+        first: elements[0].getAttribute('data-url-detail'),
+        records: elements.slice(offset).map(el => {
+            const time = el.querySelector('time');
+            return {
+                detail_url: el.getAttribute('data-url-detail'),
+                classes: el.getAttribute('class') || '',
+                sender: el.getAttribute('data-sender') || fieldText(el, ['sender', 'Sender', 'from', 'issuer']),
+                date: el.getAttribute('data-date') || (time && (time.getAttribute('datetime') || time.textContent.trim()))
+                    || fieldText(el, ['date', 'Date']),
+                title: el.getAttribute('data-title') || fieldText(el, ['title', 'Title', 'name', 'subject']),
+            };
+        }),
+    };
+}
+return {selector: null, total: 0, first: null, records: []};
+"""
+
+# Buttons that load the next batch of documents
+LOAD_MORE_KEYWORDS = ["load more", "show more", "meer laden", "toon meer", "meer tonen", "next page", "volgende"]
+
+LOAD_MORE_SCRIPT = """
+const keywords = arguments[0];
+const selector = arguments[1];
+
+for (const el of document.querySelectorAll('button, a')) {
+    const text = (el.innerText || '').trim().toLowerCase();
+    if (text && !el.disabled && el.offsetParent !== null && keywords.some(k => text.includes(k))) {
+        el.scrollIntoView({block: 'center'});
+        el.click();
+        return 'clicked';
+    }
+}
+
+// No button: trigger infinite scroll on the window and on the list's own scroll container
+let last = null;
+if (selector && selector[0] === 'css') {
+    const all = document.querySelectorAll(selector[1]);
+    last = all.length ? all[all.length - 1] : null;
+} else if (selector) {
+    const result = document.evaluate(selector[1], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    last = result.snapshotLength ? result.snapshotItem(result.snapshotLength - 1) : null;
+}
+if (last) {
+    last.scrollIntoView({block: 'end'});
+}
+window.scrollTo(0, document.body.scrollHeight);
+return 'scrolled';
+"""
+
+
+def collect_document_records(driver, offset=0):
+    """Return the rendered dashboard documents from position offset onward
+
+    The result is a dict with the matching selector, the total number of rendered
+    documents, the detail URL of the first one and the list of records.
+    """
+    result = driver.execute_script(DOCUMENT_RECORDS_SCRIPT, DOCUMENT_SELECTORS, offset) or {}
+    result.setdefault('records', [])
+    result['records'] = result['records'] or []
+    return result
+
+
+def load_more_documents(driver, selector):
+    """Click a "load more" button or scroll to the end of the list; returns what was done"""
+    return driver.execute_script(LOAD_MORE_SCRIPT, LOAD_MORE_KEYWORDS, selector)
+
+
+def iter_document_records(driver, waiter, logger, pace=None, activate=None):
+    """Yield dashboard document records batch by batch, loading more until the list stops growing
+
+    Only the records after the ones already seen are transferred on each call, and a
+    replaced list (classic pagination) restarts the offset. pace() is called before
+    every request for the next batch, and activate() before the page is read or asked
+    for more, so the caller can switch back to the dashboard tab only when needed.
+    """
+    seen = set()
+    offset = 0
+    first = None
+    batch = 0
+
+    while True:
+        if activate:
+            activate()
+        result = collect_document_records(driver, offset)
+        if first is not None and result.get('first') != first:
+            # The page replaced its list instead of appending to it
+            offset = 0
+            result = collect_document_records(driver, 0)
+        first = result.get('first')
+        offset = result.get('total', 0)
+
+        new_records = []
+        for record in result['records']:
+            key = record.get('detail_url')
+            if key and key in seen:
+                continue
+            if key:
+                seen.add(key)
+            new_records.append(record)
+
+        if new_records:
+            batch += 1
+            logger.info(f"Loaded batch {batch}: {len(new_records)} documents (total seen: {len(seen)})")
+            for record in new_records:
+                yield record
+        elif batch:
+            return
+
+        if not result.get('selector'):
+            return
+
+        # Ask the page for the next batch and wait for the list to grow or change
+        if activate:
+            activate()
+        if pace:
+            pace()
+        action = load_more_documents(driver, result['selector'])
+        previous_total, previous_first = offset, first
+
+        def list_changed(d):
+            current = collect_document_records(d, previous_total)
+            return current.get('total', 0) != previous_total or current.get('first') != previous_first
+
+        if not waiter.until(list_changed, "next_page", f"more documents after {action}"):
+            logger.debug(f"No more documents after {action}")
+            return
+
+
+def is_read(classes):
+    """Classify a document as read from its CSS class list"""
+    classes = (classes or '').lower()
+
+    # If it has 'unread' or 'new' class, it's unread
+    if 'unopened' in classes or 'new' in classes:
+        return False
+
+    # If it has 'read' or 'opened' class, it's read
+    if 'read' in classes or 'opened' in classes:
+        return True
+
+    # Default: assume unread if we can't determine
+    return False
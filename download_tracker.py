@@ -0,0 +1,209 @@
+"""
+Per-document download tracking
+Points Chrome at a fresh directory for every document and waits for completed files
+through inotify (Linux) or a cheap poll of that small directory elsewhere
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from names import free_path
+
+
+STAGING_NAME = ".incoming"
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+
+def is_completed_download(path):
+    """Check whether a directory entry is a finished download"""
+    return path.is_file() and not path.name.startswith('.') and not path.name.endswith(PARTIAL_SUFFIXES)
+
+
+class PollingWatcher:
+    """Fallback watcher that simply sleeps between directory checks"""
+
+    def watch(self, path):
+        pass
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, 0.25))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Blocks until a file is created, closed or renamed in a watched directory"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def watch(self, path):
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher():
+    """Use inotify where available, otherwise fall back to polling"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher()
+
+
+class DownloadTracker:
+    """Gives every document its own download directory so files can't be mixed up"""
+
+    def __init__(self, driver, download_folder, waiter, logger, collect_folder=None):
+        """Initialize the tracker for a driver and the final download folder
+
+        Finished files are moved to collect_folder (the download folder by default); the
+        names returned are relative to the download folder.
+        """
+        self.driver = driver
+        self.download_folder = Path(download_folder)
+        self.collect_folder = Path(collect_folder) if collect_folder else self.download_folder
+        self.staging_root = self.download_folder / STAGING_NAME
+        self.waiter = waiter
+        self.logger = logger
+        self.watcher = create_watcher()
+        self.current_dir = None
+        self.current_key = None
+        self.unfinished = {}  # staging dir -> key of documents with downloads still running
+        self.baseline = set()
+        self.reported = set()
+        self.redirect_supported = True
+
+    def begin(self, doc_number, key=None):
+        """Start tracking a document: create its directory and point Chrome at it"""
+        self.current_key = key
+        self.baseline = set()
+        self.reported = set()
+        if self.redirect_supported:
+            self.staging_root.mkdir(parents=True, exist_ok=True)
+            doc_dir = Path(tempfile.mkdtemp(prefix=f"doc{doc_number}_", dir=self.staging_root))
+            try:
+                self.set_download_directory(doc_dir)
+                self.watcher.watch(doc_dir)
+                self.current_dir = doc_dir
+                return
+            except Exception as e:
+                self.logger.warning(f"Per-document download folders unavailable, using shared folder: {e}")
+                self.redirect_supported = False
+                shutil.rmtree(doc_dir, ignore_errors=True)
+
+        # Shared folder fallback: remember what is already there
+        self.current_dir = self.download_folder
+        self.download_folder.mkdir(parents=True, exist_ok=True)
+        self.baseline = {p.name for p in self.download_folder.iterdir() if is_completed_download(p)}
+
+    def set_download_directory(self, path):
+        """Redirect Chrome downloads through the DevTools protocol"""
+        params = {"behavior": "allow", "downloadPath": str(Path(path).absolute())}
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", params)
+        except Exception:
+            self.driver.execute_cdp_cmd("Page.setDownloadBehavior", params)
+
+    def new_files(self):
+        """Completed files in the document's directory that were not reported yet"""
+        found = {p.name for p in self.current_dir.iterdir() if is_completed_download(p)}
+        return found - self.baseline - self.reported
+
+    def wait_for_new_files(self, description="download to appear"):
+        """Block until new completed files arrive for the current document"""
+        files = self.waiter.until(
+            lambda d: self.new_files(),
+            "download",
+            description,
+            poll_interval=1.0,
+            sleep=self.watcher.wait
+        )
+        if files:
+            self.reported.update(files)
+        return files or set()
+
+    def has_partial_files(self, folder=None):
+        """Check whether Chrome is still writing into a directory"""
+        folder = folder or self.current_dir
+        return any(p.name.endswith(PARTIAL_SUFFIXES) for p in folder.iterdir())
+
+    def finish(self):
+        """Move the document's files into the download folder and return their final names"""
+        doc_dir, self.current_dir = self.current_dir, None
+        if doc_dir is None:
+            return []
+        if doc_dir == self.download_folder:
+            return sorted(self.reported)
+        return self.collect(doc_dir)
+
+    def collect(self, doc_dir):
+        """Move completed files out of a staging directory, removing it when empty"""
+        final_names = []
+        for path in sorted(doc_dir.iterdir()):
+            if is_completed_download(path):
+                target = free_path(self.collect_folder, path.name)
+                os.replace(path, target)
+                final_names.append(target.relative_to(self.download_folder).as_posix())
+
+        if self.has_partial_files(doc_dir):
+            self.logger.warning(f"Download still in progress in {doc_dir.name}, collecting it at the end of the run")
+            self.unfinished.setdefault(doc_dir, self.current_key)
+        else:
+            shutil.rmtree(doc_dir, ignore_errors=True)
+        return final_names
+
+    def pending_partials(self):
+        """Check whether any staging directory still has a download in progress"""
+        if not self.staging_root.exists():
+            return False
+        return any(self.has_partial_files(d) for d in self.staging_root.iterdir() if d.is_dir())
+
+    def close(self):
+        """Collect leftovers from earlier documents and release the watcher
+
+        Returns {key: [file names]} for downloads that completed after their document finished.
+        """
+        leftovers = {}
+        if self.staging_root.exists():
+            for doc_dir in self.staging_root.iterdir():
+                if doc_dir.is_dir():
+                    key = self.unfinished.pop(doc_dir, None)
+                    names = self.collect(doc_dir)
+                    if names:
+                        leftovers.setdefault(key, []).extend(names)
+            try:
+                self.staging_root.rmdir()
+            except OSError:
+                pass
+        self.watcher.close()
+        return leftovers
@@ -0,0 +1,88 @@
+"""
+Cached chromedriver resolution
+Remembers the chromedriver path per installed Chrome version so webdriver-manager only
+runs when Chrome was updated
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+
+CACHE_FILE = "driver_cache.json"
+UNKNOWN_VERSION_MAX_AGE = 7 * 24 * 3600  # Re-resolve weekly if the Chrome version can't be read
+
+CHROME_BINARIES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+
+def installed_chrome_version():
+    """Return the installed Chrome version string, or None if it can't be determined"""
+    if sys.platform == "win32":
+        try:
+            import winreg
+            for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, "version")[0]
+                except OSError:
+                    continue
+        except ImportError:
+            pass
+        return None
+
+    for binary in CHROME_BINARIES:
+        try:
+            output = subprocess.run(
+                [binary, "--version"], capture_output=True, text=True, timeout=5
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"(\d+\.\d+\.\d+\.\d+)", output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def resolve_chromedriver(logger, cache_path=CACHE_FILE):
+    """Return a chromedriver path, reusing the cached one while the Chrome version is unchanged"""
+    version = installed_chrome_version()
+    cache = {}
+    try:
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+    except Exception as e:
+        logger.debug(f"Could not read driver cache: {e}")
+
+    cached_path = cache.get('driver_path')
+    if cached_path and os.path.exists(cached_path):
+        if version and cache.get('chrome_version') == version:
+            logger.info(f"Using cached chromedriver for Chrome {version}")
+            return cached_path
+        if not version and time.time() - cache.get('resolved_at', 0) < UNKNOWN_VERSION_MAX_AGE:
+            logger.info("Using cached chromedriver")
+            return cached_path
+
+    logger.info(f"Resolving chromedriver for Chrome {version or '(unknown version)'}...")
+    # Imported here: webdriver_manager is slow to import and only needed on a cache miss
+    from webdriver_manager.chrome import ChromeDriverManager
+    driver_path = ChromeDriverManager().install()
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump({
+                "chrome_version": version,
+                "driver_path": driver_path,
+                "resolved_at": time.time(),
+            }, f, indent=4)
+    except Exception as e:
+        logger.debug(f"Could not write driver cache: {e}")
+    return driver_path
@@ -0,0 +1,169 @@
+"""
+Direct HTTP download engine for Doccle documents
+Reuses the Selenium session cookies to fetch PDF/XML files over a pooled session
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlparse, unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from names import free_path
+from navigation_scheduler import retry_after_seconds
+
+
+CHUNK_SIZE = 64 * 1024
+THROTTLED_ATTEMPTS = 4  # Tries per file while the server answers 429/5xx
+
+
+class HttpDownloader:
+    """Downloads document files over HTTP using cookies from a logged-in browser"""
+
+    def __init__(self, download_folder, logger, workers=4, timeout=60, navigator=None):
+        """Initialize the engine with a download folder and worker count
+
+        navigator (a NavigationScheduler) paces the requests and backs off on 429/5xx.
+        """
+        self.download_folder = Path(download_folder)
+        self.logger = logger
+        self.navigator = navigator
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="http-download")
+        self.pending = []
+        self.name_lock = threading.Lock()
+
+    def load_browser_session(self, driver):
+        """Copy cookies and user agent from the Selenium driver into the HTTP session"""
+        self.session.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain'),
+                path=cookie.get('path', '/')
+            )
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent;")
+            if user_agent:
+                self.session.headers['User-Agent'] = user_agent
+        except Exception as e:
+            self.logger.debug(f"Could not read browser user agent: {e}")
+        self.logger.info(f"HTTP engine loaded {len(self.session.cookies)} session cookie(s)")
+
+    def submit(self, doc_number, urls, referer=None):
+        """Queue the given file URLs of one document for download"""
+        future = self.executor.submit(self.download_all, doc_number, urls, referer)
+        self.pending.append((doc_number, list(urls), future))
+        return future
+
+    def download_all(self, doc_number, urls, referer=None):
+        """Download every URL of one document; returns (saved file names, URLs that failed)"""
+        saved = []
+        failed = []
+        for url in urls:
+            try:
+                saved.append(self.download_file(url, referer))
+            except Exception as e:
+                self.logger.warning(f"Doc {doc_number}: HTTP download failed for {url[:80]}: {e}")
+                failed.append(url)
+        if saved:
+            self.logger.info(f"Doc {doc_number}: Downloaded over HTTP: {saved}")
+        return saved, failed
+
+    def download_file(self, url, referer=None):
+        """Stream a single URL to disk and return the final file name"""
+        for attempt in range(1, THROTTLED_ATTEMPTS + 1):
+            if self.navigator:
+                self.navigator.acquire()
+            response = self.session.get(url, headers={'Referer': referer} if referer else {},
+                                        stream=True, timeout=self.timeout)
+            problem = self.navigator.check_response(response) if self.navigator else None
+            if not problem:
+                break
+            response.close()
+            self.navigator.throttled(problem, retry_after_seconds(response))
+            if attempt == THROTTLED_ATTEMPTS:
+                raise Exception(f"Server kept answering {problem}")
+
+        with response:
+            response.raise_for_status()
+            if 'text/html' in response.headers.get('Content-Type', ''):
+                raise Exception("Server returned an HTML page instead of a file (session expired?)")
+
+            target = self.reserve_path(self.filename_for(response, url))
+            part_path = target.with_name(target.name + ".part")
+            try:
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                os.replace(part_path, target)
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                target.unlink(missing_ok=True)
+                raise
+            if self.navigator:
+                self.navigator.succeeded()
+            return target.name
+
+    def filename_for(self, response, url):
+        """Pick a file name from Content-Disposition or the URL path"""
+        disposition = response.headers.get('Content-Disposition', '')
+        match = re.search(r"filename\*\s*=\s*[^']*'[^']*'([^;]+)", disposition)
+        if match:
+            name = unquote(match.group(1).strip().strip('"'))
+        else:
+            match = re.search(r'filename\s*=\s*"?([^";]+)"?', disposition)
+            name = match.group(1).strip() if match else unquote(Path(urlparse(url).path).name)
+
+        name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', name).strip(' .')
+        if not name:
+            content_type = response.headers.get('Content-Type', '')
+            name = "document.xml" if 'xml' in content_type else "document.pdf"
+        return name
+
+    def reserve_path(self, name):
+        """Return a free path for the name, adding ' (n)' like Chrome does on clashes"""
+        with self.name_lock:
+            self.download_folder.mkdir(parents=True, exist_ok=True)
+            target = free_path(self.download_folder, name)
+            # Create an empty placeholder so parallel downloads can't pick the same name
+            target.touch()
+            return target
+
+    def join(self):
+        """Wait for all queued downloads and return {doc_number: ([file names], [failed URLs])}"""
+        results = {}
+        for doc_number, urls, future in self.pending:
+            try:
+                results[doc_number] = future.result()
+            except Exception as e:
+                self.logger.warning(f"Doc {doc_number}: HTTP download failed: {e}")
+                results[doc_number] = ([], urls)
+        self.pending = []
+        return results
+
+    def close(self):
+        """Shut down the worker threads and the HTTP session"""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+
+def file_url(page_url, href):
+    """Resolve a button href to a downloadable URL, or None if it only runs script"""
+    if not href or href.startswith(('javascript:', '#')):
+        return None
+    url = urljoin(page_url, href)
+    if urldefrag(url).url == urldefrag(page_url).url:
+        return None
+    return url
@@ -15,7 +15,13 @@ import json
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from doccle_downloader import DoccleDownloader
+# doccle_downloader (and with it Selenium) is imported on a background thread once the
+# window is up, so the window appears without waiting for it
+
+
+LOG_FLUSH_INTERVAL_MS = 100  # How often queued log lines are written to the log window
+MAX_LOG_LINES = 2000  # Scrollback kept in the log window
+PREWARM_DELAY_MS = 200  # Let the window draw before the browser is started in the background
 
 
 class DoccleGUI:
@@ -28,8 +34,18 @@ class DoccleGUI:
         self.root.resizable(False, False)
 
         self.is_running = False
+        self.downloader = None  # Kept between runs so a warm browser can be reused
+        self.prewarm_thread = None  # Starts the browser while the user looks at the window
+        self.closing = False
+        self.pending_log = []  # Lines waiting for the next flush, appended from any thread
+        self.pending_progress = None  # Latest downloader progress, shown on the next flush
+        self.log_lock = threading.Lock()
+        self.gui_handler = GUILogHandler(self)
         self.setup_ui()
         self.load_config()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self.flush_log)
+        self.root.after(PREWARM_DELAY_MS, self.start_prewarm)
 
     def setup_ui(self):
         """Create the user interface"""
@@ -85,6 +101,15 @@ class DoccleGUI:
         self.max_docs_entry.grid(row=5, column=1, pady=5, padx=5, sticky="w")
         tk.Label(config_frame, text="(leave empty for all)", font=("Arial", 8)).grid(row=5, column=1, pady=5, padx=(120, 0), sticky="w")
 
+        # Keep browser open option
+        self.keep_warm_var = tk.BooleanVar()
+        keep_warm_check = tk.Checkbutton(
+            config_frame,
+            text="Keep browser open between runs (faster repeat downloads)",
+            variable=self.keep_warm_var
+        )
+        keep_warm_check.grid(row=6, column=0, columnspan=2, sticky="w", pady=5)
+
         # Buttons frame
         button_frame = tk.Frame(self.root)
         button_frame.pack(pady=10)
@@ -148,6 +173,7 @@ class DoccleGUI:
                     self.folder_entry.insert(0, config.get('download_folder', ''))
                     self.headless_var.set(config.get('headless', False))
                     self.only_unread_var.set(config.get('only_unread', False))
+                    self.keep_warm_var.set(config.get('keep_browser_warm', False))
                     max_docs = config.get('max_documents')
                     if max_docs:
                         self.max_docs_entry.insert(0, str(max_docs))
@@ -177,15 +203,17 @@ class DoccleGUI:
             except:
                 pass
 
-            config = {
+            config = dict(existing_config)
+            config.update({
                 "username": self.username_entry.get(),
                 "password": self.password_entry.get(),
                 "download_folder": self.folder_entry.get(),
                 "wait_timeout": existing_config.get("wait_timeout", 20),
                 "headless": self.headless_var.get(),
                 "only_unread": self.only_unread_var.get(),
-                "max_documents": max_docs
-            }
+                "max_documents": max_docs,
+                "keep_browser_warm": self.keep_warm_var.get()
+            })
 
             with open("config.json", 'w') as f:
                 json.dump(config, f, indent=4)
@@ -197,17 +225,83 @@ class DoccleGUI:
             self.log(f"✗ Error saving settings: {str(e)}")
             messagebox.showerror("Error", f"Could not save settings: {str(e)}")
 
+    def create_downloader(self):
+        """Import the downloader on first use and send its log to the window"""
+        from doccle_downloader import DoccleDownloader
+
+        downloader = DoccleDownloader()
+        if self.gui_handler not in downloader.logger.handlers:
+            downloader.logger.addHandler(self.gui_handler)
+        return downloader
+
+    def start_prewarm(self):
+        """Start Chrome and check the saved session in the background if config.json allows it"""
+        try:
+            with open("config.json", 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not config.get('username') or not config.get('prewarm_browser', True):
+            return
+
+        self.set_status("Starting browser...")
+        self.prewarm_thread = threading.Thread(
+            target=self.prewarm,
+            args=(config.get('prewarm_session', True),),
+            daemon=True
+        )
+        self.prewarm_thread.start()
+
+    def prewarm(self, check_session):
+        """Background thread: get a browser ready for the first download"""
+        downloader = None
+        try:
+            downloader = self.create_downloader()
+            downloader.prewarm(check_session=check_session)
+            self.downloader = downloader
+            status = "Ready (browser started)"
+        except Exception as e:
+            self.log(f"Could not start the browser in advance: {str(e)}")
+            if downloader:
+                downloader.close_browser()
+            status = "Ready"
+        if self.closing:
+            if downloader:
+                downloader.close_browser()
+            return
+        self.root.after(0, lambda: self.set_status(status))
+
     def log(self, message):
-        """Add message to log window"""
-        self.log_text.configure(state='normal')
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.configure(state='disabled')
+        """Queue a message for the log window (safe to call from any thread)"""
+        with self.log_lock:
+            self.pending_log.append(message)
+
+    def flush_log(self):
+        """Write queued log lines in one batch, trim the scrollback and show the latest progress"""
+        with self.log_lock:
+            lines, self.pending_log = self.pending_log, []
+            progress, self.pending_progress = self.pending_progress, None
+        if progress:
+            self.set_status(f"Downloading... {progress}")
+        if lines:
+            self.log_text.configure(state='normal')
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - MAX_LOG_LINES
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
+            self.log_text.configure(state='disabled')
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self.flush_log)
 
     def set_status(self, message):
         """Update status bar"""
         self.status_label.config(text=message)
 
+    def show_progress(self, progress):
+        """Queue live throughput and ETA from the downloader for the next flush (safe to call from any thread)"""
+        with self.log_lock:
+            self.pending_progress = progress
+
     def start_download(self):
         """Start the download process in a separate thread"""
         if self.is_running:
@@ -223,6 +317,9 @@ class DoccleGUI:
         self.save_config()
 
         # Clear log
+        with self.log_lock:
+            self.pending_log = []
+            self.pending_progress = None
         self.log_text.configure(state='normal')
         self.log_text.delete(1.0, tk.END)
         self.log_text.configure(state='disabled')
@@ -243,15 +340,29 @@ class DoccleGUI:
             self.log("Starting Doccle Downloader...")
             self.log("-" * 60)
 
-            # Create custom logger that writes to GUI
-            downloader = DoccleDownloader()
+            # Let a browser that is still starting in the background finish first
+            if self.prewarm_thread:
+                self.prewarm_thread.join()
+                self.prewarm_thread = None
+
+            # Reuse the downloader (and its warm browser) from startup or an earlier run if there is one
+            if self.downloader is None:
+                self.downloader = self.create_downloader()
+            else:
+                self.downloader.reload_config()
 
-            # Redirect logger to GUI
-            import logging
-            gui_handler = GUILogHandler(self)
-            downloader.logger.addHandler(gui_handler)
+            downloader = self.downloader
+            downloader.on_progress = self.show_progress
+            keep_warm = self.keep_warm_var.get()
+            if not keep_warm:
+                self.downloader = None
 
-            downloader.run()
+            try:
+                downloader.run(keep_browser=keep_warm)
+            finally:
+                # A progress update still waiting must not overwrite the final status
+                with self.log_lock:
+                    self.pending_progress = None
 
             self.log("-" * 60)
             self.log("✓ Download completed!")
@@ -272,6 +383,14 @@ class DoccleGUI:
             self.download_btn.config(state='normal', text="Download Documents")
 
 
+    def on_close(self):
+        """Close the warm browser (if any) together with the window"""
+        self.closing = True  # A browser still starting is closed when prewarm() finishes
+        if self.downloader:
+            self.downloader.close_browser()
+        self.root.destroy()
+
+
 class GUILogHandler(logging.Handler):
     """Custom logging handler that writes to GUI"""
 
@@ -280,9 +399,8 @@ class GUILogHandler(logging.Handler):
         self.gui = gui
 
     def emit(self, record):
-        msg = self.format(record)
-        # Schedule GUI update in main thread
-        self.gui.root.after(0, lambda: self.gui.log(msg))
+        # Queued here and written by the GUI thread's periodic flush
+        self.gui.log(self.format(record))
 
 
 def main():
@@ -290,6 +408,8 @@ def main():
     root = tk.Tk()
     app = DoccleGUI(root)
     root.mainloop()
+    if app.prewarm_thread:
+        app.prewarm_thread.join(timeout=30)  # So a browser still starting gets closed
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+"""
+Lean page-load profile for the Doccle browser
+Skips images, web fonts, media and trackers, and limits document payloads to allowed hosts
+"""
+
+from urllib.parse import urlparse
+
+
+# Resource types Doccle pages don't need to find and click the download buttons
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+
+# Analytics and tracking scripts
+TRACKER_PATTERNS = [
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*doubleclick.net/*",
+    "*hotjar.com/*",
+    "*hotjar.io/*",
+    "*connect.facebook.net/*",
+    "*clarity.ms/*",
+    "*bat.bing.com/*",
+    "*nr-data.net/*",
+    "*js-agent.newrelic.com/*",
+]
+
+# Chrome content settings: 2 = block
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+}
+
+# Ready states accepted by page waits under the eager page-load strategy
+EAGER_READY_STATES = ("interactive", "complete")
+
+DEFAULT_ALLOWED_HOSTS = ["doccle.be"]
+
+
+def blocked_url_patterns(config):
+    """URL patterns to block: the built-in lists plus "blocked_url_patterns" from config"""
+    patterns = BLOCKED_RESOURCE_PATTERNS + TRACKER_PATTERNS + list(config.get('blocked_url_patterns') or [])
+    return list(dict.fromkeys(patterns))
+
+
+def block_urls(driver, patterns):
+    """Block URL patterns for the current browser tab through the DevTools protocol"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def allowed_hosts(config, base_url):
+    """Hosts document files may be fetched from: the site itself plus "allowed_download_hosts" """
+    hosts = list(config.get('allowed_download_hosts') or DEFAULT_ALLOWED_HOSTS)
+    site_host = urlparse(base_url).hostname
+    if site_host:
+        hosts.append(site_host)
+    return [host.lower().lstrip('.') for host in dict.fromkeys(hosts)]
+
+
+def host_allowed(url, hosts):
+    """Check whether a URL's host is one of hosts or a subdomain of one"""
+    host = (urlparse(url).hostname or '').lower()
+    return any(host == allowed or host.endswith('.' + allowed) for allowed in hosts)
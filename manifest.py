@@ -0,0 +1,101 @@
+"""
+Persistent download manifest
+Remembers which Doccle documents were already fetched so repeat runs only download new ones
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+
+MANIFEST_NAME = ".doccle_manifest.sqlite"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadManifest:
+    """SQLite record of downloaded documents, keyed by their data-url-detail value"""
+
+    def __init__(self, download_folder):
+        """Open (or create) the manifest inside the download folder"""
+        self.download_folder = Path(download_folder)
+        self.download_folder.mkdir(parents=True, exist_ok=True)
+        self.path = self.download_folder / MANIFEST_NAME
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                detail_url TEXT PRIMARY KEY,
+                downloaded_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                detail_url TEXT NOT NULL REFERENCES documents(detail_url),
+                file_name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                downloaded_at TEXT NOT NULL,
+                PRIMARY KEY (detail_url, file_name)
+            );
+            CREATE INDEX IF NOT EXISTS files_sha256 ON files(sha256);
+        """)
+        self.conn.commit()
+
+    def contains(self, detail_url):
+        """Check whether a document was already downloaded"""
+        row = self.conn.execute(
+            "SELECT 1 FROM documents WHERE detail_url = ?", (detail_url,)
+        ).fetchone()
+        return row is not None
+
+    def count(self):
+        """Number of documents recorded in the manifest"""
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def file_hashes(self):
+        """Return {sha256: file name} of recorded files that are still in the download folder"""
+        hashes = {}
+        for sha256, name in self.conn.execute("SELECT sha256, file_name FROM files ORDER BY downloaded_at"):
+            if sha256 not in hashes and (self.download_folder / name).is_file():
+                hashes[sha256] = name
+        return hashes
+
+    def record(self, detail_url, file_names, hashes=None):
+        """Store a downloaded document together with the name, size and hash of its files
+
+        hashes ({name: (size, sha256)}) avoids hashing files again that were hashed already.
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        hashes = hashes or {}
+        rows = []
+        for name in file_names:
+            path = self.download_folder / name
+            if name in hashes:
+                size, sha256 = hashes[name]
+            elif path.is_file():
+                size, sha256 = path.stat().st_size, file_sha256(path)
+            else:
+                continue
+            rows.append((detail_url, name, size, sha256, now))
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO documents (detail_url, downloaded_at) VALUES (?, ?)",
+                (detail_url, now)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (detail_url, file_name, size, sha256, downloaded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+def file_sha256(path):
+    """Stream-hash a file with SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
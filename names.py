@@ -0,0 +1,46 @@
+"""
+File name helpers for the Doccle downloader
+Date normalization, Windows-safe name parts and Chrome-style ' (n)' names on clashes
+"""
+
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d")
+
+
+def normalize_date(text):
+    """Turn a dashboard date into YYYY-MM-DD when it can be parsed"""
+    text = (text or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text[:10], fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return text
+
+
+def clean_name_part(text):
+    """Strip characters that are not allowed in Windows file names"""
+    text = re.sub(r'[<>:"/\\|?*\x00-\x1f]', ' ', text or '')
+    return re.sub(r'\s+', ' ', text).strip(' .')
+
+
+def free_name(name, taken):
+    """Return name, or the first 'stem (n).ext' for which taken(candidate) is false, like Chrome does"""
+    stem, suffix = os.path.splitext(name)
+    candidate = name
+    counter = 1
+    while taken(candidate):
+        candidate = f"{stem} ({counter}){suffix}"
+        counter += 1
+    return candidate
+
+
+def free_path(folder, name):
+    """Return a path in folder for name that does not exist yet"""
+    folder = Path(folder)
+    return folder / free_name(name, lambda candidate: (folder / candidate).exists())
@@ -0,0 +1,160 @@
+"""
+Navigation scheduler for the Doccle downloader
+Paces page loads, clicks and HTTP downloads with a token bucket and backs off adaptively
+when the site answers with throttling responses or error pages
+"""
+
+import threading
+import time
+
+
+# Page text that means the server refused or failed the request rather than showing a page
+ERROR_PAGE_MARKERS = [
+    ("too many requests", "HTTP 429 Too Many Requests"),
+    ("rate limit", "rate limited"),
+    ("service unavailable", "HTTP 503 Service Unavailable"),
+    ("bad gateway", "HTTP 502 Bad Gateway"),
+    ("gateway timeout", "HTTP 504 Gateway Timeout"),
+    ("internal server error", "HTTP 500 Internal Server Error"),
+    ("temporarily unavailable", "site temporarily unavailable"),
+]
+
+THROTTLING_STATUS_CODES = {429, 500, 502, 503, 504}
+ERROR_PAGE_MAX_LENGTH = 2000  # Characters of page text; error pages are short
+
+PAGE_PROBE_SCRIPT = """
+const body = document.body;
+return {
+    url: location.href,
+    title: document.title || '',
+    text: body ? body.innerText.slice(0, 500) : '',
+    length: body ? body.innerText.length : 0,
+    chromeError: !!document.querySelector('#main-frame-error, .neterror') || location.href.startsWith('chrome-error:')
+};
+"""
+
+
+class TokenBucket:
+    """Allows `rate` actions per second on average with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self, now):
+        """Take a token and return how long the caller has to wait for it"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class NavigationScheduler:
+    """Shared pacing for every request the downloader sends to Doccle"""
+
+    def __init__(self, logger, rate=5.0, burst=10, min_rate=0.2, max_backoff=300.0):
+        """rate is the starting (and highest) number of actions per second
+
+        Every throttling response halves the rate (down to min_rate) and pauses all
+        actions; each run of successes afterwards brings the rate back up.
+        """
+        self.logger = logger
+        self.max_rate = max(0.01, float(rate))
+        self.min_rate = min(self.max_rate, max(0.01, float(min_rate)))
+        self.max_backoff = float(max_backoff)
+        self.bucket = TokenBucket(self.max_rate, burst)
+        self.lock = threading.Lock()  # Shared by browser workers and HTTP download threads
+        self.backoff = 0.0
+        self.paused_until = 0.0
+        self.successes = 0
+        self.actions = 0
+        self.throttled_count = 0
+        self.waited = 0.0
+
+    @classmethod
+    def from_config(cls, config, logger):
+        return cls(
+            logger,
+            rate=config.get('requests_per_second', 5.0),
+            burst=config.get('request_burst', 10),
+            min_rate=config.get('min_requests_per_second', 0.2),
+            max_backoff=config.get('max_backoff', 300.0)
+        )
+
+    def acquire(self):
+        """Block until the next page load, click or download may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            delay = max(self.paused_until - now, 0.0) + self.bucket.reserve(now)
+            self.actions += 1
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def succeeded(self):
+        """Record a good response; after enough of them the rate creeps back up"""
+        with self.lock:
+            self.successes += 1
+            if self.bucket.rate < self.max_rate and self.successes >= 10:
+                self.bucket.rate = min(self.max_rate, self.bucket.rate * 1.25)
+                self.backoff /= 2
+                self.successes = 0
+                self.logger.info(f"Navigation rate raised to {self.bucket.rate:.2f}/s")
+
+    def throttled(self, reason, retry_after=None):
+        """Slow down after a throttling response or error page; returns the pause in seconds"""
+        with self.lock:
+            self.throttled_count += 1
+            self.successes = 0
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+            self.backoff = min(self.max_backoff, max(1.0, self.backoff * 2))
+            pause = min(self.max_backoff, max(self.backoff, retry_after or 0.0))
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        self.logger.warning(
+            f"Site is throttling or failing ({reason}), pausing {pause:.0f}s "
+            f"and slowing down to {self.bucket.rate:.2f} actions/s"
+        )
+        return pause
+
+    def check_page(self, driver):
+        """Return a description of the problem when the current page is an error page, else None"""
+        try:
+            probe = driver.execute_script(PAGE_PROBE_SCRIPT) or {}
+        except Exception:
+            return None
+        if probe.get('chromeError'):
+            return "browser error page"
+        title = (probe.get('title') or '').lower()
+        text = (probe.get('text') or '').lower()
+        for marker, reason in ERROR_PAGE_MARKERS:
+            # A marker inside a long page is document content, not an error page
+            if marker in title or (marker in text and probe.get('length', 0) < ERROR_PAGE_MAX_LENGTH):
+                return reason
+        return None
+
+    def check_response(self, response):
+        """Return a description when an HTTP response is a throttling or server error, else None"""
+        if response.status_code in THROTTLING_STATUS_CODES:
+            return f"HTTP {response.status_code}"
+        return None
+
+    def summary(self):
+        """One line for the log at the end of a run"""
+        return (
+            f"{self.actions} paced action(s), {self.waited:.1f}s spent pacing, "
+            f"{self.throttled_count} throttling response(s), final rate {self.bucket.rate:.2f}/s"
+        )
+
+
+def retry_after_seconds(response):
+    """Seconds from a Retry-After header, or None"""
+    value = response.headers.get('Retry-After', '')
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
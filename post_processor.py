@@ -0,0 +1,186 @@
+"""
+Post-download processing for Doccle documents
+Verifies, hashes, deduplicates and renames downloaded files in a thread pool while the
+browser moves on to the next document
+"""
+
+import os
+import shutil
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from archive import Archive
+from manifest import file_sha256
+from names import normalize_date, clean_name_part, free_path
+
+
+INVALID_DIR_NAME = ".invalid"
+DEFAULT_NAME_TEMPLATE = "{date} {sender} {title}"
+DUPLICATE_MODES = ("link", "drop", "keep")
+PDF_TRAILER_BYTES = 2048
+
+
+class FileCheckError(Exception):
+    """Raised when a downloaded file is incomplete or corrupt"""
+
+
+def wait_for_stable_size(path, interval=0.2, attempts=10):
+    """Return the file size once two consecutive reads agree"""
+    size = path.stat().st_size
+    for _ in range(attempts):
+        time.sleep(interval)
+        current = path.stat().st_size
+        if current == size:
+            return size
+        size = current
+    raise FileCheckError(f"{path.name} is still growing")
+
+
+def check_file(path):
+    """Check a PDF for its %%EOF trailer and an XML file for well-formedness"""
+    with open(path, 'rb') as f:
+        head = f.read(5)
+        if path.suffix.lower() == '.pdf' or head == b'%PDF-':
+            f.seek(max(0, path.stat().st_size - PDF_TRAILER_BYTES))
+            if b'%%EOF' not in f.read():
+                raise FileCheckError(f"{path.name} has no %%EOF trailer (truncated PDF)")
+            return
+
+    if path.suffix.lower() == '.xml':
+        try:
+            for _ in ET.iterparse(str(path)):
+                pass
+        except ET.ParseError as e:
+            raise FileCheckError(f"{path.name} is not well-formed XML: {e}")
+
+
+def document_file_name(doc, template=DEFAULT_NAME_TEMPLATE):
+    """Build a base file name from a dashboard record, or None without metadata"""
+    fields = {
+        "date": normalize_date(doc.get('date')),
+        "sender": clean_name_part(doc.get('sender')),
+        "title": clean_name_part(doc.get('title')),
+    }
+    if not any(fields.values()):
+        return None
+    try:
+        name = template.format(**fields)
+    except (KeyError, IndexError, ValueError):
+        name = DEFAULT_NAME_TEMPLATE.format(**fields)
+    name = clean_name_part(name)
+    return name[:150] or None
+
+
+class PostProcessor:
+    """Checks, hashes, deduplicates, renames and files away the files of finished documents"""
+
+    def __init__(self, download_folder, logger, workers=2, rename=True,
+                 name_template=DEFAULT_NAME_TEMPLATE, duplicates="link", known_hashes=None, archive=None):
+        """Initialize the pool; known_hashes maps sha256 -> file name of earlier downloads
+
+        Verified files are moved into place by archive (a flat archive.Archive by default).
+        """
+        self.download_folder = Path(download_folder)
+        self.archive = archive or Archive(download_folder)
+        self.logger = logger
+        self.rename = rename
+        self.name_template = name_template or DEFAULT_NAME_TEMPLATE
+        self.duplicates = duplicates if duplicates in DUPLICATE_MODES else "link"
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="post-process")
+        self.pending = []
+        self.lock = threading.Lock()  # Guards hashes
+        self.hashes = dict(known_hashes or {})
+
+    def submit(self, detail_url, file_names, doc=None):
+        """Queue the files of one document"""
+        future = self.executor.submit(self.process, detail_url, list(file_names), doc or {})
+        self.pending.append((detail_url, file_names, future))
+        return future
+
+    def process(self, detail_url, file_names, doc):
+        """Process one document; returns (final names, {name: (size, sha256)}, ok)"""
+        base_name = document_file_name(doc, self.name_template) if self.rename else None
+        final_names = []
+        file_hashes = {}
+        ok = True
+        for name in file_names:
+            path = self.download_folder / name
+            if not path.is_file():
+                continue
+            try:
+                size = wait_for_stable_size(path)
+                check_file(path)
+            except (FileCheckError, OSError) as e:
+                self.logger.warning(f"Integrity check failed: {e}")
+                self.quarantine(path)
+                ok = False
+                continue
+
+            digest = file_sha256(path)
+            path = self.archive.finalize(path, doc, base_name)
+            path, duplicate_of = self.deduplicate(path, digest)
+            final_names.append(self.archive.relative_name(path))
+            file_hashes[final_names[-1]] = (size, digest)
+            if duplicate_of:
+                self.logger.info(f"{final_names[-1]} is identical to {duplicate_of} ({self.duplicates})")
+        return final_names, file_hashes, ok
+
+    def deduplicate(self, path, digest):
+        """Hard-link or drop a file whose content was downloaded before; returns (path, original name)"""
+        name = self.archive.relative_name(path)
+        with self.lock:
+            existing = self.hashes.get(digest)
+            if not existing or existing == name or not (self.download_folder / existing).is_file():
+                self.hashes[digest] = name
+                return path, None
+
+        original = self.download_folder / existing
+        if self.duplicates == "drop":
+            path.unlink()
+            self.archive.forget(path)
+            return original, existing
+        if self.duplicates == "link":
+            temp = path.with_name(path.name + ".link")
+            try:
+                os.link(original, temp)
+                os.replace(temp, path)
+            except OSError as e:
+                self.logger.debug(f"Could not hard-link {path.name} to {existing}: {e}")
+                try:
+                    temp.unlink()
+                except OSError:
+                    pass
+        return path, existing
+
+    def quarantine(self, path):
+        """Move a failed file aside so the document is downloaded again next run"""
+        folder = self.download_folder / INVALID_DIR_NAME
+        try:
+            folder.mkdir(exist_ok=True)
+            shutil.move(str(path), str(free_path(folder, path.name)))
+        except OSError as e:
+            self.logger.debug(f"Could not move {path.name} aside: {e}")
+
+    def join(self):
+        """Wait for all queued documents
+
+        Returns a list of (detail_url, original names, final names, {name: (size, sha256)}, ok).
+        """
+        results = []
+        for detail_url, file_names, future in self.pending:
+            try:
+                names, file_hashes, ok = future.result()
+            except Exception as e:
+                # Files may already have been moved, so the document is downloaded again
+                self.logger.warning(f"Post-processing failed for {detail_url}: {e}")
+                names, file_hashes, ok = [], {}, False
+            results.append((detail_url, file_names, names, file_hashes, ok))
+        self.pending = []
+        return results
+
+    def close(self):
+        """Shut down the worker threads"""
+        self.executor.shutdown(wait=True)
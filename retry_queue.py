@@ -0,0 +1,143 @@
+"""
+Retries for documents that failed to download
+Re-runs failed documents with exponential backoff and jitter after the main pass and keeps
+the ones that still fail in failed.jsonl for a later --retry-failed run
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+
+FAILED_FILE = "failed.jsonl"
+
+
+class RetryScheduler:
+    """Queue of failed documents, retried in order of their next due time"""
+
+    def __init__(self, logger, max_attempts=3, base_delay=2.0, max_delay=60.0, jitter=0.5):
+        """max_attempts counts the first try; delays double per attempt up to max_delay"""
+        self.logger = logger
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.lock = threading.Lock()  # Browser workers add failures from their own threads
+        self.queue = []
+        self.exhausted = []
+
+    def __len__(self):
+        return len(self.queue)
+
+    def delay(self, attempts):
+        """Backoff before the next attempt after `attempts` failed ones"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return random.uniform(delay * (1 - self.jitter), delay)
+
+    def add(self, doc_number, doc, attempts=1, error=None):
+        """Queue a failed document, or give up on it once it used all attempts"""
+        entry = {"doc_number": doc_number, "doc": doc, "attempts": attempts, "error": error}
+        with self.lock:
+            if attempts >= self.max_attempts:
+                self.exhausted.append(entry)
+                return
+            entry["due"] = time.monotonic() + self.delay(attempts)
+            self.queue.append(entry)
+
+    def give_up(self, doc_number, doc, attempts=1, error=None):
+        """Record a document as failed without retrying it in this run"""
+        with self.lock:
+            self.exhausted.append({"doc_number": doc_number, "doc": doc, "attempts": attempts, "error": error})
+
+    def run(self, download):
+        """Retry queued documents with download(doc, doc_number) -> bool; returns the number recovered"""
+        recovered = 0
+        while True:
+            with self.lock:
+                if not self.queue:
+                    break
+                self.queue.sort(key=lambda e: e["due"])
+                entry = self.queue.pop(0)
+
+            wait = entry["due"] - time.monotonic()
+            if wait > 0:
+                self.logger.info(f"Retrying document {entry['doc_number']} in {wait:.1f}s...")
+                time.sleep(wait)
+
+            attempt = entry["attempts"] + 1
+            self.logger.info(f"Retry {attempt}/{self.max_attempts} for document {entry['doc_number']}")
+            try:
+                ok = download(entry["doc"], entry["doc_number"], attempt)
+                error = None if ok else "download failed"
+            except Exception as e:
+                ok, error = False, str(e)
+
+            if ok:
+                recovered += 1
+                self.logger.info(f"[OK] Document {entry['doc_number']} downloaded on attempt {attempt}")
+            else:
+                self.add(entry["doc_number"], entry["doc"], attempt, error)
+        return recovered
+
+
+class FailedLog:
+    """failed.jsonl: one line per document that could not be downloaded, keyed by detail URL"""
+
+    def __init__(self, path=FAILED_FILE):
+        self.path = path
+
+    def load(self):
+        """Return the recorded failures as a list of dicts"""
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return entries
+
+    def update(self, exhausted, succeeded):
+        """Add documents that ran out of attempts and drop the ones downloaded since
+
+        Returns the number of documents left in the file.
+        """
+        entries = {e.get('detail_url'): e for e in self.load() if e.get('detail_url')}
+        for detail_url in succeeded:
+            entries.pop(detail_url, None)
+
+        now = datetime.now().isoformat(timespec='seconds')
+        for item in exhausted:
+            detail_url = item["doc"].get('detail_url')
+            if not detail_url or detail_url in succeeded:
+                continue
+            previous = entries.get(detail_url, {})
+            entries[detail_url] = {
+                "detail_url": detail_url,
+                "record": item["doc"],
+                "attempts": previous.get("attempts", 0) + item["attempts"],
+                "error": item["error"],
+                "failed_at": now,
+            }
+
+        if not entries:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            return 0
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.path)
+        return len(entries)
@@ -0,0 +1,211 @@
+"""
+Timing spans and a machine-readable run report for the Doccle downloader
+Writes one JSON line per phase, per document and per document step, followed by a summary
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def format_duration(seconds):
+    """Short human readable duration, e.g. 1h 05m, 3m 20s or 45s"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """Snapshot of document throughput handed to progress callbacks"""
+
+    def __init__(self, done, failed, found, elapsed, target=None):
+        self.done = done
+        self.failed = failed
+        self.found = found
+        self.elapsed = elapsed
+        self.target = target
+
+    @property
+    def processed(self):
+        return self.done + self.failed
+
+    @property
+    def per_minute(self):
+        return self.processed / self.elapsed * 60 if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Seconds left for the documents found so far (capped by max_documents), or None"""
+        remaining = self.found - self.processed
+        if self.target:
+            remaining = min(remaining, self.target - self.done)
+        if remaining <= 0 or not self.processed:
+            return None
+        return remaining / (self.processed / self.elapsed)
+
+    def __str__(self):
+        text = f"{self.done} downloaded, {self.per_minute:.1f} docs/min"
+        if self.failed:
+            text += f", {self.failed} failed"
+        if self.eta is not None:
+            text += f", ETA {format_duration(self.eta)}"
+        return text
+
+
+class RunReport:
+    """Collects timing spans of one run and appends them to a JSONL file
+
+    Safe to share between browser worker threads.
+    """
+
+    def __init__(self, path, logger, on_progress=None, target=None):
+        """Open the report file; on_progress(Progress) is called after every document"""
+        self.path = path
+        self.logger = logger
+        self.on_progress = on_progress
+        self.target = target
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+        self.documents_start = None
+        self.durations = {}  # span name -> list of seconds
+        self.found = 0
+        self.done = 0
+        self.failed = 0
+        self.file = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(path, 'a', encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"Could not open run report {path}: {e}")
+        self.write({"event": "run_start", "time": datetime.now().isoformat(timespec='seconds')})
+
+    def write(self, entry):
+        with self.lock:
+            if not self.file:
+                return
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    @contextmanager
+    def span(self, name, doc=None, **fields):
+        """Time the block; the yielded dict can be filled with extra fields such as ok=False"""
+        extra = dict(fields)
+        start = time.monotonic()
+        try:
+            yield extra
+        except BaseException:
+            extra.setdefault('ok', False)
+            raise
+        finally:
+            self.record(name, time.monotonic() - start, start=start, doc=doc, **extra)
+
+    def record(self, name, duration, start=None, doc=None, **fields):
+        """Add a span that was timed elsewhere"""
+        if start is None:
+            start = time.monotonic() - duration
+        with self.lock:
+            self.durations.setdefault(name, []).append(duration)
+        entry = {
+            "event": "span",
+            "name": name,
+            "start": round(start - self.start, 3),
+            "duration": round(duration, 3),
+        }
+        if doc is not None:
+            entry["doc"] = doc
+        entry.update(fields)
+        self.write(entry)
+
+    def document_found(self):
+        """Count a document that is about to be processed"""
+        with self.lock:
+            self.found += 1
+            if self.documents_start is None:
+                self.documents_start = time.monotonic()
+
+    def document_finished(self, ok):
+        """Count a processed document and report progress"""
+        with self.lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+            progress = self.progress()
+        if self.on_progress:
+            try:
+                self.on_progress(progress)
+            except Exception as e:
+                self.logger.debug(f"Progress callback failed: {e}")
+
+    def document_failed_later(self):
+        """Move a document counted as downloaded to failed, e.g. when its queued HTTP download failed"""
+        with self.lock:
+            self.done = max(0, self.done - 1)
+            self.failed += 1
+
+    def document_recovered(self):
+        """Move a document counted as failed to downloaded after a successful retry"""
+        with self.lock:
+            self.failed = max(0, self.failed - 1)
+            self.done += 1
+
+    def progress(self):
+        start = self.documents_start if self.documents_start is not None else self.start
+        return Progress(self.done, self.failed, self.found, time.monotonic() - start, self.target)
+
+    def summary(self):
+        """Return counts, totals and percentiles per span name plus document throughput"""
+        with self.lock:
+            spans = {}
+            for name, values in self.durations.items():
+                spans[name] = {
+                    "count": len(values),
+                    "total": round(sum(values), 3),
+                    "p50": round(percentile(values, 0.50), 3),
+                    "p95": round(percentile(values, 0.95), 3),
+                    "max": round(max(values), 3),
+                }
+            progress = self.progress()
+        return {
+            "event": "summary",
+            "wall_time": round(time.monotonic() - self.start, 3),
+            "documents_found": progress.found,
+            "documents_downloaded": progress.done,
+            "documents_failed": progress.failed,
+            "documents_per_minute": round(progress.per_minute, 2),
+            "spans": spans,
+        }
+
+    def close(self):
+        """Write and log the summary, then close the file"""
+        summary = self.summary()
+        self.write(summary)
+        self.logger.info(
+            f"Run report: {summary['documents_downloaded']} downloaded, {summary['documents_failed']} failed, "
+            f"{summary['documents_per_minute']:.1f} docs/min ({self.path})"
+        )
+        for name, stats in summary['spans'].items():
+            self.logger.info(
+                f"  {name}: {stats['count']}x, {stats['total']:.1f}s total, "
+                f"p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, max {stats['max']:.2f}s"
+            )
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+        return summary
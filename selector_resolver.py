@@ -0,0 +1,134 @@
+"""
+Selector resolution for Doccle pages
+Evaluates all fallback selectors in one browser call and remembers which one matched
+"""
+
+import json
+import os
+import threading
+
+
+CACHE_FILE = "selector_cache.json"
+
+RESOLVE_SCRIPT = """
+const candidates = arguments[0];
+const keywords = arguments[1];
+
+function query(kind, value) {
+    switch (kind) {
+        case 'id': {
+            const el = document.getElementById(value);
+            return el ? [el] : [];
+        }
+        case 'name':
+            return Array.from(document.getElementsByName(value));
+        case 'css selector':
+            return Array.from(document.querySelectorAll(value));
+        case 'xpath': {
+            const result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < result.snapshotLength; i++) {
+                nodes.push(result.snapshotItem(i));
+            }
+            return nodes;
+        }
+    }
+    return [];
+}
+
+for (let i = 0; i < candidates.length; i++) {
+    let elements;
+    try {
+        elements = query(candidates[i][0], candidates[i][1]);
+    } catch (e) {
+        continue;
+    }
+    for (const el of elements) {
+        if (!keywords) {
+            return {index: i, element: el, text: '', href: el.getAttribute('href')};
+        }
+        // Hidden copies of a button report their full text content as innerText
+        if (!el.getClientRects().length) {
+            continue;
+        }
+        const text = (el.innerText || el.textContent || '').trim();
+        const lower = text.toLowerCase();
+        if (text && keywords.some(k => lower.includes(k))) {
+            return {index: i, element: el, text: text, href: el.getAttribute('href')};
+        }
+    }
+}
+return null;
+"""
+
+
+class SelectorResolver:
+    """Finds the first matching selector of a candidate list and caches the winner per page type"""
+
+    def __init__(self, driver, waiter, logger, cache_path=CACHE_FILE):
+        """Initialize with a driver, a Waiter for bounded polling and the cache file location"""
+        self.driver = driver
+        self.waiter = waiter
+        self.logger = logger
+        self.cache_path = cache_path
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+        """Load the winning selectors of earlier runs"""
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.debug(f"Could not read selector cache: {e}")
+        return {}
+
+    def save_cache(self):
+        """Write the winning selectors to disk"""
+        tmp_path = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.cache, f, indent=4)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self.logger.debug(f"Could not write selector cache: {e}")
+
+    def ordered(self, page_type, candidates):
+        """Move the cached winner for this page type to the front of the candidates"""
+        cached = self.cache.get(page_type)
+        if cached:
+            cached = tuple(cached)
+            if cached in candidates:
+                return [cached] + [c for c in candidates if c != cached]
+        return list(candidates)
+
+    def find(self, page_type, candidates, keywords=None, step=None, description=None):
+        """Return (element, (by, value), text, href) for the first match, or None
+
+        All candidates are evaluated in a single browser call. Elements must be rendered
+        and contain one of the lowercase keywords in their text when keywords are given. With a step the
+        query is repeated until that step's wait limit, otherwise it runs once.
+        """
+        ordered = self.ordered(page_type, [tuple(c) for c in candidates])
+        args = [[by, value] for by, value in ordered]
+
+        def query(driver):
+            return driver.execute_script(RESOLVE_SCRIPT, args, keywords)
+
+        if step:
+            result = self.waiter.until(query, step, description or page_type)
+        else:
+            try:
+                result = query(self.driver)
+            except Exception as e:
+                self.logger.debug(f"Selector query for {page_type} failed: {e}")
+                result = None
+
+        if not result:
+            return None
+
+        selector = ordered[result['index']]
+        if self.cache.get(page_type) != list(selector):
+            self.cache[page_type] = list(selector)
+            self.save_cache()
+        return result['element'], selector, result['text'], result.get('href')
@@ -0,0 +1,110 @@
+"""
+Saved login sessions for the Doccle downloader
+Keeps cookies and web storage after a successful login so later runs can skip the login form
+"""
+
+import json
+import os
+from datetime import datetime
+
+
+SESSION_FILE = "session.json"
+
+READ_STORAGE_SCRIPT = """
+function dump(storage) {
+    const items = {};
+    for (let i = 0; i < storage.length; i++) {
+        const key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+WRITE_STORAGE_SCRIPT = """
+const data = arguments[0];
+for (const [key, value] of Object.entries(data.local || {})) {
+    window.localStorage.setItem(key, value);
+}
+for (const [key, value] of Object.entries(data.session || {})) {
+    window.sessionStorage.setItem(key, value);
+}
+"""
+
+COOKIE_FIELDS = ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry')
+
+
+class SessionStore:
+    """Stores and restores a logged-in browser session in a JSON file"""
+
+    def __init__(self, logger, path=SESSION_FILE):
+        """Initialize the store for a session file"""
+        self.logger = logger
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def save(self, driver):
+        """Write the browser's cookies and storage to disk"""
+        try:
+            storage = driver.execute_script(READ_STORAGE_SCRIPT) or {}
+        except Exception as e:
+            self.logger.debug(f"Could not read web storage: {e}")
+            storage = {}
+
+        data = {
+            "saved_at": datetime.now().isoformat(timespec='seconds'),
+            "url": driver.current_url,
+            "cookies": driver.get_cookies(),
+            "storage": storage,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.path)
+        self.logger.info(f"Saved login session ({len(data['cookies'])} cookies)")
+
+    def restore(self, driver, base_url, navigate=None):
+        """Load a saved session into the browser; returns False when there is nothing to load
+
+        navigate loads a page (defaults to driver.get), so the caller can pace the visit.
+        """
+        if not self.exists():
+            return False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Could not read saved session: {e}")
+            return False
+
+        # Cookies and storage can only be set for the site that is currently open
+        (navigate or driver.get)(base_url + "/")
+        for cookie in data.get('cookies', []):
+            cookie = {k: v for k, v in cookie.items() if k in COOKIE_FIELDS}
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                self.logger.debug(f"Could not restore cookie {cookie.get('name')}: {e}")
+        try:
+            driver.execute_script(WRITE_STORAGE_SCRIPT, data.get('storage') or {})
+        except Exception as e:
+            self.logger.debug(f"Could not restore web storage: {e}")
+
+        self.logger.info(f"Restored login session saved at {data.get('saved_at', 'unknown time')}")
+        return True
+
+    def clear(self, driver=None):
+        """Forget the saved session (and drop it from the browser)"""
+        if driver:
+            try:
+                driver.delete_all_cookies()
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,92 @@
+"""
+Incremental sync service for the Doccle downloader
+Keeps the logged-in browser open, checks the dashboard at a fixed interval and only runs a
+download cycle when the list of documents changed
+"""
+
+import threading
+import time
+
+
+DEFAULT_INTERVAL = 300  # Seconds between dashboard checks
+DEFAULT_STOP_AFTER_KNOWN = 20  # Known documents in a row after which an incremental cycle stops looking
+
+
+class SyncService:
+    """Polls the dashboard with a warm browser and downloads new documents when it changes"""
+
+    def __init__(self, downloader, interval=DEFAULT_INTERVAL, stop_after_known=None):
+        """Wrap a DoccleDownloader; stop_after_known defaults to "sync_stop_after_known" from config"""
+        self.downloader = downloader
+        self.logger = downloader.logger
+        self.interval = max(1.0, float(interval))
+        if stop_after_known is None:
+            stop_after_known = downloader.config.get('sync_stop_after_known', DEFAULT_STOP_AFTER_KNOWN)
+        self.stop_after_known = stop_after_known
+        self.fingerprint = None  # Fingerprint of the dashboard as of the last download cycle
+        self.cycles = 0
+        self.polls = 0
+        self.stopped = threading.Event()
+
+    def stop(self):
+        """Ask the service to stop after the current check or cycle"""
+        self.stopped.set()
+
+    def poll(self):
+        """Return the current dashboard fingerprint, or None when the warm browser can't read it"""
+        if not self.downloader.browser_alive():
+            return None
+        self.polls += 1
+        try:
+            return self.downloader.document_list_fingerprint()
+        except Exception as e:
+            self.logger.warning(f"Could not check the dashboard: {e}")
+            return None
+
+    def sync(self):
+        """Run one download cycle; after the first one only the newest documents are scanned
+
+        Later cycles also skip the archive-wide manifest and index scans and reuse the
+        logged-in browser without restoring the saved session.
+        """
+        if not self.downloader.config.get('use_manifest', True) and self.cycles:
+            self.logger.warning("use_manifest is off, so every sync cycle downloads all documents again")
+        self.downloader.stop_after_known = self.stop_after_known if self.cycles else None
+        start = time.monotonic()
+        try:
+            self.downloader.run(keep_browser=True, incremental=bool(self.cycles))
+        finally:
+            self.cycles += 1
+            self.downloader.stop_after_known = None
+        summary = self.downloader.summary or {}
+        self.logger.info(
+            f"Sync cycle {self.cycles} done in {time.monotonic() - start:.1f}s: "
+            f"{summary.get('documents_downloaded', 0)} new document(s)"
+        )
+
+    def run(self):
+        """Check and sync until stop() is called or the process is interrupted"""
+        self.logger.info(f"Sync service started, checking for new documents every {self.interval:.0f}s")
+        try:
+            while not self.stopped.is_set():
+                fingerprint = self.poll()
+                if fingerprint is None or fingerprint != self.fingerprint:
+                    if fingerprint and self.fingerprint:
+                        self.logger.info("Document list changed")
+                    try:
+                        self.sync()
+                    except Exception as e:
+                        self.logger.error(f"Sync cycle failed: {e}")
+                        self.fingerprint = None
+                    else:
+                        # Taken before the cycle, so documents that arrive during it still
+                        # show up as a change on the next check
+                        self.fingerprint = fingerprint or self.poll()
+                else:
+                    self.logger.info("No new documents")
+                self.stopped.wait(self.interval)
+        except KeyboardInterrupt:
+            self.logger.info("Sync service interrupted")
+        finally:
+            self.downloader.close_browser()
+            self.logger.info(f"Sync service stopped after {self.cycles} cycle(s) and {self.polls} check(s)")
@@ -0,0 +1,18 @@
+"""
+Shared setup for the tests: makes the top-level modules and the benchmark mock server importable
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("doccle-tests")
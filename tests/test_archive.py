@@ -0,0 +1,53 @@
+"""Tests for name reservation and the sharded archive layouts"""
+
+from archive import Archive, STAGING_DIR_NAME
+
+
+def staged_file(archive, name, content=b"data"):
+    path = archive.staging_folder / name
+    path.write_bytes(content)
+    return path
+
+
+def test_reserve_adds_counter_on_clashes(tmp_path):
+    (tmp_path / "Bill.pdf").write_bytes(b"old")
+    archive = Archive(tmp_path)
+    with archive.lock:
+        assert archive.reserve("", "bill.pdf").name == "bill (1).pdf"  # Clashes ignore case
+        assert archive.reserve("", "bill.pdf").name == "bill (2).pdf"
+        assert archive.reserve("", "other.pdf").name == "other.pdf"
+
+
+def test_flat_layout_keeps_files_in_place(tmp_path):
+    archive = Archive(tmp_path)
+    path = staged_file(archive, "doc.pdf")
+    assert archive.finalize(path, {"date": "2024-02-03"}) == path
+    assert not (tmp_path / STAGING_DIR_NAME).exists()
+
+
+def test_year_month_layout(tmp_path):
+    archive = Archive(tmp_path, "year/month")
+    first = archive.finalize(staged_file(archive, "a.pdf"), {"date": "03/02/2024"}, "2024-02-03 Engie Bill")
+    second = archive.finalize(staged_file(archive, "b.PDF"), {"date": "2024-02-10"}, "2024-02-03 Engie Bill")
+    undated = archive.finalize(staged_file(archive, "c.xml"), {"date": ""})
+
+    assert archive.relative_name(first) == "2024/02/2024-02-03 Engie Bill.pdf"
+    assert archive.relative_name(second) == "2024/02/2024-02-03 Engie Bill (1).pdf"
+    assert archive.relative_name(undated) == "undated/c.xml"
+    assert first.read_bytes() == b"data"
+
+    archive.close()
+    assert not (tmp_path / STAGING_DIR_NAME).exists()
+
+
+def test_sender_layout_and_forget(tmp_path):
+    archive = Archive(tmp_path, "sender")
+    path = archive.finalize(staged_file(archive, "a.pdf"), {"sender": "Stad: Gent"})
+    assert archive.relative_name(path) == "Stad Gent/a.pdf"
+    unknown = archive.finalize(staged_file(archive, "b.pdf"), {})
+    assert archive.relative_name(unknown) == "Unknown sender/b.pdf"
+
+    path.unlink()
+    archive.forget(path)
+    again = archive.finalize(staged_file(archive, "a.pdf"), {"sender": "Stad: Gent"})
+    assert again == path
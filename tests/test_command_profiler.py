@@ -0,0 +1,97 @@
+"""Tests for WebDriver command accounting"""
+
+import json
+
+from command_profiler import CommandProfiler
+
+
+class DriverStub:
+    """Stands in for a WebDriver; every command goes through execute"""
+
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, driver_command, params=None):
+        self.sent.append(driver_command)
+        return {"value": None}
+
+
+class SelectorResolver:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def find(self):
+        def query():
+            return self.driver.execute("executeScript")
+        return query()
+
+
+class DoccleDownloader:
+    """Named like the real class so its methods show up in the call chain"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.resolver = SelectorResolver(driver)
+
+    def download_document(self):
+        self.driver.execute("findElement")
+        self.find_xml_button()
+
+    def find_xml_button(self):
+        self.resolver.find()
+
+
+def test_commands_are_grouped_by_call_chain(logger):
+    driver = DriverStub()
+    profiler = CommandProfiler(logger)
+    profiler.instrument(driver)
+    profiler.instrument(driver)  # Instrumenting twice must not count commands twice
+
+    downloader = DoccleDownloader(driver)
+    with profiler.document(7):
+        downloader.download_document()
+    driver.execute("getTitle")
+
+    assert driver.sent == ["findElement", "executeScript", "getTitle"]
+    summary = profiler.summary()
+    assert summary["total_commands"] == 3
+    assert set(summary["callers"]) == {
+        "download_document",
+        "download_document > find_xml_button > SelectorResolver.find.<locals>.query",
+        "test_commands_are_grouped_by_call_chain",
+    }
+    assert list(summary["documents"]) == ["7"]
+    assert summary["documents"]["7"]["count"] == 2
+    assert summary["commands_per_document"] == 2
+
+
+def test_release_restores_execute(logger):
+    driver = DriverStub()
+    original = driver.execute
+    profiler = CommandProfiler(logger)
+    profiler.instrument(driver)
+    profiler.release(driver)
+    assert driver.execute == original
+    assert not hasattr(driver, "_unprofiled_execute")
+    driver.execute("getTitle")
+    assert profiler.summary()["total_commands"] == 0
+    profiler.release(driver)  # Releasing an uninstrumented driver does nothing
+
+
+def test_report_and_write(tmp_path, logger):
+    profiler = CommandProfiler(logger)
+    assert profiler.report() == ["0 WebDriver commands, 0.0s round trip time"]
+
+    profiler.record("findElement", 0.5, "find_documents")
+    profiler.record("findElement", 0.25, "find_documents")
+    profiler.record("getTitle", 0.1, "login")
+    lines = profiler.report()
+    assert lines[0] == "3 WebDriver commands, 0.8s round trip time"
+    assert lines[1] == "find_documents: 2 commands, 0.75s (mostly findElement)"
+    assert lines[2] == "login: 1 commands, 0.10s (mostly getTitle)"
+
+    path = tmp_path / "commands.json"
+    profiler.write(path)
+    data = json.loads(path.read_text())
+    assert data["commands"]["findElement"] == {"count": 2, "total": 0.75, "max": 0.5}
+    assert data["commands_per_document"] is None
@@ -0,0 +1,59 @@
+"""Tests for the date window and sender filters"""
+
+from datetime import date
+
+import pytest
+
+from document_filters import DocumentFilter, month_window, parse_date
+
+
+def test_month_window():
+    assert month_window("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert month_window("2025-12") == (date(2025, 12, 1), date(2025, 12, 31))
+
+
+def test_parse_date_accepts_dashboard_formats():
+    assert parse_date("03/02/2024") == date(2024, 2, 3)
+    assert parse_date("2024-02-03T10:00") == date(2024, 2, 3)
+    assert parse_date("yesterday") is None
+
+
+def test_date_window_is_inclusive():
+    doc_filter = DocumentFilter(since="2024-01-01", until="2024-01-31")
+    assert doc_filter.rejects({"date": "2024-01-01"}) is None
+    assert doc_filter.rejects({"date": "31/01/2024"}) is None
+    assert "before" in doc_filter.rejects({"date": "2023-12-31"})
+    assert "after" in doc_filter.rejects({"date": "2024-02-01"})
+    assert doc_filter.rejects({"date": ""}) is None  # Undated records are not dropped
+
+
+def test_before_window():
+    doc_filter = DocumentFilter(since="2024-01-01")
+    assert doc_filter.before_window({"date": "2023-12-31"})
+    assert not doc_filter.before_window({"date": "2024-01-01"})
+    assert not doc_filter.before_window({})
+
+
+def test_sender_lists():
+    doc_filter = DocumentFilter(senders=["engie", "Proximus"], exclude_senders=["proximus mobile"])
+    assert doc_filter.rejects({"sender": "ENGIE Electrabel"}) is None
+    assert doc_filter.rejects({"sender": "Proximus"}) is None
+    assert "excluded" in doc_filter.rejects({"sender": "Proximus Mobile"})
+    assert "not selected" in doc_filter.rejects({"sender": "Telenet"})
+
+
+def test_empty_filter_is_falsy_and_bad_dates_raise():
+    assert not DocumentFilter.from_config({})
+    assert DocumentFilter.from_config({"senders": ["Engie"]})
+    with pytest.raises(ValueError):
+        DocumentFilter(since="not a date")
+
+
+def test_single_sender_as_plain_string():
+    doc_filter = DocumentFilter.from_config({"senders": "Engie", "exclude_senders": "Engie Mobile"})
+    assert doc_filter.senders == ["engie"]
+    assert doc_filter.rejects({"sender": "Telenet"}) is not None  # Not matched letter by letter
+    assert doc_filter.rejects({"sender": "Engie"}) is None
+    assert "excluded" in doc_filter.rejects({"sender": "Engie Mobile"})
+    with pytest.raises(ValueError):
+        DocumentFilter(senders=42)
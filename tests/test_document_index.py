@@ -0,0 +1,49 @@
+"""Tests for amount parsing and XML field extraction"""
+
+import pytest
+
+from document_index import parse_amount, parse_document_xml
+from mock_doccle_server import MockDoccle
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("41.03", 41.03),
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("EUR 12,50", 12.5),
+    ("-3,00", -3.0),
+    ("", None),
+    ("n/a", None),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+def test_parse_document_xml(tmp_path):
+    site = MockDoccle(documents=3, xml_size=2000)
+    path = tmp_path / "doc00001.xml"
+    path.write_bytes(site.xml_payload(1))
+    doc = site.document(1)
+
+    fields = parse_document_xml(path)
+    assert fields["sender"] == doc["sender"]
+    assert fields["document_date"] == doc["date"]
+    assert fields["document_type"] == "Invoice"
+    assert fields["amount"] == float(doc["amount"])
+    assert fields["currency"] == "EUR"
+    assert fields["due_date"] == doc["due_date"]
+    assert fields["reference"] == doc["reference"]
+
+
+def test_parse_document_xml_prefers_specific_tags(tmp_path):
+    path = tmp_path / "invoice.xml"
+    path.write_text(
+        "<Invoice xmlns='urn:test'><Supplier><CompanyName>Engie</CompanyName></Supplier>"
+        "<Date>01/02/2024</Date><IssueDate>2024-01-15</IssueDate>"
+        "<Amount>5</Amount><PayableAmount currencyID='EUR'>1.234,56</PayableAmount></Invoice>"
+    )
+    fields = parse_document_xml(path)
+    assert fields["sender"] == "Engie"
+    assert fields["document_date"] == "2024-01-15"
+    assert fields["amount"] == 1234.56
+    assert fields["currency"] == "EUR"
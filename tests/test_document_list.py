@@ -0,0 +1,83 @@
+"""Tests for batched dashboard enumeration with a stub driver"""
+
+import pytest
+
+from document_list import DOCUMENT_RECORDS_SCRIPT, LOAD_MORE_SCRIPT, iter_document_records, is_read
+from waits import Waiter
+
+
+class DashboardDriver:
+    """Answers the enumeration scripts from a list of pages, like a "Load more" dashboard"""
+
+    def __init__(self, pages, append=True):
+        self.pages = pages
+        self.append = append
+        self.shown = 1
+        self.calls = []
+
+    @property
+    def rendered(self):
+        if self.append:
+            return [record for page in self.pages[:self.shown] for record in page]
+        return self.pages[self.shown - 1]
+
+    def execute_script(self, script, *args):
+        if script == DOCUMENT_RECORDS_SCRIPT:
+            self.calls.append("collect")
+            rendered = self.rendered
+            return {
+                "selector": ["css", "div.document"] if rendered else None,
+                "total": len(rendered),
+                "first": rendered[0]["detail_url"] if rendered else None,
+                "records": rendered[args[1]:],
+            }
+        if script == LOAD_MORE_SCRIPT:
+            self.calls.append("load_more")
+            self.shown = min(self.shown + 1, len(self.pages))
+            return "clicked"
+        raise AssertionError("unexpected script")
+
+
+def records(*numbers):
+    return [{"detail_url": f"/doc/{n}", "classes": "document"} for n in numbers]
+
+
+@pytest.fixture
+def waiter(logger):
+    def make(driver):
+        return Waiter(driver, logger, limits={"next_page": 0.2}, poll_interval=0.01)
+    return make
+
+
+def test_load_more_batches(logger, waiter):
+    driver = DashboardDriver([records(1, 2), records(3, 4), records(5)])
+    urls = [r["detail_url"] for r in iter_document_records(driver, waiter(driver), logger)]
+    assert urls == ["/doc/1", "/doc/2", "/doc/3", "/doc/4", "/doc/5"]
+    assert driver.calls.count("load_more") == 3  # The last one finds nothing new
+
+
+def test_replaced_list_restarts_offset(logger, waiter):
+    driver = DashboardDriver([records(1, 2), records(3, 4), records(3, 4)], append=False)
+    urls = [r["detail_url"] for r in iter_document_records(driver, waiter(driver), logger)]
+    assert urls == ["/doc/1", "/doc/2", "/doc/3", "/doc/4"]
+
+
+def test_activate_and_pace_only_when_the_page_is_used(logger, waiter):
+    driver = DashboardDriver([records(1, 2, 3), records(4)])
+    events = []
+    documents = iter_document_records(
+        driver, waiter(driver), logger,
+        pace=lambda: events.append("pace"),
+        activate=lambda: events.append("activate")
+    )
+    for record in documents:
+        events.append(record["detail_url"])
+    assert events[:5] == ["activate", "/doc/1", "/doc/2", "/doc/3", "activate"]
+    assert events.count("pace") == driver.calls.count("load_more")
+
+
+def test_is_read():
+    assert not is_read("document unopened")
+    assert not is_read("document new")
+    assert not is_read("document")
+    assert is_read("document opened")
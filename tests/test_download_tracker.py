@@ -0,0 +1,99 @@
+"""Tests for per-document download folders and completion detection"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from download_tracker import DownloadTracker, InotifyWatcher, is_completed_download, create_watcher
+from waits import Waiter
+
+
+class CdpDriver:
+    """Records the download folder Chrome would be pointed at"""
+
+    def __init__(self, supported=True):
+        self.supported = supported
+        self.download_path = None
+
+    def execute_cdp_cmd(self, command, params):
+        if not self.supported:
+            raise RuntimeError("CDP not available")
+        self.download_path = Path(params["downloadPath"])
+
+
+@pytest.fixture
+def make_tracker(tmp_path, logger):
+    trackers = []
+
+    def make(driver=None, collect_folder=None):
+        driver = driver or CdpDriver()
+        waiter = Waiter(driver, logger, limits={"download": 2})
+        tracker = DownloadTracker(driver, tmp_path, waiter, logger, collect_folder=collect_folder)
+        trackers.append(tracker)
+        return tracker, driver
+    yield make
+    for tracker in trackers:
+        try:
+            tracker.watcher.close()
+        except OSError:
+            pass  # Already closed by tracker.close()
+
+
+def test_is_completed_download(tmp_path):
+    for name in ("a.pdf", "b.pdf.crdownload", ".hidden"):
+        (tmp_path / name).write_bytes(b"x")
+    assert [p.name for p in sorted(tmp_path.iterdir()) if is_completed_download(p)] == ["a.pdf"]
+
+
+def test_each_document_gets_its_own_folder(make_tracker, tmp_path):
+    (tmp_path / "invoice.pdf").write_bytes(b"earlier download")
+    tracker, driver = make_tracker()
+    tracker.begin(1, key="/doc/1")
+    assert driver.download_path.parent == tmp_path / ".incoming"
+
+    (driver.download_path / "invoice.pdf").write_bytes(b"new")
+    assert tracker.wait_for_new_files() == {"invoice.pdf"}
+    assert tracker.finish() == ["invoice (1).pdf"]
+    assert (tmp_path / "invoice (1).pdf").read_bytes() == b"new"
+    assert tracker.close() == {}
+    assert not (tmp_path / ".incoming").exists()
+
+
+def test_wait_wakes_up_when_the_file_arrives(make_tracker):
+    tracker, driver = make_tracker()
+    tracker.begin(1)
+    timer = threading.Timer(0.2, (driver.download_path / "late.xml").write_bytes, [b"<x/>"])
+    timer.start()
+    assert tracker.wait_for_new_files() == {"late.xml"}
+    timer.join()
+
+
+def test_unfinished_download_is_collected_at_close(make_tracker, tmp_path):
+    tracker, driver = make_tracker(collect_folder=tmp_path / ".staging")
+    (tmp_path / ".staging").mkdir()
+    tracker.begin(1, key="/doc/1")
+    doc_dir = driver.download_path
+    (doc_dir / "big.pdf.crdownload").write_bytes(b"x")
+    assert tracker.finish() == []
+
+    (doc_dir / "big.pdf.crdownload").rename(doc_dir / "big.pdf")
+    assert tracker.close() == {"/doc/1": [".staging/big.pdf"]}
+
+
+def test_shared_folder_fallback(make_tracker, tmp_path):
+    (tmp_path / "old.pdf").write_bytes(b"x")
+    tracker, _ = make_tracker(CdpDriver(supported=False))
+    tracker.begin(1)
+    assert not tracker.redirect_supported
+    (tmp_path / "new.pdf").write_bytes(b"y")
+    assert tracker.wait_for_new_files() == {"new.pdf"}
+    assert tracker.finish() == ["new.pdf"]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_create_watcher_prefers_inotify_on_linux():
+    watcher = create_watcher()
+    assert isinstance(watcher, InotifyWatcher)
+    watcher.close()
@@ -0,0 +1,73 @@
+"""Tests for the cached chromedriver lookup"""
+
+import json
+import sys
+import time
+import types
+
+import driver_cache
+from driver_cache import resolve_chromedriver, UNKNOWN_VERSION_MAX_AGE
+
+
+def fake_webdriver_manager(monkeypatch, driver_path):
+    """Install a webdriver_manager stand-in that counts install() calls"""
+    calls = []
+
+    class ChromeDriverManager:
+        def install(self):
+            calls.append(1)
+            return str(driver_path)
+
+    chrome = types.ModuleType("webdriver_manager.chrome")
+    chrome.ChromeDriverManager = ChromeDriverManager
+    monkeypatch.setitem(sys.modules, "webdriver_manager", types.ModuleType("webdriver_manager"))
+    monkeypatch.setitem(sys.modules, "webdriver_manager.chrome", chrome)
+    return calls
+
+
+def test_cache_is_reused_until_chrome_changes(tmp_path, logger, monkeypatch):
+    driver_path = tmp_path / "chromedriver"
+    driver_path.write_text("")
+    cache_path = str(tmp_path / "driver_cache.json")
+    calls = fake_webdriver_manager(monkeypatch, driver_path)
+    monkeypatch.setattr(driver_cache, "installed_chrome_version", lambda: "120.0.1.2")
+
+    assert resolve_chromedriver(logger, cache_path) == str(driver_path)
+    assert resolve_chromedriver(logger, cache_path) == str(driver_path)
+    assert len(calls) == 1
+    assert json.load(open(cache_path))["chrome_version"] == "120.0.1.2"
+
+    monkeypatch.setattr(driver_cache, "installed_chrome_version", lambda: "121.0.1.2")
+    resolve_chromedriver(logger, cache_path)
+    assert len(calls) == 2
+
+
+def test_missing_driver_or_bad_cache_resolves_again(tmp_path, logger, monkeypatch):
+    driver_path = tmp_path / "chromedriver"
+    cache_path = tmp_path / "driver_cache.json"
+    calls = fake_webdriver_manager(monkeypatch, driver_path)
+    monkeypatch.setattr(driver_cache, "installed_chrome_version", lambda: "120.0.1.2")
+
+    cache_path.write_text("{")
+    resolve_chromedriver(logger, str(cache_path))
+    # The cached driver path does not exist on disk
+    resolve_chromedriver(logger, str(cache_path))
+    assert len(calls) == 2
+
+
+def test_unknown_version_is_cached_for_a_week(tmp_path, logger, monkeypatch):
+    driver_path = tmp_path / "chromedriver"
+    driver_path.write_text("")
+    cache_path = tmp_path / "driver_cache.json"
+    calls = fake_webdriver_manager(monkeypatch, driver_path)
+    monkeypatch.setattr(driver_cache, "installed_chrome_version", lambda: None)
+
+    resolve_chromedriver(logger, str(cache_path))
+    resolve_chromedriver(logger, str(cache_path))
+    assert len(calls) == 1
+
+    cache = json.loads(cache_path.read_text())
+    cache["resolved_at"] = time.time() - UNKNOWN_VERSION_MAX_AGE - 1
+    cache_path.write_text(json.dumps(cache))
+    resolve_chromedriver(logger, str(cache_path))
+    assert len(calls) == 2
@@ -0,0 +1,115 @@
+"""Tests for the HTTP download engine against the benchmark's mock Doccle server"""
+
+import pytest
+import requests
+
+from http_downloader import HttpDownloader, file_url
+from mock_doccle_server import MockDoccle, start_server, FILES_PREFIX
+
+
+class CookieDriver:
+    """Stands in for a logged-in Selenium driver"""
+
+    def __init__(self, cookies):
+        self.cookies = cookies
+
+    def get_cookies(self):
+        return [{"name": name, "value": value, "domain": "127.0.0.1", "path": "/"}
+                for name, value in self.cookies.items()]
+
+    def execute_script(self, script, *args):
+        return "doccle-tests"
+
+
+@pytest.fixture
+def site():
+    site = MockDoccle(documents=3, pdf_size=5000, xml_size=1000)
+    server = start_server(site)
+    site.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield site
+    server.shutdown()
+
+
+@pytest.fixture
+def downloader(tmp_path, logger):
+    downloader = HttpDownloader(tmp_path, logger, workers=2, timeout=10)
+    yield downloader
+    downloader.close()
+
+
+def log_in(site):
+    with requests.Session() as session:
+        session.post(site.base_url + "/login", data={"username": site.username, "password": site.password},
+                     allow_redirects=False)
+        return session.cookies.get_dict()
+
+
+def test_file_url():
+    page = "https://secure.doccle.be/doccle-euui/document/1"
+    assert file_url(page, "/files/doc1.pdf") == "https://secure.doccle.be/files/doc1.pdf"
+    assert file_url(page, "javascript:void(0)") is None
+    assert file_url(page, "#") is None
+    assert file_url(page, page + "#print") is None
+    assert file_url(page, None) is None
+
+
+def test_downloads_with_browser_cookies(site, downloader):
+    downloader.load_browser_session(CookieDriver(log_in(site)))
+    assert downloader.session.headers["User-Agent"] == "doccle-tests"
+
+    urls = [f"{site.base_url}{FILES_PREFIX}doc00001.pdf", f"{site.base_url}{FILES_PREFIX}doc00001.xml"]
+    downloader.submit(1, urls)
+    downloader.submit(2, urls[:1])
+    results = {doc_number: files for doc_number, (files, failed) in downloader.join().items() if not failed}
+
+    # Both documents fetch the same PDF in parallel, so one of them gets the " (1)" name
+    assert sorted(results[1] + results[2]) == ["doc00001 (1).pdf", "doc00001.pdf", "doc00001.xml"]
+    assert "doc00001.xml" in results[1]
+    folder = downloader.download_folder
+    assert (folder / "doc00001.pdf").read_bytes() == site.pdf_payload(1)
+    assert (folder / "doc00001 (1).pdf").read_bytes() == site.pdf_payload(1)
+    assert (folder / "doc00001.xml").read_bytes() == site.xml_payload(1)
+    assert not list(folder.glob("*.part"))
+
+
+def test_login_page_instead_of_file_fails(site, downloader):
+    # Without the session cookie the mock site redirects to its login page
+    url = f"{site.base_url}{FILES_PREFIX}doc00001.pdf"
+    assert downloader.download_all(1, [url]) == ([], [url])
+    assert not [p for p in downloader.download_folder.iterdir() if p.stat().st_size]
+
+
+def test_partial_download_reports_the_failed_url(site, downloader):
+    downloader.load_browser_session(CookieDriver(log_in(site)))
+    good = f"{site.base_url}{FILES_PREFIX}doc00001.xml"
+    viewer = f"{site.base_url}/doccle-euui/document/doc00001"  # An HTML page, not a file
+    downloader.submit(1, [viewer, good])
+    assert downloader.join() == {1: (["doc00001.xml"], [viewer])}
+
+
+def test_partial_document_is_not_recorded(tmp_path, logger):
+    from doccle_downloader import DoccleDownloader
+
+    (tmp_path / "doc00001.xml").write_bytes(b"<Document/>")
+    (tmp_path / "doc00002.pdf").write_bytes(b"%PDF-1.4\n%%EOF\n")
+    downloader = DoccleDownloader.__new__(DoccleDownloader)
+    downloader.logger = logger
+    downloader.config = {"download_folder": str(tmp_path)}
+    downloader.archive = None
+    downloader.retry = None
+    downloader.report = None
+    downloader.downloaded_files = set()
+    downloader.document_records = {}
+    downloader.browser_only = set()
+    downloader.http_documents = {1: "/doc/1", 2: "/doc/2"}
+    downloader.http_downloader = type("Joined", (), {"join": lambda self: {
+        1: (["doc00001.xml"], ["https://secure.doccle.be/viewer/1"]),
+        2: (["doc00002.pdf"], []),
+    }})()
+    recorded = []
+    downloader.record_download = lambda detail_url, files: recorded.append((detail_url, files))
+
+    assert downloader.collect_http_downloads() == 1
+    assert recorded == [("/doc/2", ["doc00002.pdf"])]
+    assert downloader.browser_only == {"/doc/1"}
+    assert not (tmp_path / "doc00001.xml").exists()
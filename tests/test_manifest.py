@@ -0,0 +1,46 @@
+"""Tests for the persistent download manifest"""
+
+import hashlib
+
+from manifest import DownloadManifest, MANIFEST_NAME, file_sha256
+
+
+def test_records_survive_reopening(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"pdf")
+    manifest = DownloadManifest(tmp_path)
+    assert not manifest.contains("/doc/1")
+    manifest.record("/doc/1", ["a.pdf", "missing.xml"])
+    manifest.close()
+
+    manifest = DownloadManifest(tmp_path)
+    assert (tmp_path / MANIFEST_NAME).is_file()
+    assert manifest.contains("/doc/1")
+    assert manifest.count() == 1
+    assert manifest.file_hashes() == {hashlib.sha256(b"pdf").hexdigest(): "a.pdf"}
+    manifest.close()
+
+
+def test_given_hashes_are_stored_without_hashing(tmp_path):
+    manifest = DownloadManifest(tmp_path)
+    manifest.record("/doc/1", ["2024/02/a.pdf"], {"2024/02/a.pdf": (3, "abc")})
+    row = manifest.conn.execute("SELECT size, sha256 FROM files").fetchone()
+    assert row == (3, "abc")
+    manifest.close()
+
+
+def test_file_hashes_skip_deleted_files_and_keep_the_oldest(tmp_path):
+    for name in ("first.pdf", "copy.pdf", "gone.pdf"):
+        (tmp_path / name).write_bytes(name.encode() if name == "gone.pdf" else b"same")
+    manifest = DownloadManifest(tmp_path)
+    manifest.record("/doc/1", ["first.pdf"])
+    manifest.record("/doc/2", ["copy.pdf", "gone.pdf"])
+    (tmp_path / "gone.pdf").unlink()
+    assert manifest.file_hashes() == {hashlib.sha256(b"same").hexdigest(): "first.pdf"}
+    manifest.close()
+
+
+def test_file_sha256(tmp_path):
+    path = tmp_path / "big.bin"
+    data = b"x" * (3 * 1024 * 1024 + 7)
+    path.write_bytes(data)
+    assert file_sha256(path) == hashlib.sha256(data).hexdigest()
@@ -0,0 +1,52 @@
+"""Tests for the benchmark's stand-in Doccle site"""
+
+import pytest
+import requests
+
+from mock_doccle_server import MockDoccle, start_server, DASHBOARD_PATH, DOCUMENTS_PATH, DETAIL_PREFIX, FILES_PREFIX
+
+
+@pytest.fixture
+def site():
+    site = MockDoccle(documents=5, page_size=2, pdf_size=3000, xml_size=800)
+    server = start_server(site)
+    site.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield site
+    server.shutdown()
+
+
+def log_in(session, site, password=None):
+    return session.post(site.base_url + "/login", allow_redirects=False, data={
+        "username": site.username, "password": password or site.password
+    })
+
+
+def test_pages_need_a_session(site):
+    with requests.Session() as session:
+        response = session.get(site.base_url + DASHBOARD_PATH, allow_redirects=False)
+        assert response.status_code in (302, 303)
+        assert log_in(session, site, password="wrong").status_code == 200
+        assert log_in(session, site).headers["Location"] == DASHBOARD_PATH
+        assert session.get(site.base_url + DASHBOARD_PATH).text.count('class="document ') == 2
+
+
+def test_load_more_pages(site):
+    with requests.Session() as session:
+        log_in(session, site)
+        first = session.get(site.base_url + DOCUMENTS_PATH, params={"offset": 2}).json()
+        last = session.get(site.base_url + DOCUMENTS_PATH, params={"offset": 4}).json()
+    assert first["next"] == 4 and not first["done"]
+    assert last["done"] and last["html"].count(DETAIL_PREFIX) == 1
+
+
+def test_payloads(site):
+    with requests.Session() as session:
+        log_in(session, site)
+        detail = session.get(f"{site.base_url}{DETAIL_PREFIX}doc00001")
+        pdf = session.get(f"{site.base_url}{FILES_PREFIX}doc00001.pdf")
+        missing = session.get(f"{site.base_url}{FILES_PREFIX}doc00099.pdf")
+    assert f"{FILES_PREFIX}doc00001.xml" in detail.text
+    assert len(pdf.content) == 3000
+    assert pdf.content.startswith(b"%PDF-") and pdf.content.rstrip().endswith(b"%%EOF")
+    assert missing.status_code == 404
+    assert site.requests >= 3
@@ -0,0 +1,68 @@
+"""Tests for the token bucket and the adaptive navigation scheduler"""
+
+from types import SimpleNamespace
+
+from navigation_scheduler import TokenBucket, NavigationScheduler, retry_after_seconds
+
+
+class ProbeDriver:
+    def __init__(self, probe):
+        self.probe = probe
+
+    def execute_script(self, script, *args):
+        return self.probe
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated
+    assert [bucket.reserve(now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve(now) == 0.5
+    assert bucket.reserve(now) == 1.0
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(rate=1, burst=1)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now + 1.0) == 0.0
+
+
+def test_throttled_halves_rate_and_pauses(logger):
+    scheduler = NavigationScheduler(logger, rate=4, burst=1, min_rate=1, max_backoff=10)
+    assert scheduler.throttled("HTTP 429") == 1.0
+    assert scheduler.bucket.rate == 2
+    assert scheduler.throttled("HTTP 429", retry_after=5) == 5
+    assert scheduler.bucket.rate == 1
+    scheduler.throttled("HTTP 429")
+    assert scheduler.bucket.rate == 1  # Never below min_rate
+    assert scheduler.throttled_count == 3
+
+
+def test_successes_raise_rate_back_to_max(logger):
+    scheduler = NavigationScheduler(logger, rate=4, burst=1, min_rate=1)
+    scheduler.throttled("HTTP 503")
+    for _ in range(10):
+        scheduler.succeeded()
+    assert scheduler.bucket.rate == 2.5
+    for _ in range(100):
+        scheduler.succeeded()
+    assert scheduler.bucket.rate == 4
+
+
+def test_check_page_recognizes_error_pages(logger):
+    scheduler = NavigationScheduler(logger)
+    error_page = {"title": "429 Too Many Requests", "text": "", "length": 0}
+    chrome_error = {"chromeError": True}
+    long_document = {"title": "Invoice", "text": "rate limit clause", "length": 50000}
+    assert scheduler.check_page(ProbeDriver(error_page)) == "HTTP 429 Too Many Requests"
+    assert scheduler.check_page(ProbeDriver(chrome_error)) == "browser error page"
+    assert scheduler.check_page(ProbeDriver(long_document)) is None
+
+
+def test_check_response_and_retry_after(logger):
+    scheduler = NavigationScheduler(logger)
+    assert scheduler.check_response(SimpleNamespace(status_code=503)) == "HTTP 503"
+    assert scheduler.check_response(SimpleNamespace(status_code=200)) is None
+    assert retry_after_seconds(SimpleNamespace(headers={"Retry-After": "7"})) == 7.0
+    assert retry_after_seconds(SimpleNamespace(headers={})) is None
@@ -0,0 +1,90 @@
+"""Tests for integrity checks, renaming and deduplication of finished downloads"""
+
+import pytest
+
+from post_processor import PostProcessor, INVALID_DIR_NAME, document_file_name
+
+PDF = b"%PDF-1.4\nbody\n%%EOF\n"
+DOC = {"date": "03/02/2024", "sender": "Engie", "title": "Bill: February"}
+
+
+@pytest.fixture
+def processor(tmp_path, logger, request):
+    mode = getattr(request, "param", "link")
+    post = PostProcessor(tmp_path, logger, workers=1, duplicates=mode)
+    yield post
+    post.close()
+
+
+def process(post, detail_url, files, doc=DOC):
+    for name, content in files.items():
+        (post.download_folder / name).write_bytes(content)
+    post.submit(detail_url, list(files), doc)
+    return post.join()[0]
+
+
+def test_document_file_name():
+    assert document_file_name(DOC) == "2024-02-03 Engie Bill February"
+    assert document_file_name(DOC, "{sender} - {missing}") == "2024-02-03 Engie Bill February"
+    assert document_file_name({}) is None
+
+
+def test_valid_files_are_renamed_and_hashed(processor):
+    detail_url, original, final, hashes, ok = process(processor, "/doc/1", {
+        "download.pdf": PDF,
+        "download.xml": b"<Document><Title>x</Title></Document>",
+    })
+    assert ok
+    assert original == ["download.pdf", "download.xml"]
+    assert final == ["2024-02-03 Engie Bill February.pdf", "2024-02-03 Engie Bill February.xml"]
+    assert hashes[final[0]][0] == len(PDF)
+
+
+@pytest.mark.parametrize("name, content", [
+    ("truncated.pdf", b"%PDF-1.4\nbody"),
+    ("broken.xml", b"<Document><Title>x</Document>"),
+])
+def test_corrupt_files_are_quarantined(processor, name, content):
+    _, _, final, _, ok = process(processor, "/doc/1", {name: content})
+    assert not ok
+    assert final == []
+    assert (processor.download_folder / INVALID_DIR_NAME / name).exists()
+
+
+def test_duplicates_are_hard_linked(processor):
+    _, _, first, _, _ = process(processor, "/doc/1", {"a.pdf": PDF})
+    _, _, second, _, _ = process(processor, "/doc/2", {"b.pdf": PDF}, {"title": "Copy"})
+    first_path = processor.download_folder / first[0]
+    second_path = processor.download_folder / second[0]
+    assert second_path.exists()
+    assert first_path.stat().st_ino == second_path.stat().st_ino
+
+
+@pytest.mark.parametrize("processor", ["drop"], indirect=True)
+def test_duplicates_are_dropped(processor):
+    _, _, first, _, _ = process(processor, "/doc/1", {"a.pdf": PDF})
+    _, _, second, _, _ = process(processor, "/doc/2", {"b.pdf": PDF}, {"title": "Copy"})
+    assert second == first
+    assert not (processor.download_folder / "Copy.pdf").exists()
+
+
+def test_known_hashes_from_earlier_runs(tmp_path, logger):
+    earlier = PostProcessor(tmp_path, logger, workers=1, duplicates="drop")
+    _, _, first, _, _ = process(earlier, "/doc/1", {"a.pdf": PDF})
+    earlier.close()
+
+    later = PostProcessor(tmp_path, logger, workers=1, duplicates="drop", known_hashes=earlier.hashes)
+    _, _, second, _, _ = process(later, "/doc/2", {"b.pdf": PDF}, {"title": "Copy"})
+    later.close()
+    assert second == first
+
+
+def test_crash_counts_as_failure(processor, monkeypatch):
+    def crash(path, doc=None, base_name=None):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(processor.archive, "finalize", crash)
+    _, original, final, hashes, ok = process(processor, "/doc/1", {"a.pdf": PDF})
+    assert not ok
+    assert original == ["a.pdf"]
+    assert final == [] and hashes == {}
@@ -0,0 +1,101 @@
+"""Tests for the retry scheduler and failed.jsonl"""
+
+import json
+
+from retry_queue import RetryScheduler, FailedLog
+
+
+def record(n):
+    return {"detail_url": f"/doc/{n}", "sender": "Engie"}
+
+
+def test_failures_are_retried_until_attempts_run_out(logger):
+    retry = RetryScheduler(logger, max_attempts=3, base_delay=0, max_delay=0)
+    retry.add(1, record(1))
+    retry.add(2, record(2))
+    attempts = []
+
+    def download(doc, doc_number, attempt):
+        attempts.append((doc_number, attempt))
+        return doc_number == 1 and attempt == 3
+
+    assert retry.run(download) == 1
+    assert sorted(attempts) == [(1, 2), (1, 3), (2, 2), (2, 3)]
+    assert [(e["doc_number"], e["attempts"], e["error"]) for e in retry.exhausted] == [(2, 3, "download failed")]
+    assert len(retry) == 0
+
+
+def test_exceptions_count_as_failures(logger):
+    retry = RetryScheduler(logger, max_attempts=2, base_delay=0)
+
+    def download(doc, doc_number, attempt):
+        raise RuntimeError("tab crashed")
+
+    retry.add(1, record(1))
+    assert retry.run(download) == 0
+    assert retry.exhausted[0]["error"] == "tab crashed"
+
+
+def test_give_up_skips_the_queue(logger):
+    retry = RetryScheduler(logger)
+    retry.give_up(None, record(1), error="a file failed its integrity check")
+    assert len(retry) == 0
+    assert retry.exhausted[0]["doc"] == record(1)
+
+
+def test_delay_doubles_up_to_max(logger):
+    retry = RetryScheduler(logger, base_delay=2, max_delay=5, jitter=0)
+    assert [retry.delay(n) for n in (1, 2, 3, 4)] == [2, 4, 5, 5]
+
+
+def test_failed_log_update(tmp_path):
+    log = FailedLog(str(tmp_path / "failed.jsonl"))
+    exhausted = [{"doc": record(1), "attempts": 3, "error": "timeout"},
+                 {"doc": record(2), "attempts": 3, "error": "timeout"}]
+    assert log.update(exhausted, succeeded=set()) == 2
+
+    # A later run adds its attempts and drops what was downloaded since
+    assert log.update([{"doc": record(1), "attempts": 2, "error": "HTTP 500"}], succeeded={"/doc/2"}) == 1
+    entries = log.load()
+    assert [e["detail_url"] for e in entries] == ["/doc/1"]
+    assert entries[0]["attempts"] == 5
+    assert entries[0]["error"] == "HTTP 500"
+    assert entries[0]["record"] == record(1)
+
+
+def test_failed_log_removed_when_empty(tmp_path):
+    path = tmp_path / "failed.jsonl"
+    path.write_text(json.dumps({"detail_url": "/doc/1"}) + "\n\nnot json\n")
+    log = FailedLog(str(path))
+    assert len(log.load()) == 1
+    assert log.update([], succeeded={"/doc/1"}) == 0
+    assert not path.exists()
+
+
+def test_failed_http_document_is_counted_once(tmp_path, logger):
+    """A queued HTTP download that fails and is recovered on retry counts as one download"""
+    from doccle_downloader import DoccleDownloader
+    from run_report import RunReport
+
+    downloader = DoccleDownloader.__new__(DoccleDownloader)
+    downloader.logger = logger
+    downloader.config = {"download_folder": str(tmp_path)}
+    downloader.archive = None
+    downloader.downloaded_files = set()
+    downloader.document_records = {"/doc/1": record(1)}
+    downloader.browser_only = set()
+    downloader.retry = RetryScheduler(logger, base_delay=0)
+    downloader.report = RunReport(tmp_path / "run.jsonl", logger)
+    downloader.profiler = None
+    downloader.http_documents = {1: "/doc/1"}
+    downloader.http_downloader = type("Joined", (), {"join": lambda self: {1: ([], ["https://x/1.pdf"])}})()
+
+    downloader.report.document_finished(True)  # Counted when the download was queued
+    assert downloader.collect_http_downloads() == 1
+    assert (downloader.report.done, downloader.report.failed) == (0, 1)
+    assert len(downloader.retry) == 1
+
+    downloader.download_document = lambda doc, doc_number: True
+    assert downloader.run_retries() == 1
+    summary = downloader.report.close()
+    assert (summary["documents_downloaded"], summary["documents_failed"]) == (1, 0)
@@ -0,0 +1,74 @@
+"""Tests for timing spans, progress and the JSONL run report"""
+
+import json
+
+import pytest
+
+from run_report import RunReport, Progress, percentile, format_duration
+
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(list(range(1, 101)), 0.95) == 95
+    assert percentile([7], 0.95) == 7
+
+
+@pytest.mark.parametrize("seconds, text", [(45, "45s"), (200, "3m 20s"), (3900, "1h 05m")])
+def test_format_duration(seconds, text):
+    assert format_duration(seconds) == text
+
+
+def test_progress():
+    progress = Progress(done=8, failed=2, found=30, elapsed=60)
+    assert progress.per_minute == 10
+    assert progress.eta == 120
+    assert str(progress) == "8 downloaded, 10.0 docs/min, 2 failed, ETA 2m 00s"
+    assert Progress(done=10, failed=0, found=30, elapsed=60, target=10).eta is None
+    assert Progress(done=0, failed=0, found=5, elapsed=1).eta is None
+
+
+def test_report_file_and_summary(tmp_path, logger):
+    seen = []
+    path = tmp_path / "logs" / "run.jsonl"
+    report = RunReport(path, logger, on_progress=seen.append)
+
+    with report.span("document", doc=1, kind="document") as span:
+        span["ok"] = True
+    with pytest.raises(RuntimeError):
+        with report.span("document", doc=2, kind="document"):
+            raise RuntimeError("tab crashed")
+    report.record("enumerate", 1.5, kind="phase")
+    for ok in (True, False, True):
+        report.document_found()
+        report.document_finished(ok)
+    report.document_recovered()
+    summary = report.close()
+
+    assert [p.processed for p in seen] == [1, 2, 3]
+    assert (summary["documents_found"], summary["documents_downloaded"], summary["documents_failed"]) == (3, 3, 0)
+    assert summary["spans"]["document"]["count"] == 2
+    assert summary["spans"]["enumerate"]["total"] == 1.5
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert entries[0]["event"] == "run_start"
+    assert entries[-1]["event"] == "summary"
+    spans = [e for e in entries if e["event"] == "span" and e["name"] == "document"]
+    assert [(e["doc"], e.get("ok")) for e in spans] == [(1, True), (2, False)]
+
+
+def test_failed_later_moves_a_document_to_failed(tmp_path, logger):
+    report = RunReport(tmp_path / "run.jsonl", logger)
+    report.document_finished(True)
+    report.document_failed_later()
+    assert (report.done, report.failed) == (0, 1)
+    report.close()
+
+
+def test_broken_progress_callback_is_ignored(tmp_path, logger):
+    def broken(progress):
+        raise ValueError("window closed")
+
+    report = RunReport(tmp_path / "run.jsonl", logger, on_progress=broken)
+    report.document_finished(True)
+    assert report.close()["documents_downloaded"] == 1
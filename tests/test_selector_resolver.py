@@ -0,0 +1,73 @@
+"""Tests for selector ordering and the cache of winning selectors"""
+
+import json
+
+import pytest
+
+from selector_resolver import SelectorResolver
+from waits import Waiter
+
+CANDIDATES = [("id", "download"), ("css selector", "a.print"), ("xpath", "//a[contains(., 'XML')]")]
+
+
+class PageDriver:
+    """Answers RESOLVE_SCRIPT from a dict of selector -> (element, text, href)"""
+
+    def __init__(self, page):
+        self.page = page
+        self.queries = []
+
+    def execute_script(self, script, candidates, keywords):
+        self.queries.append([tuple(c) for c in candidates])
+        for index, candidate in enumerate(candidates):
+            match = self.page.get(tuple(candidate))
+            if match and (not keywords or any(k in match[1].lower() for k in keywords)):
+                element, text, href = match
+                return {"index": index, "element": element, "text": text, "href": href}
+        return None
+
+
+@pytest.fixture
+def make_resolver(tmp_path, logger):
+    def make(page):
+        driver = PageDriver(page)
+        waiter = Waiter(driver, logger, limits={"detail_page": 0.1}, poll_interval=0.01)
+        return SelectorResolver(driver, waiter, logger, cache_path=str(tmp_path / "cache.json")), driver
+    return make
+
+
+def test_first_matching_candidate_wins_and_is_cached(make_resolver, tmp_path):
+    page = {CANDIDATES[1]: ("print-button", "Open / print", "/files/1.pdf"),
+            CANDIDATES[2]: ("xml-button", "Download XML", "/files/1.xml")}
+    resolver, driver = make_resolver(page)
+
+    assert resolver.find("detail.open_print", CANDIDATES, keywords=["print"]) == \
+        ("print-button", CANDIDATES[1], "Open / print", "/files/1.pdf")
+    assert json.loads((tmp_path / "cache.json").read_text()) == {"detail.open_print": list(CANDIDATES[1])}
+    assert len(driver.queries) == 1  # All candidates in one call
+
+
+def test_cached_winner_is_tried_first_on_the_next_run(make_resolver):
+    page = {CANDIDATES[0]: ("a", "Download", None), CANDIDATES[2]: ("b", "Download XML", "/x.xml")}
+    first, _ = make_resolver(page)
+    first.find("detail.xml", CANDIDATES, keywords=["xml"])
+
+    later, driver = make_resolver(page)
+    assert later.find("detail.xml", CANDIDATES, keywords=["xml"])[0] == "b"
+    assert driver.queries[0] == [CANDIDATES[2], CANDIDATES[0], CANDIDATES[1]]
+
+
+def test_keywords_and_missing_matches(make_resolver, tmp_path):
+    resolver, _ = make_resolver({CANDIDATES[0]: ("a", "Settings", None)})
+    assert resolver.find("detail.xml", CANDIDATES, keywords=["xml"]) is None
+    assert resolver.find("login.username", CANDIDATES)[0] == "a"  # No keywords: any element
+    assert resolver.find("detail.xml", CANDIDATES, keywords=["xml"], step="detail_page") is None
+    assert "detail.xml" not in json.loads((tmp_path / "cache.json").read_text())
+
+
+def test_unreadable_cache_is_ignored(tmp_path, logger):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    resolver = SelectorResolver(PageDriver({}), None, logger, cache_path=str(path))
+    assert resolver.cache == {}
+    assert resolver.ordered("detail.xml", CANDIDATES) == CANDIDATES
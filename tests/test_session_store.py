@@ -0,0 +1,82 @@
+"""Tests for saving and restoring a login session"""
+
+import json
+
+from session_store import SessionStore, READ_STORAGE_SCRIPT, WRITE_STORAGE_SCRIPT
+
+
+class BrowserStub:
+    """Keeps cookies and web storage the way a browser tab would"""
+
+    def __init__(self, cookies=None, storage=None):
+        self.cookies = list(cookies or [])
+        self.storage = storage or {"local": {}, "session": {}}
+        self.visited = []
+        self.current_url = "https://secure.doccle.be/dashboard"
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        if cookie.get("name") == "broken":
+            raise ValueError("invalid cookie domain")
+        self.cookies.append(cookie)
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        if script == READ_STORAGE_SCRIPT:
+            return self.storage
+        if script == WRITE_STORAGE_SCRIPT:
+            for area in ("local", "session"):
+                self.storage[area].update(args[0].get(area, {}))
+            return None
+        self.storage = {"local": {}, "session": {}}  # localStorage.clear()
+
+
+COOKIE = {"name": "JSESSIONID", "value": "abc", "path": "/", "domain": "secure.doccle.be",
+          "secure": True, "httpOnly": True, "sameSite": "Lax"}
+
+
+def test_save_and_restore(tmp_path, logger):
+    path = tmp_path / "session.json"
+    store = SessionStore(logger, str(path))
+    assert not store.exists()
+    assert not store.restore(BrowserStub(), "https://secure.doccle.be")
+
+    store.save(BrowserStub([COOKIE], {"local": {"token": "t"}, "session": {}}))
+    assert json.loads(path.read_text())["storage"]["local"] == {"token": "t"}
+
+    browser = BrowserStub()
+    visited = []
+    assert store.restore(browser, "https://secure.doccle.be", navigate=visited.append)
+    assert visited == ["https://secure.doccle.be/"]  # Loaded through the caller's navigate
+    assert browser.visited == []
+    assert browser.cookies == [{k: v for k, v in COOKIE.items() if k != "sameSite"}]
+    assert browser.storage["local"] == {"token": "t"}
+
+
+def test_restore_skips_cookies_the_browser_rejects(tmp_path, logger):
+    store = SessionStore(logger, str(tmp_path / "session.json"))
+    store.save(BrowserStub([{"name": "broken", "value": "x"}, COOKIE]))
+    browser = BrowserStub()
+    assert store.restore(browser, "https://secure.doccle.be")
+    assert browser.visited == ["https://secure.doccle.be/"]
+    assert [c["name"] for c in browser.cookies] == ["JSESSIONID"]
+
+
+def test_unreadable_file_and_clear(tmp_path, logger):
+    path = tmp_path / "session.json"
+    path.write_text("{")
+    store = SessionStore(logger, str(path))
+    assert not store.restore(BrowserStub(), "https://secure.doccle.be")
+
+    browser = BrowserStub([COOKIE], {"local": {"token": "t"}, "session": {}})
+    store.clear(browser)
+    assert not path.exists()
+    assert browser.cookies == [] and browser.storage["local"] == {}
+    store.clear()  # Nothing left to remove
@@ -0,0 +1,74 @@
+"""Tests for the incremental sync service, with a stub downloader instead of a browser"""
+
+from sync_service import SyncService, DEFAULT_STOP_AFTER_KNOWN
+
+
+class DownloaderStub:
+    """Hands out dashboard fingerprints and records each download cycle"""
+
+    def __init__(self, logger, fingerprints, config=None, fail_cycles=()):
+        self.logger = logger
+        self.config = config or {}
+        self.fingerprints = list(fingerprints)
+        self.fail_cycles = set(fail_cycles)
+        self.service = None
+        self.stop_after_known = None
+        self.summary = {"documents_downloaded": 1}
+        self.runs = []
+        self.closed = False
+
+    def browser_alive(self):
+        return True
+
+    def document_list_fingerprint(self):
+        fingerprint = self.fingerprints.pop(0)
+        if not self.fingerprints:
+            self.service.stop()
+        return fingerprint
+
+    def run(self, keep_browser=False, incremental=False):
+        self.runs.append((keep_browser, incremental, self.stop_after_known))
+        if len(self.runs) - 1 in self.fail_cycles:
+            raise RuntimeError("login failed")
+
+    def close_browser(self):
+        self.closed = True
+
+
+def make_service(downloader, **kwargs):
+    service = SyncService(downloader, **kwargs)
+    service.interval = 0  # The constructor enforces at least a second
+    downloader.service = service
+    return service
+
+
+def test_only_changes_start_a_cycle(logger):
+    downloader = DownloaderStub(logger, ["a", "a", "b"])
+    service = make_service(downloader)
+    service.run()
+    assert downloader.runs == [(True, False, None), (True, True, DEFAULT_STOP_AFTER_KNOWN)]
+    assert downloader.stop_after_known is None
+    assert (service.cycles, service.polls) == (2, 3)
+    assert downloader.closed
+
+
+def test_stop_after_known_comes_from_config(logger):
+    downloader = DownloaderStub(logger, ["a", "b"], config={"sync_stop_after_known": 5})
+    make_service(downloader).run()
+    assert [run[2] for run in downloader.runs] == [None, 5]
+
+
+def test_failed_cycle_is_retried_on_next_check(logger):
+    downloader = DownloaderStub(logger, ["a", "a"], fail_cycles={0})
+    service = make_service(downloader)
+    service.run()
+    assert len(downloader.runs) == 2
+    assert service.fingerprint == "a"
+
+
+def test_stop_before_run(logger):
+    downloader = DownloaderStub(logger, ["a"])
+    service = make_service(downloader)
+    service.stop()
+    service.run()
+    assert downloader.runs == [] and downloader.closed
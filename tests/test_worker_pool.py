@@ -0,0 +1,89 @@
+"""Tests for the browser worker pool with stub browsers"""
+
+import logging
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from worker_pool import BrowserWorkerPool
+
+
+class StubWorker:
+    def __init__(self, folder, fail_start=False, fail_docs=()):
+        self.config = {"download_folder": str(folder)}
+        self.fail_start = fail_start
+        self.fail_docs = set(fail_docs)
+        self.download_tracker = None
+        self.driver = None
+        self.document_files = {}
+        self.processed = []
+
+    def setup_driver(self):
+        if self.fail_start:
+            time.sleep(0.2)  # Chrome takes a moment before it gives up
+            raise RuntimeError("Chrome failed to start")
+        self.driver = SimpleNamespace(quit=lambda: None)
+
+    def load_session_cookies(self, cookies):
+        pass
+
+    def process_document(self, doc, doc_number):
+        self.processed.append(doc_number)
+        return doc_number not in self.fail_docs
+
+
+class StubParent:
+    def __init__(self, folder, workers_fail=False, fail_docs=()):
+        self.config = {"download_folder": str(folder)}
+        self.logger = logging.getLogger("doccle-tests")
+        self.driver = SimpleNamespace(get_cookies=lambda: [])
+        self.archive = None
+        self.downloaded_files = set()
+        self.workers_fail = workers_fail
+        self.fail_docs = set(fail_docs)
+        self.workers = []
+        self.processed = []
+        self.retries = []
+
+    def spawn_worker(self, folder):
+        worker = StubWorker(folder, fail_start=self.workers_fail, fail_docs=self.fail_docs)
+        self.workers.append(worker)
+        return worker
+
+    def process_document(self, doc, doc_number):
+        self.processed.append(doc_number)
+        return doc_number not in self.fail_docs
+
+    def schedule_retry(self, doc_number, doc):
+        self.retries.append(doc_number)
+
+    def record_download(self, detail_url, file_names):
+        pass
+
+
+def candidates(count):
+    return ((n, {"detail_url": f"/doc/{n}"}) for n in range(1, count + 1))
+
+
+def test_workers_share_the_documents(tmp_path):
+    parent = StubParent(tmp_path, fail_docs={3})
+    assert BrowserWorkerPool(parent, 2).run(candidates(6)) == 5
+    assert sorted(n for worker in parent.workers for n in worker.processed) == [1, 2, 3, 4, 5, 6]
+    assert parent.processed == []
+    assert parent.retries == [3]
+
+
+@pytest.mark.parametrize("count", [2, 3, 20])
+def test_main_browser_takes_over_when_no_worker_starts(tmp_path, count):
+    # With few documents the enumeration finishes before the workers fail
+    parent = StubParent(tmp_path, workers_fail=True, fail_docs={2})
+    assert BrowserWorkerPool(parent, 2).run(candidates(count)) == count - 1
+    assert sorted(parent.processed) == list(range(1, count + 1))
+    assert parent.retries == [2]
+
+
+def test_document_limit(tmp_path):
+    parent = StubParent(tmp_path, workers_fail=True)
+    assert BrowserWorkerPool(parent, 2).run(candidates(10), max_docs=3) == 3
+    assert len(parent.processed) == 3
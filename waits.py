@@ -0,0 +1,126 @@
+"""
+Condition-driven waits for the Doccle downloader
+Replaces fixed sleeps with bounded waits on real readiness signals and keeps per-phase timing
+"""
+
+import time
+from contextlib import contextmanager
+
+
+# Upper bound in seconds for each kind of wait (overridable with "wait_limits" in config.json)
+DEFAULT_LIMITS = {
+    "page_load": 20,
+    "login": 20,
+    "document_list": 20,
+    "next_page": 5,
+    "detail_page": 20,
+    "download": 10,
+    "downloads_finish": 60,
+}
+
+
+class PhaseStats:
+    """Wall time and time spent waiting for one phase of a run"""
+
+    def __init__(self):
+        self.total = 0.0
+        self.waiting = 0.0
+
+    @property
+    def working(self):
+        return max(0.0, self.total - self.waiting)
+
+
+class Waiter:
+    """Waits on browser readiness signals with per-step upper bounds"""
+
+    def __init__(self, driver, logger, limits=None, poll_interval=0.1, ready_states=("complete",)):
+        """Initialize with a driver and optional overrides of DEFAULT_LIMITS
+
+        ready_states are the document.readyState values page_ready accepts; the eager
+        page-load strategy also accepts "interactive".
+        """
+        self.driver = driver
+        self.logger = logger
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.poll_interval = poll_interval
+        self.ready_states = tuple(ready_states)
+        self.phases = {}
+        self.current_phase = None
+
+    @contextmanager
+    def phase(self, name):
+        """Attribute time spent inside the block (and waits within it) to a phase"""
+        previous = self.current_phase
+        self.current_phase = name
+        stats = self.phases.setdefault(name, PhaseStats())
+        start = time.monotonic()
+        try:
+            yield stats
+        finally:
+            stats.total += time.monotonic() - start
+            self.current_phase = previous
+
+    def until(self, condition, step, description=None, poll_interval=None, timeout=None, sleep=None):
+        """Poll condition(driver) until it returns a truthy value or the step limit expires
+
+        Returns the condition's value, or None on timeout. Exceptions raised by the
+        condition count as "not ready yet". A custom sleep(seconds) callable may return
+        early when something changed, e.g. a file system watcher.
+        """
+        if timeout is None:
+            timeout = self.limits.get(step, DEFAULT_LIMITS.get(step, 20))
+        interval = poll_interval or self.poll_interval
+        sleep = sleep or time.sleep
+        start = time.monotonic()
+        deadline = start + timeout
+        result = None
+        try:
+            while True:
+                try:
+                    result = condition(self.driver)
+                except Exception:
+                    result = None
+                remaining = deadline - time.monotonic()
+                if result or remaining <= 0:
+                    break
+                sleep(min(interval, remaining))
+        finally:
+            elapsed = time.monotonic() - start
+            if self.current_phase:
+                self.phases[self.current_phase].waiting += elapsed
+
+        if not result:
+            self.logger.debug(f"Timed out after {timeout}s waiting for {description or step}")
+        return result
+
+    def page_ready(self, step="page_load"):
+        """Wait until the current document has finished loading"""
+        return self.until(
+            lambda d: d.execute_script("return document.readyState") in self.ready_states,
+            step,
+            "document.readyState"
+        )
+
+    def url_changes(self, old_url, step="page_load"):
+        """Wait until the browser navigated away from old_url"""
+        return self.until(lambda d: d.current_url != old_url, step, "URL change")
+
+    def element_present(self, by, value, step="page_load"):
+        """Wait until at least one element matches the locator and return the first"""
+        return self.until(
+            lambda d: (d.find_elements(by, value) or [None])[0],
+            step,
+            f"{by}={value}"
+        )
+
+    def report(self):
+        """Return summary lines of waiting versus working time per phase"""
+        lines = []
+        for name, stats in self.phases.items():
+            lines.append(
+                f"{name}: {stats.total:.1f}s total, "
+                f"{stats.waiting:.1f}s waiting, {stats.working:.1f}s working"
+            )
+        return lines
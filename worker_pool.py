@@ -0,0 +1,210 @@
+"""
+Parallel browser workers for Doccle detail pages
+Copies the logged-in session into several headless Chrome instances that share one queue
+"""
+
+import itertools
+import os
+import queue
+import threading
+from pathlib import Path
+
+from names import free_path
+
+
+WORKERS_DIR_NAME = ".workers"
+
+
+class BrowserWorkerPool:
+    """Processes document records with N headless browsers, each with its own download folder"""
+
+    def __init__(self, parent, size):
+        """Initialize the pool for a logged-in parent downloader"""
+        self.parent = parent
+        self.logger = parent.logger
+        self.size = max(1, int(size))
+        self.root = Path(parent.config['download_folder']) / WORKERS_DIR_NAME
+        # Bounded so enumeration only runs a little ahead of the workers
+        self.tasks = queue.Queue(maxsize=self.size * 2)
+        self.lock = threading.Lock()
+        self.download_count = 0
+        self.max_docs = None
+        self.workers = []
+
+    def run(self, candidates, max_docs=None):
+        """Download (doc_number, record) candidates as they are enumerated; returns the number of successes"""
+        self.max_docs = max_docs
+        candidates = iter(candidates)
+        first = next(candidates, None)
+        if first is None:
+            return 0
+
+        cookies = self.parent.driver.get_cookies()
+        self.logger.info(f"Starting {self.size} browser workers...")
+
+        threads = []
+        for index in range(1, self.size + 1):
+            worker = self.parent.spawn_worker(self.root / f"worker{index}")
+            self.workers.append(worker)
+            thread = threading.Thread(
+                target=self.work,
+                args=(index, worker, cookies),
+                name=f"doccle-worker-{index}",
+                daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+
+        # Feed the queue from the enumeration while the workers drain it
+        pending = first
+        while pending is not None and not self.limit_reached():
+            if not any(thread.is_alive() for thread in threads):
+                break
+            try:
+                self.tasks.put(pending, timeout=1)
+            except queue.Full:
+                continue
+            pending = next(candidates, None)
+
+        for _ in threads:
+            self.put_stop(threads)
+        for thread in threads:
+            thread.join()
+
+        # Documents the workers did not get to (all of them stopped, e.g. Chrome failed to
+        # start) are processed by the main browser, whether or not enumeration had finished
+        leftovers = self.drain()
+        if pending is not None:
+            leftovers.append(pending)
+        if leftovers and not self.limit_reached():
+            self.logger.error("All browser workers stopped, continuing with the main browser")
+            self.process_in_parent(itertools.chain(leftovers, candidates))
+
+        if self.limit_reached():
+            self.logger.info(f"Reached maximum document limit: {self.max_docs}")
+
+        self.merge()
+        return self.download_count
+
+    def drain(self):
+        """Take the documents still waiting in the queue"""
+        tasks = []
+        while True:
+            try:
+                task = self.tasks.get_nowait()
+            except queue.Empty:
+                return tasks
+            if task is not None:
+                tasks.append(task)
+
+    def process_in_parent(self, tasks):
+        """Download the remaining documents one by one in the parent's browser"""
+        for doc_number, doc in tasks:
+            if self.limit_reached():
+                break
+            self.logger.info(f"Processing document {doc_number}...")
+            try:
+                ok = self.parent.process_document(doc, doc_number)
+            except Exception as e:
+                self.logger.warning(f"Error processing document {doc_number}: {e}")
+                ok = False
+            if ok:
+                with self.lock:
+                    self.download_count += 1
+                    total = self.download_count
+                self.logger.info(f"[OK] Downloaded document {doc_number} (total: {total})")
+            else:
+                self.logger.warning(f"[FAIL] Could not download document {doc_number}")
+                self.parent.schedule_retry(doc_number, doc)
+
+    def put_stop(self, threads):
+        """Queue a stop marker for one worker without blocking on dead workers"""
+        while any(thread.is_alive() for thread in threads):
+            try:
+                self.tasks.put(None, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def limit_reached(self):
+        with self.lock:
+            return bool(self.max_docs) and self.download_count >= self.max_docs
+
+    def work(self, index, worker, cookies):
+        """Worker thread: start a browser, adopt the session and drain the queue"""
+        try:
+            worker.setup_driver()
+            worker.load_session_cookies(cookies)
+        except Exception as e:
+            self.logger.error(f"Worker {index}: could not start browser: {e}")
+            self.stop_worker(worker)
+            return
+
+        try:
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+                if self.limit_reached():
+                    continue
+                doc_number, doc = task
+
+                self.logger.info(f"Worker {index}: processing document {doc_number}...")
+                try:
+                    ok = worker.process_document(doc, doc_number)
+                except Exception as e:
+                    self.logger.warning(f"Worker {index}: error processing document {doc_number}: {e}")
+                    ok = False
+
+                if ok:
+                    with self.lock:
+                        self.download_count += 1
+                        total = self.download_count
+                    self.logger.info(f"[OK] Downloaded document {doc_number} (total: {total})")
+                else:
+                    self.logger.warning(f"[FAIL] Could not download document {doc_number}")
+                    self.parent.schedule_retry(doc_number, doc)
+        finally:
+            self.stop_worker(worker)
+
+    def stop_worker(self, worker):
+        """Collect late downloads and close the worker's browser"""
+        if worker.download_tracker:
+            for detail_url, file_names in worker.download_tracker.close().items():
+                worker.record_download(detail_url, worker.document_files.get(detail_url, []) + file_names)
+            worker.download_tracker = None
+        if worker.driver:
+            try:
+                worker.driver.quit()
+            except Exception:
+                pass
+            worker.driver = None
+
+    def merge(self):
+        """Move every worker's files into the main download folder and record them"""
+        download_folder = Path(self.parent.config['download_folder'])
+        staging_folder = self.parent.archive.staging_folder if self.parent.archive else download_folder
+        for worker in self.workers:
+            worker_folder = Path(worker.config['download_folder'])
+            for detail_url, file_names in worker.document_files.items():
+                final_names = []
+                for name in file_names:
+                    source = worker_folder / name
+                    if not source.exists():
+                        continue
+                    target = free_path(staging_folder, name)
+                    os.replace(source, target)
+                    final_names.append(target.relative_to(download_folder).as_posix())
+                self.parent.downloaded_files.update(final_names)
+                self.parent.record_download(detail_url, final_names)
+            try:
+                worker_folder.rmdir()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                self.logger.warning(f"Leaving unmerged files in {worker_folder}")
+
+        try:
+            self.root.rmdir()
+        except OSError:
+            pass